@@ -9,7 +9,9 @@ import sys
 import os
 from pathlib import Path
 from enum import IntEnum
-from typing import Optional
+from typing import Optional, Union
+
+import numpy as np
 
 # 平台特定的库加载
 def _get_library_path() -> str:
@@ -252,6 +254,40 @@ _lib.WebRTC_APM_ProcessStream.restype = ctypes.c_int
 _lib.WebRTC_APM_SetStreamDelayMs.argtypes = [ctypes.c_void_p, ctypes.c_int]
 _lib.WebRTC_APM_SetStreamDelayMs.restype = None
 
+# 按地址传参的同名函数对象（NumPy缓冲分块处理时直接传整数地址，不创建指针对象）
+_process_reverse_stream_addr = _lib['WebRTC_APM_ProcessReverseStream']
+_process_reverse_stream_addr.argtypes = [ctypes.c_void_p] * 5
+_process_reverse_stream_addr.restype = ctypes.c_int
+
+_process_stream_addr = _lib['WebRTC_APM_ProcessStream']
+_process_stream_addr.argtypes = [ctypes.c_void_p] * 5
+_process_stream_addr.restype = ctypes.c_int
+
+_SHORT_SIZE = ctypes.sizeof(ctypes.c_short)
+
+# 音频缓冲：ctypes数组/指针，或int16的C连续NumPy数组
+AudioBuffer = Union[ctypes.Array, 'ctypes._Pointer', np.ndarray]
+
+
+def _buffer_address(buffer: np.ndarray, min_samples: int, writable: bool) -> int:
+    """校验NumPy缓冲并返回数据地址。"""
+    if buffer.dtype != np.int16:
+        raise TypeError(f"音频缓冲必须为int16，实际为 {buffer.dtype}")
+    if not buffer.flags.c_contiguous:
+        raise ValueError("音频缓冲必须是C连续数组")
+    if writable and not buffer.flags.writeable:
+        raise ValueError("输出缓冲不可写")
+    if buffer.size < min_samples:
+        raise ValueError(f"音频缓冲长度不足: {buffer.size} < {min_samples}")
+    return buffer.ctypes.data
+
+
+def _as_argument(buffer: AudioBuffer, samples: Optional[int], writable: bool):
+    """把NumPy数组转换为地址，ctypes缓冲原样传递。"""
+    if isinstance(buffer, np.ndarray):
+        return _buffer_address(buffer, samples or 0, writable)
+    return buffer
+
 class WebRTCAudioProcessing:
     """WebRTC 音频处理的高级 Python 封装器。"""
     
@@ -260,6 +296,10 @@ class WebRTCAudioProcessing:
         self._handle = _lib.WebRTC_APM_Create()
         if not self._handle:
             raise RuntimeError("Failed to create WebRTC APM instance")
+        # 流配置句柄 -> 10ms块的样本数（采样率/100 × 声道数）
+        self._chunk_samples = {}
+        # 分块处理时丢弃的参考信号输出（按块长缓存）
+        self._scratch = {}
     
     def __del__(self):
         """清理资源。"""
@@ -279,11 +319,17 @@ class WebRTCAudioProcessing:
         config_handle = _lib.WebRTC_APM_CreateStreamConfig(sample_rate, num_channels)
         if not config_handle:
             raise RuntimeError("Failed to create stream config")
+        self._chunk_samples[config_handle] = sample_rate // 100 * num_channels
         return config_handle
     
     def destroy_stream_config(self, config_handle: int) -> None:
         """销毁流配置。"""
+        self._chunk_samples.pop(config_handle, None)
         _lib.WebRTC_APM_DestroyStreamConfig(config_handle)
+
+    def chunk_samples(self, config_handle: int) -> int:
+        """流配置对应的10ms块样本数（所有声道合计）。"""
+        return self._chunk_samples[config_handle]
     
     def apply_config(self, config: Config) -> int:
         """将配置应用到音频处理模块。
@@ -296,39 +342,105 @@ class WebRTCAudioProcessing:
         """
         return _lib.WebRTC_APM_ApplyConfig(self._handle, ctypes.byref(config))
     
-    def process_reverse_stream(self, src: ctypes.Array, src_config: int, 
-                             dest_config: int, dest: ctypes.Array) -> int:
+    def process_reverse_stream(self, src: AudioBuffer, src_config: int,
+                             dest_config: int, dest: AudioBuffer) -> int:
         """处理反向流（渲染/播放音频）。
         
         Args:
-            src: 源音频缓冲区
+            src: 源音频缓冲区（ctypes数组或int16 NumPy数组，NumPy数组按指针直接传递）
             src_config: 源流配置句柄
             dest_config: 目标流配置句柄
-            dest: 目标音频缓冲区
+            dest: 目标音频缓冲区（可为预分配的int16 NumPy数组）
             
         Returns:
             状态码（0表示成功）
         """
+        if isinstance(src, np.ndarray) or isinstance(dest, np.ndarray):
+            return _process_reverse_stream_addr(
+                self._handle,
+                _as_argument(src, self._chunk_samples.get(src_config), False),
+                src_config,
+                dest_config,
+                _as_argument(dest, self._chunk_samples.get(dest_config), True),
+            )
         return _lib.WebRTC_APM_ProcessReverseStream(
             self._handle, src, src_config, dest_config, dest
         )
     
-    def process_stream(self, src: ctypes.Array, src_config: int,
-                      dest_config: int, dest: ctypes.Array) -> int:
+    def process_stream(self, src: AudioBuffer, src_config: int,
+                      dest_config: int, dest: AudioBuffer) -> int:
         """处理采集流（麦克风音频）。
         
         Args:
-            src: 源音频缓冲区
+            src: 源音频缓冲区（ctypes数组或int16 NumPy数组，NumPy数组按指针直接传递）
             src_config: 源流配置句柄
             dest_config: 目标流配置句柄
-            dest: 目标音频缓冲区
+            dest: 目标音频缓冲区（可为预分配的int16 NumPy数组）
             
         Returns:
             状态码（0表示成功）
         """
+        if isinstance(src, np.ndarray) or isinstance(dest, np.ndarray):
+            return _process_stream_addr(
+                self._handle,
+                _as_argument(src, self._chunk_samples.get(src_config), False),
+                src_config,
+                dest_config,
+                _as_argument(dest, self._chunk_samples.get(dest_config), True),
+            )
         return _lib.WebRTC_APM_ProcessStream(
             self._handle, src, src_config, dest_config, dest
         )
+
+    def process_chunks(self, capture: np.ndarray, capture_config: int,
+                       dest: np.ndarray, reference: Optional[np.ndarray] = None,
+                       render_config: Optional[int] = None) -> int:
+        """一次调用处理整帧（20ms/60ms等）：逐个10ms块先送参考信号再处理采集信号。
+        
+        各块直接按地址偏移传入本地库，不切片、不拷贝。
+        
+        Args:
+            capture: 采集音频（int16，长度为10ms块的整数倍）
+            capture_config: 采集流配置句柄
+            dest: 处理结果输出（int16，长度不小于capture）
+            reference: 参考（播放）音频，长度与capture相同；为None时不送参考信号
+            render_config: 参考流配置句柄，提供reference时必填
+            
+        Returns:
+            状态码（0表示全部成功，否则为第一个失败块的错误码）
+        """
+        chunk = self._chunk_samples[capture_config]
+        total = capture.size
+        if total % chunk != 0:
+            raise ValueError(f"帧长 {total} 不是10ms块 {chunk} 的整数倍")
+
+        src = _buffer_address(capture, total, False)
+        out = _buffer_address(dest, total, True)
+        ref = ref_out = None
+        if reference is not None:
+            if render_config is None:
+                raise ValueError("提供参考信号时必须指定render_config")
+            ref = _buffer_address(reference, total, False)
+            scratch = self._scratch.get(chunk)
+            if scratch is None:
+                scratch = self._scratch[chunk] = np.zeros(chunk, dtype=np.int16)
+            ref_out = scratch.ctypes.data
+
+        result = 0
+        step = chunk * _SHORT_SIZE
+        for offset in range(0, total * _SHORT_SIZE, step):
+            if ref is not None:
+                status = _process_reverse_stream_addr(
+                    self._handle, ref + offset, render_config, render_config, ref_out
+                )
+                if status != 0 and result == 0:
+                    result = status
+            status = _process_stream_addr(
+                self._handle, src + offset, capture_config, capture_config, out + offset
+            )
+            if status != 0 and result == 0:
+                result = status
+        return result
     
     def set_stream_delay_ms(self, delay_ms: int) -> None:
         """设置流延迟（毫秒）。
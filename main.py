@@ -2,7 +2,6 @@ import argparse
 import asyncio
 import sys
 
-from src.application import Application
 from src.utils.logging_config import get_logger, setup_logging
 
 logger = get_logger(__name__)
@@ -30,6 +29,11 @@ def parse_args():
         action="store_true",
         help="跳过激活流程，直接启动应用（仅用于调试）",
     )
+    parser.add_argument(
+        "--calibrate-audio",
+        action="store_true",
+        help="重新运行音频性能校准（帧时长与Opus复杂度），结果保存到配置",
+    )
     return parser.parse_args()
 
 
@@ -73,7 +77,9 @@ async def start_app(mode: str, protocol: str, skip_activation: bool) -> int:
     else:
         logger.warning("跳过激活流程（调试模式）")
 
-    # 创建并启动应用程序
+    # 创建并启动应用程序（帧时长在导入时确定，需在性能校准之后导入）
+    from src.application import Application
+
     app = Application.get_instance()
     return await app.run(mode=mode, protocol=protocol)
 
@@ -84,6 +90,11 @@ if __name__ == "__main__":
         args = parse_args()
         setup_logging()
 
+        # 音频性能校准：首次启动或指定 --calibrate-audio 时运行
+        from src.audio_codecs.calibration import ensure_calibration
+
+        ensure_calibration(force=args.calibrate_audio)
+
         if args.mode == "gui":
             # 在GUI模式下，由main统一创建 QApplication 与 qasync 事件循环
             try:
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""回声延迟估计离线测试.
+
+用合成信号模拟回声路径：参考信号（类语音）经过指数衰减的房间冲激响应、
+固定延迟和衰减后叠加噪声（可选近端语音）作为麦克风信号，按帧喂给
+EchoDelayEstimator 并定期估计，检查：
+    - 平滑后的估计与真实延迟的误差不超过 --tolerance 毫秒
+    - 置信度不低于估计器阈值
+    - 参考信号静音时不产生估计
+
+任一用例失败时以非零状态退出。
+
+用法:
+    python scripts/aec_delay_test.py [--delays 10,40,80,150,250,400]
+        [--duration 8] [--tolerance 2] [--doubletalk]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.audio_codecs.delay_estimator import EchoDelayEstimator  # noqa: E402
+
+SAMPLE_RATE = 16000
+FRAME = 320  # 20ms
+
+
+def speech_like(duration: float, seed: int) -> np.ndarray:
+    """
+    基频缓慢变化的谐波信号加噪声，按音节包络调制.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(SAMPLE_RATE * duration)) / SAMPLE_RATE
+    pitch = 120 + 40 * np.sin(2 * np.pi * 0.3 * t + seed)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 25))
+    syllables = np.clip(np.sin(2 * np.pi * 3.5 * t + seed), 0, None) ** 0.5
+    signal = voiced * syllables + 0.3 * rng.standard_normal(len(t)) * syllables
+    return 6000 * signal / np.max(np.abs(signal))
+
+
+def room_response(seed: int, length_ms: int = 30) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = SAMPLE_RATE * length_ms // 1000
+    ir = 0.3 * rng.standard_normal(n) * np.exp(-np.arange(n) / (n / 5))
+    ir[0] = 1.0  # 直达声
+    return ir / np.sum(np.abs(ir))
+
+
+def make_echo(reference: np.ndarray, delay_ms: float, seed: int, doubletalk: bool):
+    delay = int(SAMPLE_RATE * delay_ms / 1000)
+    echo = np.convolve(reference, room_response(seed))[: len(reference)] * 0.5
+    capture = np.zeros_like(reference)
+    capture[delay:] = echo[: len(reference) - delay]
+    rng = np.random.default_rng(seed + 100)
+    capture += 50 * rng.standard_normal(len(capture))
+    if doubletalk:
+        capture += 0.25 * speech_like(len(reference) / SAMPLE_RATE, seed + 7)
+    return np.clip(capture, -32768, 32767).astype(np.int16)
+
+
+def run_case(reference: np.ndarray, capture: np.ndarray, interval: float):
+    estimator = EchoDelayEstimator(SAMPLE_RATE)
+    every = int(interval * SAMPLE_RATE / FRAME)
+    for i, start in enumerate(range(0, len(reference) - FRAME + 1, FRAME)):
+        estimator.feed(reference[start : start + FRAME], capture[start : start + FRAME])
+        if i % every == every - 1:
+            estimator.estimate()
+    return estimator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回声延迟估计离线测试")
+    parser.add_argument("--delays", default="10,40,80,150,250,400", help="真实延迟(毫秒)")
+    parser.add_argument("--duration", type=float, default=8.0, help="每个用例时长(秒)")
+    parser.add_argument("--interval", type=float, default=2.0, help="估计间隔(秒)")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="允许误差(毫秒)")
+    parser.add_argument("--doubletalk", action="store_true", help="叠加近端语音")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'真实(ms)':>9} {'估计(ms)':>9} {'原始(ms)':>9} {'置信度':>7} {'估计/拒绝':>9}  结果")
+
+    for seed, delay_ms in enumerate(float(v) for v in args.delays.split(",")):
+        reference = speech_like(args.duration, seed)
+        capture = make_echo(reference, delay_ms, seed, args.doubletalk)
+        estimator = run_case(reference.astype(np.int16), capture, args.interval)
+
+        estimate = estimator.delay_ms
+        ok = (
+            estimate is not None
+            and abs(estimate - delay_ms) <= args.tolerance
+            and estimator.confidence >= estimator.min_confidence
+        )
+        failed |= not ok
+        status = estimator.get_status()
+        print(
+            f"{delay_ms:9.1f} {estimate if estimate is not None else float('nan'):9.1f} "
+            f"{status['raw_delay_ms'] or float('nan'):9.1f} {status['confidence']:7.2f} "
+            f"{status['estimates']:>4}/{status['rejected']:<4}  {'通过' if ok else '失败'}"
+        )
+
+    # 参考静音：不应产生估计
+    silence = np.zeros(int(SAMPLE_RATE * args.duration), dtype=np.int16)
+    noise = make_echo(silence.astype(np.float64), 100, 0, False)
+    estimator = run_case(silence, noise, args.interval)
+    silent_ok = estimator.delay_ms is None
+    failed |= not silent_ok
+    print(f"参考静音用例: {'通过' if silent_ok else '失败（不应产生估计）'}")
+
+    print("结果: " + ("失败" if failed else "通过"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
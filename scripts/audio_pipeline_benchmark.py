@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""离线音频管线基准测试.
+
+使用文件设备后端（FileAudioBackend）替代PortAudio运行完整的 AudioCodec：
+麦克风输入来自WAV文件（或合成信号），编码后的Opus包回环写入播放路径，
+扬声器输出保存在内存。对每种设备采样率和帧长报告：
+    - 输入/输出回调耗时分位数（--stages 输出各阶段明细）
+    - Opus编码/解码吞吐（相对实时倍数）
+    - xrun次数（驱动层）和播放队列欠载次数
+
+用法:
+    python scripts/audio_pipeline_benchmark.py [--input speech.wav] [--realtime]
+        [--rates 16000,44100,48000] [--frame-ms 20,60] [--duration 5]
+        [--output-dir out/]
+
+说明:
+    默认按虚拟时钟尽快运行，适合测量回调耗时和编解码吞吐；
+    xrun和欠载次数只有在 --realtime 下才反映真实调度情况。
+    --realtime 下输入结束后停止录音并等待播放排空，超时视为失败（非零退出）。
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.opus_loader import setup_opus  # noqa: E402
+
+setup_opus()
+
+import opuslib  # noqa: E402
+
+from src.audio_codecs.audio_codec import AudioCodec  # noqa: E402
+from src.audio_codecs.file_audio_backend import (  # noqa: E402
+    FileAudioBackend,
+    load_wav,
+)
+from src.constants.constants import AudioConfig  # noqa: E402
+
+
+def synthesize_speech_like(sample_rate: int, duration: float) -> np.ndarray:
+    """
+    合成类语音测试信号：带4Hz音节包络的谐波 + 少量噪声.
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(int(sample_rate * duration)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    signal = 0.3 * voiced * envelope + 0.01 * rng.standard_normal(len(t))
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+
+def apply_frame_duration(frame_ms: int):
+    """
+    覆盖帧长配置（AudioCodec在创建时读取这些值）.
+    """
+    AudioConfig.FRAME_DURATION = frame_ms
+    AudioConfig.INPUT_FRAME_SIZE = int(AudioConfig.INPUT_SAMPLE_RATE * frame_ms / 1000)
+    AudioConfig.OUTPUT_FRAME_SIZE = int(
+        AudioConfig.OUTPUT_SAMPLE_RATE * frame_ms / 1000
+    )
+
+
+def measure_decode(packets) -> float:
+    """
+    用独立解码器测量每帧平均解码耗时（毫秒）.
+    """
+    if not packets:
+        return 0.0
+    decoder = opuslib.Decoder(AudioConfig.OUTPUT_SAMPLE_RATE, AudioConfig.CHANNELS)
+    start = time.perf_counter()
+    for packet in packets:
+        decoder.decode(packet, AudioConfig.OUTPUT_FRAME_SIZE)
+    return (time.perf_counter() - start) / len(packets) * 1000
+
+
+async def run_case(rate: int, frame_ms: int, source, args) -> dict:
+    apply_frame_duration(frame_ms)
+
+    if source is None:
+        backend = FileAudioBackend(
+            input_data=synthesize_speech_like(rate, args.duration),
+            input_sample_rate=rate,
+            realtime=args.realtime,
+        )
+    else:
+        backend = FileAudioBackend(
+            input_path=source, input_sample_rate=rate, realtime=args.realtime
+        )
+
+    codec = AudioCodec(device_backend=backend)
+    loop = asyncio.get_running_loop()
+    packets = []
+    downlink: asyncio.Queue = asyncio.Queue()
+
+    def on_encoded_batch(batch):
+        # 驱动线程（或编码工作线程）中调用
+        packets.extend(batch)
+        loop.call_soon_threadsafe(downlink.put_nowait, list(batch))
+
+    async def feed_downlink():
+        # 编码包回环写入播放路径，收到None（输入已停止）时结束
+        while True:
+            batch = await downlink.get()
+            if batch is None:
+                return
+            await codec.write_audio_batch([(p, None, None) for p in batch])
+
+    codec.set_encoded_audio_batch_callback(on_encoded_batch)
+    await codec.initialize()
+    feeder = asyncio.create_task(feed_downlink())
+
+    wall_start = time.perf_counter()
+    timeout = backend.input_duration() * 2 + 10
+    await loop.run_in_executor(None, backend.wait_input_finished, timeout)
+    # 输入结束后停止录音，否则后端持续送入静音并被回环到播放路径，播放永不排空
+    codec.input_stream.stop()
+    worker = codec._capture_worker
+    if worker is not None:
+        # 流水线模式：等待编码线程处理完已提交的帧
+        deadline = time.perf_counter() + 2.0
+        while time.perf_counter() < deadline:
+            queue = worker.get_stats()["queue"]
+            if worker.frames_processed + queue["overruns"] >= queue["put_count"]:
+                break
+            await asyncio.sleep(0.01)
+    # 已编码的包全部写入播放路径后回环结束
+    downlink.put_nowait(None)
+    await feeder
+    drained = True
+    if args.realtime:
+        drained = await codec.wait_for_audio_complete(timeout=5.0)
+    wall = time.perf_counter() - wall_start
+
+    await codec.stop_streams()
+
+    audio_stats = codec.get_audio_stats()
+    await codec.close()
+
+    if args.output_dir:
+        out_dir = Path(args.output_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        backend.save_output(out_dir / f"playback_{rate}_{frame_ms}ms.wav")
+
+    encode_ms = audio_stats["capture"]["encode"]["avg_ms"]
+    decode_ms = measure_decode(packets)
+    return {
+        "rate": rate,
+        "frame_ms": frame_ms,
+        "wall_s": wall,
+        "drained": drained,
+        "packets": len(packets),
+        "backend": backend.get_stats(),
+        "encode_ms": encode_ms,
+        "encode_x": frame_ms / encode_ms if encode_ms else 0.0,
+        "decode_ms": decode_ms,
+        "decode_x": frame_ms / decode_ms if decode_ms else 0.0,
+        "output_underruns": audio_stats["playback_underruns"],
+        "stages": {
+            "录音": audio_stats["capture"],
+            "播放": audio_stats["playback"],
+        },
+    }
+
+
+def print_report(results, realtime: bool):
+    mode = "实时" if realtime else "尽快"
+    print(f"\n驱动模式: {mode}")
+    header = (
+        f"{'采样率':>7} {'帧长':>5} | {'输入回调 p50/p99/max (ms)':>26} | "
+        f"{'输出回调 p50/p99/max (ms)':>26} | {'编码 x实时':>9} {'解码 x实时':>9} | "
+        f"{'xrun入/出':>9} {'欠载':>5}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        inp, out = r["backend"]["input"], r["backend"]["output"]
+        print(
+            f"{r['rate']:>7} {r['frame_ms']:>4}ms | "
+            f"{inp.get('p50_ms', 0):7.3f}/{inp.get('p99_ms', 0):7.3f}/"
+            f"{inp.get('max_ms', 0):7.3f}    | "
+            f"{out.get('p50_ms', 0):7.3f}/{out.get('p99_ms', 0):7.3f}/"
+            f"{out.get('max_ms', 0):7.3f}    | "
+            f"{r['encode_x']:9.0f} {r['decode_x']:9.0f} | "
+            f"{inp['xruns']:>4}/{out['xruns']:<4} {r['output_underruns']:>5}"
+        )
+
+
+def print_stages(results):
+    print("\n各阶段耗时 avg/p99/max (ms)")
+    for r in results:
+        print(f"{r['rate']}Hz/{r['frame_ms']}ms")
+        for path, stages in r["stages"].items():
+            parts = [
+                f"{name} {s['avg_ms']:.3f}/{s['p99_ms']:.3f}/{s['max_ms']:.3f}"
+                for name, s in stages.items()
+                if s["count"]
+            ]
+            print(f"  {path}: " + " | ".join(parts))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="离线音频管线基准")
+    parser.add_argument("--input", help="输入WAV文件（16位PCM），默认使用合成信号")
+    parser.add_argument(
+        "--rates", default="16000,44100,48000", help="设备采样率列表，逗号分隔"
+    )
+    parser.add_argument("--frame-ms", default="20,60", help="帧长列表(毫秒)，逗号分隔")
+    parser.add_argument("--duration", type=float, default=5.0, help="合成信号时长(秒)")
+    parser.add_argument("--realtime", action="store_true", help="按实时节拍驱动回调")
+    parser.add_argument("--output-dir", help="保存播放输出WAV的目录")
+    parser.add_argument("--stages", action="store_true", help="输出各阶段耗时明细")
+    args = parser.parse_args()
+
+    source = None
+    if args.input:
+        source = Path(args.input)
+        _, file_rate = load_wav(source)
+        print(f"输入文件: {source} ({file_rate}Hz)")
+
+    rates = [int(r) for r in args.rates.split(",")]
+    frames = [int(f) for f in args.frame_ms.split(",")]
+
+    results = []
+    for rate in rates:
+        for frame_ms in frames:
+            result = await run_case(rate, frame_ms, source, args)
+            status = "" if result["drained"] else "，失败: 播放未在超时内排空"
+            print(
+                f"完成 {rate}Hz/{frame_ms}ms: {result['packets']} 包, "
+                f"耗时 {result['wall_s']:.2f}s{status}"
+            )
+            results.append(result)
+
+    print_report(results, args.realtime)
+    if args.stages:
+        print_stages(results)
+
+    failed = [r for r in results if not r["drained"]]
+    if failed:
+        cases = ", ".join(f"{r['rate']}Hz/{r['frame_ms']}ms" for r in failed)
+        print(f"\n失败: 以下用例播放未排空: {cases}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
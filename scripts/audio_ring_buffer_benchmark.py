@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""重采样缓冲区微基准测试.
+
+对比 AudioCodec 重采样路径中旧的 deque 逐样本实现与 AudioRingBuffer
+批量切片实现的单次回调耗时（仅缓冲区操作，可选包含 soxr 重采样）。
+
+用法:
+    python scripts/audio_ring_buffer_benchmark.py [--rate 48000] [--frame-ms 20]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.audio_codecs.ring_buffer import AudioRingBuffer  # noqa: E402
+
+TARGET_RATE = 16000
+
+
+def make_resampler(device_rate: int, use_soxr: bool):
+    if not use_soxr:
+        return None
+    try:
+        import soxr
+    except ImportError:
+        print("未安装 soxr，跳过重采样部分")
+        return None
+    return soxr.ResampleStream(device_rate, TARGET_RATE, 1, dtype="int16", quality="QQ")
+
+
+def resample(resampler, chunk: np.ndarray, step: int) -> np.ndarray:
+    if resampler is None:
+        # 无soxr时简单抽取，保证缓冲区输入规模一致
+        return chunk[::step]
+    return resampler.resample_chunk(chunk, last=False)
+
+
+def run_deque(chunks, frame_size, resampler, step):
+    buffer = deque()
+    timings = []
+    for chunk in chunks:
+        start = time.perf_counter()
+        data = resample(resampler, chunk, step)
+        if len(data) > 0:
+            buffer.extend(data.astype(np.int16))
+        if len(buffer) >= frame_size:
+            frame_data = []
+            for _ in range(frame_size):
+                frame_data.append(buffer.popleft())
+            np.array(frame_data, dtype=np.int16)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_ring(chunks, frame_size, resampler, step):
+    buffer = AudioRingBuffer(frame_size * 8)
+    timings = []
+    for chunk in chunks:
+        start = time.perf_counter()
+        data = resample(resampler, chunk, step)
+        if len(data) > 0:
+            buffer.write(data)
+        buffer.read(frame_size)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name, timings):
+    us = sorted(t * 1e6 for t in timings)
+    p99 = us[int(len(us) * 0.99) - 1]
+    print(
+        f"{name:<12} 平均 {statistics.mean(us):8.1f} us | "
+        f"中位数 {statistics.median(us):8.1f} us | p99 {p99:8.1f} us"
+    )
+    return statistics.mean(us)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重采样缓冲区微基准")
+    parser.add_argument("--rate", type=int, default=48000, help="设备采样率")
+    parser.add_argument("--frame-ms", type=int, default=20, help="帧长(毫秒)")
+    parser.add_argument("--iterations", type=int, default=2000, help="回调次数")
+    parser.add_argument(
+        "--no-soxr", action="store_true", help="仅测试缓冲区操作，不包含重采样"
+    )
+    args = parser.parse_args()
+
+    device_frame = args.rate * args.frame_ms // 1000
+    frame_size = TARGET_RATE * args.frame_ms // 1000
+    step = max(1, args.rate // TARGET_RATE)
+
+    rng = np.random.default_rng(0)
+    chunks = [
+        rng.integers(-3000, 3000, device_frame, dtype=np.int16)
+        for _ in range(args.iterations)
+    ]
+
+    print(
+        f"设备采样率 {args.rate}Hz, 帧长 {args.frame_ms}ms, "
+        f"回调 {args.iterations} 次"
+    )
+    before = report(
+        "deque",
+        run_deque(chunks, frame_size, make_resampler(args.rate, not args.no_soxr), step),
+    )
+    after = report(
+        "ring_buffer",
+        run_ring(chunks, frame_size, make_resampler(args.rate, not args.no_soxr), step),
+    )
+    print(f"加速比: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
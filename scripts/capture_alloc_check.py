@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""录音回调内存分配回归检查.
+
+用文件设备后端初始化 AudioCodec 后停止驱动线程，直接调用 _input_callback
+处理合成麦克风数据，通过 tracemalloc 统计：
+    - 每次回调的峰值临时分配（回调前重置峰值，回调内分配后即释放的临时数组
+      也会计入）；流水线模式下等待编码线程处理完该帧，包含其分配
+    - 结束后仍被持有的净增长（泄漏/队列持有的新对象）
+    - 净增长最多的代码位置
+    - 交付的编码包数是否与回调帧数一致（不含预热）
+
+每次回调的临时分配预算 = 必需分配（soxr输出数组、Opus结果包，单独测量）
++ 解释器开销余量 + 半个设备帧：回调内任何整帧拷贝（copy/flatten/astype/
+tobytes）都会超出预算。超出预算或包数不符时以非零状态退出，可用于CI回归。
+
+用法:
+    python scripts/capture_alloc_check.py [--callbacks 10000] [--rate 16000]
+        [--pipelined]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.opus_loader import setup_opus  # noqa: E402
+
+setup_opus()
+
+from src.audio_codecs.audio_codec import AudioCodec  # noqa: E402
+from src.audio_codecs.file_audio_backend import FileAudioBackend  # noqa: E402
+from src.audio_codecs.resampler import create_resampler, resampler_options  # noqa: E402
+from src.constants.constants import AudioConfig  # noqa: E402
+
+# 每次回调临时分配中解释器开销（栈帧、浮点数、绑定方法等）的余量（字节）
+INTERPRETER_SLACK = 512
+# 净增长预算（字节）
+NET_GROWTH_BUDGET = 16 * 1024
+# 重采样延迟导致的包数允许误差
+PACKET_TOLERANCE = 2
+
+
+def make_chunks(rate: int, count: int = 50):
+    """
+    预先生成少量输入块循环使用，避免测试本身在循环中分配.
+    """
+    frame = int(rate * AudioConfig.FRAME_DURATION / 1000)
+    rng = np.random.default_rng(0)
+    t = np.arange(frame * count) / rate
+    signal = 8000 * np.sin(2 * np.pi * 220 * t) + 500 * rng.standard_normal(len(t))
+    return [
+        np.ascontiguousarray(chunk.reshape(-1, 1))
+        for chunk in np.split(signal.astype(np.int16), count)
+    ]
+
+
+def measure_required_allocation(codec, chunk: np.ndarray) -> int:
+    """
+    用同参数的独立重采样器测量每帧重采样输出的峰值分配（无需重采样时为0）.
+    """
+    if codec.input_resampler is None:
+        return 0
+    resampler = create_resampler(
+        codec.device_input_sample_rate,
+        AudioConfig.INPUT_SAMPLE_RATE,
+        **resampler_options(codec.config),
+    )
+    samples = chunk.reshape(-1)
+    for _ in range(10):
+        resampler.resample_chunk(samples, last=False)
+
+    tracemalloc.start(1)
+    required = 0
+    for _ in range(20):
+        tracemalloc.reset_peak()
+        start_size = tracemalloc.get_traced_memory()[0]
+        resampler.resample_chunk(samples, last=False)
+        required = max(required, tracemalloc.get_traced_memory()[1] - start_size)
+    tracemalloc.stop()
+    return required
+
+
+async def run(args) -> int:
+    backend = FileAudioBackend(input_sample_rate=args.rate)
+    codec = AudioCodec(device_backend=backend)
+    codec._pipelined_capture = args.pipelined
+
+    delivered = [0]
+
+    def on_encoded_batch(packets):
+        delivered[0] += len(packets)
+
+    codec.set_encoded_audio_batch_callback(on_encoded_batch)
+    await codec.initialize()
+    # 停止驱动线程，回调由本脚本直接调用
+    await codec.stop_streams()
+
+    chunks = make_chunks(args.rate)
+    frames = len(chunks[0])
+    callback = codec._input_callback
+
+    # 模拟唤醒词消费者：注册麦克风读端，读入预分配缓冲
+    reader = codec.register_mic_consumer("alloc_check", AudioConfig.INPUT_FRAME_SIZE)
+    frame_out = np.zeros(AudioConfig.INPUT_FRAME_SIZE, dtype=np.int16)
+
+    def drain():
+        while reader.read(out=frame_out) is not None:
+            pass
+
+    worker = codec._capture_worker
+    if worker is not None:
+        # 等待停止前驱动线程提交的帧处理完，之后只计本脚本提交的帧
+        time.sleep(0.2)
+        processed_target = worker.frames_processed
+
+    def wait_processed(target: int):
+        """
+        流水线模式：等待编码线程处理并交付已提交的帧.
+        """
+        deadline = time.perf_counter() + 1.0
+        while worker.frames_processed < target:
+            if time.perf_counter() > deadline:
+                raise RuntimeError("编码线程处理超时")
+            time.sleep(0)
+
+    def run_callbacks(count: int, peaks=None):
+        nonlocal processed_target
+        for i in range(count):
+            if peaks is not None:
+                tracemalloc.reset_peak()
+                start_size = tracemalloc.get_traced_memory()[0]
+            callback(chunks[i % len(chunks)], frames, None, None)
+            if worker is not None:
+                processed_target += 1
+                wait_processed(processed_target)
+            if peaks is not None:
+                peaks[i] = tracemalloc.get_traced_memory()[1] - start_size
+            if i % 50 == 49:
+                drain()
+
+    # 预热：填满各级队列和内部缓存
+    run_callbacks(500)
+    drain()
+
+    required = measure_required_allocation(codec, chunks[0])
+    packet_sizes = []
+    codec.set_encoded_audio_batch_callback(
+        lambda packets: packet_sizes.extend(len(p) for p in packets)
+    )
+    run_callbacks(50)
+    packet_bytes = max(packet_sizes) + sys.getsizeof(b"")
+    codec.set_encoded_audio_batch_callback(on_encoded_batch)
+
+    delivered[0] = 0
+    peaks = np.zeros(args.callbacks, dtype=np.int64)
+    tracemalloc.start(10)
+    before = tracemalloc.take_snapshot()
+    base, _ = tracemalloc.get_traced_memory()
+
+    start = time.perf_counter()
+    run_callbacks(args.callbacks, peaks)
+    elapsed = time.perf_counter() - start
+    drain()
+
+    current, _ = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    codec.unregister_mic_consumer(reader)
+    await codec.close()
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), "lineno"
+    )
+
+    net_growth = current - base
+    frame_bytes = chunks[0].nbytes
+    peak_budget = required + packet_bytes + INTERPRETER_SLACK + frame_bytes // 2
+    peaks.sort()
+    over_budget = int(np.count_nonzero(peaks > peak_budget))
+
+    # 每次回调为一个帧时长的设备样本，对应一个16kHz编码帧
+    expected = args.callbacks
+    packets_ok = abs(delivered[0] - expected) <= PACKET_TOLERANCE
+
+    mode = "流水线" if args.pipelined else "直接"
+    print(
+        f"设备采样率 {args.rate}Hz, 帧长 {AudioConfig.FRAME_DURATION}ms, "
+        f"{mode}模式, 回调 {args.callbacks} 次"
+    )
+    print(f"编码包: {delivered[0]} 个 (预期 {expected})")
+    print(f"平均回调耗时: {elapsed / args.callbacks * 1e6:.1f} us")
+    print(
+        f"单次回调临时分配: 中位 {peaks[len(peaks) // 2]} B, 最大 {peaks[-1]} B, "
+        f"超出预算 {over_budget} 次"
+    )
+    print(
+        f"  预算 {peak_budget} B = 重采样 {required} B + 结果包 {packet_bytes} B "
+        f"+ 余量 {INTERPRETER_SLACK} B + 半帧 {frame_bytes // 2} B"
+    )
+    print(f"净增长: {net_growth / 1024:.1f} KiB (预算 {NET_GROWTH_BUDGET // 1024} KiB)")
+    print("净增长最多的位置:")
+    for stat in diff[:5]:
+        if stat.size_diff <= 0:
+            break
+        print(f"  {stat}")
+
+    failed = over_budget > 0 or net_growth > NET_GROWTH_BUDGET
+    if not packets_ok:
+        print("结果: 编码包数与回调帧数不符")
+        return 1
+    print("结果: " + ("超出预算" if failed else "通过"))
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="录音回调内存分配回归检查")
+    parser.add_argument("--callbacks", type=int, default=10000, help="回调次数")
+    parser.add_argument("--rate", type=int, default=16000, help="设备采样率")
+    parser.add_argument("--pipelined", action="store_true", help="流水线采集模式")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
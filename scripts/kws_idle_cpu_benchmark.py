@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""唤醒词检测空闲CPU占用测试.
+
+对比旧的 5ms 轮询检测循环与事件驱动的 KeywordSpotterWorker 在以下状态下的
+CPU占用和 accept_waveform 调用频率：
+    - listening: 录音持续写入静音帧（麦克风打开、无人说话）
+    - paused: 检测暂停（如对话进行中），录音仍在写入
+
+麦克风数据由后台线程按实时节奏写入 MicrophoneTap，单独测量其开销作为基线，
+结果中的CPU占用已扣除基线（单核百分比）。检测器为计数用的空检测器，
+只体现调度与调用次数的差异；真实模型每次 accept_waveform 还有特征提取开销，
+批量送入的收益更大。
+
+用法:
+    python scripts/kws_idle_cpu_benchmark.py [--seconds 5] [--frame-ms 20]
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.audio_codecs.mic_tap import MicrophoneTap  # noqa: E402
+from src.audio_processing.kws_worker import KeywordSpotterWorker  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+class CountingStream:
+    def __init__(self):
+        self.pending = 0
+        self.accept_calls = 0
+
+    def accept_waveform(self, sample_rate, waveform):
+        self.pending += len(waveform)
+        self.accept_calls += 1
+
+
+class NullSpotter:
+    """
+    与 sherpa_onnx.KeywordSpotter 接口相同、不做计算的检测器.
+    """
+
+    CHUNK = SAMPLE_RATE // 10
+
+    def create_stream(self):
+        return CountingStream()
+
+    def is_ready(self, stream) -> bool:
+        return stream.pending >= self.CHUNK
+
+    def decode_stream(self, stream):
+        stream.pending -= self.CHUNK
+
+    def get_result(self, stream):
+        return ""
+
+    def reset_stream(self, stream):
+        stream.pending = 0
+
+
+def start_feeder(tap: MicrophoneTap, frame_ms: int, stop: threading.Event):
+    """
+    后台线程按实时节奏写入静音帧.
+    """
+    silence = np.zeros(SAMPLE_RATE * frame_ms // 1000, dtype=np.int16)
+
+    def run():
+        next_time = time.perf_counter()
+        while not stop.is_set():
+            tap.write(silence)
+            next_time += frame_ms / 1000
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+async def run_polling(spotter, stream, reader, state):
+    """
+    旧实现：每 5ms 处理最多 3 帧，暂停时每 100ms 检查一次.
+    """
+    frame = np.zeros(reader.frame_size, dtype=np.int16)
+    waveform = np.zeros(reader.frame_size, dtype=np.float32)
+    while state["running"]:
+        if state["paused"]:
+            await asyncio.sleep(0.1)
+            continue
+        fed = False
+        for _ in range(3):
+            if reader.read(out=frame) is None:
+                break
+            np.multiply(frame, 1 / 32768.0, out=waveform)
+            stream.accept_waveform(sample_rate=SAMPLE_RATE, waveform=waveform)
+            fed = True
+        if fed:
+            while spotter.is_ready(stream):
+                spotter.decode_stream(stream)
+                if spotter.get_result(stream):
+                    spotter.reset_stream(stream)
+                    break
+        await asyncio.sleep(0.005)
+
+
+async def measure(mode: str, paused: bool, args) -> dict:
+    tap = MicrophoneTap(SAMPLE_RATE, SAMPLE_RATE * 2)
+    reader = tap.register("kws", SAMPLE_RATE * args.frame_ms // 1000)
+    spotter = NullSpotter()
+    stream = spotter.create_stream()
+    stop = threading.Event()
+    feeder = start_feeder(tap, args.frame_ms, stop)
+
+    state = {"running": True, "paused": paused}
+    task = worker = None
+    if mode == "polling":
+        task = asyncio.create_task(run_polling(spotter, stream, reader, state))
+    elif mode == "event":
+        worker = KeywordSpotterWorker(
+            spotter, stream, reader, SAMPLE_RATE, on_result=lambda result: None
+        )
+        worker.start()
+        if paused:
+            worker.pause()
+
+    # 预热后开始计时
+    await asyncio.sleep(0.5)
+    calls_start = stream.accept_calls
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.sleep(args.seconds)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    calls = stream.accept_calls - calls_start
+
+    state["running"] = False
+    if task:
+        await task
+    if worker:
+        worker.stop()
+    stop.set()
+    feeder.join(timeout=1)
+    return {"cpu": cpu / wall * 100, "calls": calls / wall}
+
+
+async def main_async(args):
+    print(
+        f"每项测量 {args.seconds}s，帧时长 {args.frame_ms}ms，"
+        f"CPU占用已扣除录音写入基线（单核%）\n"
+    )
+    baseline = (await measure("baseline", False, args))["cpu"]
+    print(f"基线（仅录音写入）: {baseline:.2f}%\n")
+
+    print(f"{'方式':<10}{'状态':<12}{'CPU(%)':>10}{'accept次/秒':>14}")
+    for mode in ("polling", "event"):
+        for paused in (False, True):
+            result = await measure(mode, paused, args)
+            state = "paused" if paused else "listening"
+            print(
+                f"{mode:<10}{state:<12}{max(0.0, result['cpu'] - baseline):>10.2f}"
+                f"{result['calls']:>14.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="唤醒词检测空闲CPU占用测试")
+    parser.add_argument("--seconds", type=float, default=5.0, help="每项测量时长")
+    parser.add_argument("--frame-ms", type=int, default=20, help="录音帧时长")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
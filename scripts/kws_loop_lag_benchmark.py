@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""唤醒词检测对事件循环延迟的影响测试.
+
+对比两种运行方式下 asyncio 事件循环的调度延迟：
+    - inline: 旧实现，在事件循环中按 5ms 轮询读帧、送入并解码
+    - worker: KeywordSpotterWorker，在独立线程中解码，只把结果投递回事件循环
+
+麦克风数据由后台线程按实时节奏写入 MicrophoneTap。探测协程以固定间隔
+sleep，记录实际唤醒时间超出预期的部分（p50/p99/max）。
+
+默认使用合成关键词检测器：每 100ms 音频就绪一次，解码为一次耗时
+约为指定时间的 numpy 矩阵乘（与 sherpa-onnx 一样在计算期间释放GIL）。安装了
+sherpa-onnx 时可用 --model-dir 指定模型目录改用真实模型。
+
+用法:
+    python scripts/kws_loop_lag_benchmark.py [--seconds 5] [--decode-ms 8]
+        [--model-dir models] [--mode both|inline|worker]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 与 KeywordSpotter(num_threads=1) 一致，合成解码只占一个核
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+import numpy as np  # noqa: E402
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.audio_codecs.mic_tap import MicrophoneTap  # noqa: E402
+from src.audio_processing.kws_worker import KeywordSpotterWorker  # noqa: E402
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20
+PROBE_INTERVAL = 0.005
+
+
+class SyntheticStream:
+    def __init__(self):
+        self.pending = 0
+
+    def accept_waveform(self, sample_rate, waveform):
+        self.pending += len(waveform)
+
+
+class SyntheticSpotter:
+    """
+    与 sherpa_onnx.KeywordSpotter 接口相同的合成检测器.
+    """
+
+    # 每次解码覆盖的音频样本数
+    CHUNK = SAMPLE_RATE // 10
+
+    def __init__(self, decode_ms: float):
+        # 选择矩阵大小使单次矩阵乘约耗时 decode_ms（整个调用期间不持有GIL）
+        size = 128
+        while size < 4096 and self._time_matmul(size * 2) * 1000 < decode_ms:
+            size *= 2
+        scale = (decode_ms / 1000 / self._time_matmul(size)) ** (1 / 3)
+        size = max(16, int(size * scale))
+        self._a = np.random.default_rng(0).standard_normal((size, size)).astype(
+            np.float32
+        )
+        self._out = np.empty_like(self._a)
+        self.decode_ms = self._time_matmul(size) * 1000
+
+    @staticmethod
+    def _time_matmul(size: int) -> float:
+        a = np.ones((size, size), dtype=np.float32)
+        np.matmul(a, a)
+        start = time.perf_counter()
+        np.matmul(a, a)
+        return time.perf_counter() - start
+
+    def create_stream(self):
+        return SyntheticStream()
+
+    def is_ready(self, stream) -> bool:
+        return stream.pending >= self.CHUNK
+
+    def decode_stream(self, stream):
+        stream.pending -= self.CHUNK
+        np.matmul(self._a, self._a, out=self._out)
+
+    def get_result(self, stream):
+        return ""
+
+    def reset_stream(self, stream):
+        stream.pending = 0
+
+
+def create_spotter(args):
+    if not args.model_dir:
+        return SyntheticSpotter(args.decode_ms), "synthetic"
+    try:
+        import sherpa_onnx
+    except ImportError:
+        print("未安装 sherpa-onnx，改用合成检测器")
+        return SyntheticSpotter(args.decode_ms), "synthetic"
+
+    model_dir = Path(args.model_dir)
+    spotter = sherpa_onnx.KeywordSpotter(
+        tokens=str(model_dir / "tokens.txt"),
+        encoder=str(model_dir / "encoder.onnx"),
+        decoder=str(model_dir / "decoder.onnx"),
+        joiner=str(model_dir / "joiner.onnx"),
+        keywords_file=str(model_dir / "keywords.txt"),
+        num_threads=1,
+        sample_rate=SAMPLE_RATE,
+        feature_dim=80,
+    )
+    return spotter, "sherpa-onnx"
+
+
+def start_feeder(tap: MicrophoneTap, stop: threading.Event) -> threading.Thread:
+    """
+    后台线程按实时节奏写入类语音噪声帧.
+    """
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    rng = np.random.default_rng(1)
+    frames = [(2000 * rng.standard_normal(frame)).astype(np.int16) for _ in range(50)]
+
+    def run():
+        next_time = time.perf_counter()
+        index = 0
+        while not stop.is_set():
+            tap.write(frames[index % len(frames)])
+            index += 1
+            next_time += FRAME_MS / 1000
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+async def probe_lag(seconds: float):
+    lags = []
+    loop = asyncio.get_running_loop()
+    end = loop.time() + seconds
+    while loop.time() < end:
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+    return lags
+
+
+async def run_inline(spotter, reader, running):
+    """
+    旧实现：事件循环中每 5ms 处理最多 3 帧并解码.
+    """
+    stream = spotter.create_stream()
+    frame = np.zeros(reader.frame_size, dtype=np.int16)
+    waveform = np.zeros(reader.frame_size, dtype=np.float32)
+    decodes = 0
+    while running():
+        fed = False
+        for _ in range(3):
+            if reader.read(out=frame) is None:
+                break
+            np.multiply(frame, 1 / 32768.0, out=waveform)
+            stream.accept_waveform(sample_rate=SAMPLE_RATE, waveform=waveform)
+            fed = True
+        if fed:
+            while spotter.is_ready(stream):
+                spotter.decode_stream(stream)
+                decodes += 1
+                if spotter.get_result(stream):
+                    spotter.reset_stream(stream)
+                    break
+        await asyncio.sleep(0.005)
+    return decodes
+
+
+async def measure(mode: str, spotter, seconds: float) -> dict:
+    tap = MicrophoneTap(SAMPLE_RATE, SAMPLE_RATE * 2)
+    reader = tap.register("kws", SAMPLE_RATE * FRAME_MS // 1000)
+    stop = threading.Event()
+    feeder = start_feeder(tap, stop)
+
+    if mode == "inline":
+        task = asyncio.create_task(
+            run_inline(spotter, reader, lambda: not stop.is_set())
+        )
+        lags = await probe_lag(seconds)
+        stop.set()
+        decodes = await task
+    else:
+        worker = KeywordSpotterWorker(
+            spotter,
+            spotter.create_stream(),
+            reader,
+            SAMPLE_RATE,
+            on_result=lambda result: None,
+        )
+        worker.start()
+        lags = await probe_lag(seconds)
+        stop.set()
+        worker.stop()
+        stats = worker.get_stats()
+        decodes = stats["stages"].get("decode", {}).get("count", 0)
+
+    feeder.join(timeout=1)
+    lags.sort()
+    return {
+        "mode": mode,
+        "decodes": decodes,
+        "p50": statistics.median(lags),
+        "p99": lags[int(len(lags) * 0.99) - 1],
+        "max": lags[-1],
+    }
+
+
+async def main_async(args):
+    spotter, kind = create_spotter(args)
+    print(f"检测器: {kind}", end="")
+    if kind == "synthetic":
+        print(f"（每次解码约 {spotter.decode_ms:.1f}ms）", end="")
+    print(f"，每种方式测量 {args.seconds}s，探测间隔 {PROBE_INTERVAL * 1000:.0f}ms\n")
+
+    modes = ["inline", "worker"] if args.mode == "both" else [args.mode]
+    print(f"{'方式':<8}{'解码次数':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+    for mode in modes:
+        result = await measure(mode, spotter, args.seconds)
+        print(
+            f"{result['mode']:<8}{result['decodes']:>10}{result['p50']:>10.2f}"
+            f"{result['p99']:>10.2f}{result['max']:>10.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="唤醒词检测事件循环延迟测试")
+    parser.add_argument("--seconds", type=float, default=5.0, help="每种方式的测量时长")
+    parser.add_argument(
+        "--decode-ms", type=float, default=8.0, help="合成检测器每次解码的CPU时间"
+    )
+    parser.add_argument("--model-dir", help="sherpa-onnx 关键词模型目录（可选）")
+    parser.add_argument("--mode", choices=["both", "inline", "worker"], default="both")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""重采样后端基准与质量检查.
+
+对每个测试信号和采样率组合，以帧为单位流式运行各重采样后端，报告：
+    - 每帧平均耗时与相对实时倍数
+    - 相对 soxr HQ 整段重采样结果的信噪比（自动对齐各后端的群延迟）
+
+多相后端仅适用于整数倍率；auto 行为 create_resampler(backend="auto") 实测后
+选中的后端。多相结果信噪比低于 --min-snr 时以非零状态退出。
+
+用法:
+    python scripts/resampler_benchmark.py [--input a.wav b.wav]
+        [--pairs 48000:16000,24000:48000,16000:48000,44100:16000]
+        [--frame-ms 20] [--duration 10] [--min-snr 30]
+
+说明:
+    不指定 --input 时使用合成信号（类语音谐波和对数扫频）；
+    录音文件的采样率与测试输入不同时，先用 soxr VHQ 转换到输入采样率。
+
+录音夹具:
+    仓库不附带录音文件（体积和授权原因），需自行准备16位PCM WAV，例如：
+    - 在目标设备上录制一段说话，如 Linux 下
+      arecord -f S16_LE -r 48000 -c 1 -d 10 speech_48k.wav
+    - 从公开语音语料（如 LibriSpeech、AISHELL-1）截取片段，
+      用 sox in.flac -b 16 -c 1 out.wav 转为16位PCM单声道
+    建议至少包含一段48kHz录音（设备原生采样率）和一段16kHz录音（服务端采样率），
+    并包含静音与清辅音段，高频成分更能体现各后端通带边缘的差异。
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import soxr
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.audio_codecs.file_audio_backend import load_wav  # noqa: E402
+from src.audio_codecs.resampler import (  # noqa: E402
+    PolyphaseResampler,
+    create_resampler,
+    describe_resampler,
+    integer_ratio,
+)
+
+SOXR_PRESETS = ("QQ", "LQ", "MQ", "HQ")
+# 对齐搜索范围（输出采样点）
+MAX_LAG = 256
+
+
+def speech_like(rate: int, duration: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(rate * duration)) / rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 20))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    signal = 0.25 * voiced * envelope + 0.01 * rng.standard_normal(len(t))
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+
+def sweep(rate: int, duration: float, top: float) -> np.ndarray:
+    t = np.arange(int(rate * duration)) / rate
+    f0, f1 = 50.0, top
+    k = np.log(f1 / f0) / duration
+    phase = 2 * np.pi * f0 * (np.exp(k * t) - 1) / k
+    return (0.5 * np.sin(phase) * 32767).astype(np.int16)
+
+
+def run_stream(resampler, signal: np.ndarray, frame: int):
+    chunks = []
+    elapsed = 0.0
+    count = 0
+    for start in range(0, len(signal), frame):
+        chunk = signal[start : start + frame]
+        t0 = time.perf_counter()
+        out = resampler.resample_chunk(chunk, last=False)
+        elapsed += time.perf_counter() - t0
+        chunks.append(np.asarray(out, dtype=np.float64))
+        count += 1
+    chunks.append(np.asarray(resampler.resample_chunk(signal[:0], last=True), float))
+    return np.concatenate(chunks), elapsed / max(count, 1)
+
+
+def snr_db(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """
+    按互相关对齐后计算信噪比，去掉首尾各 MAX_LAG*2 个点.
+    """
+    n = min(len(reference), len(candidate)) - MAX_LAG
+    edge = MAX_LAG * 2
+    if n <= edge * 2:
+        return float("nan")
+    ref = reference[edge : n - edge]
+    best = None
+    for lag in range(0, MAX_LAG):
+        cand = candidate[edge + lag : n - edge + lag]
+        err = np.sum((ref - cand) ** 2)
+        if best is None or err < best:
+            best = err
+    power = np.sum(ref**2)
+    if best == 0:
+        return float("inf")
+    return 10 * np.log10(power / best)
+
+
+def load_fixtures(paths, in_rate: int, out_rate: int, duration: float):
+    if not paths:
+        # 扫频上限低于两侧奈奎斯特频率，避免比较各后端的阻带差异
+        top = 0.4 * min(in_rate, out_rate)
+        return [
+            ("speech", speech_like(in_rate, duration)),
+            ("sweep", sweep(in_rate, duration, top)),
+        ]
+
+    fixtures = []
+    for path in paths:
+        data, rate = load_wav(Path(path))
+        if data.ndim > 1:
+            data = data.mean(axis=1).astype(np.int16)
+        if rate != in_rate:
+            data = soxr.resample(data, rate, in_rate, quality="VHQ").astype(np.int16)
+        fixtures.append((Path(path).stem, data))
+    return fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重采样后端基准与质量检查")
+    parser.add_argument("--input", nargs="*", help="录音WAV文件（16位PCM）")
+    parser.add_argument(
+        "--pairs",
+        default="48000:16000,24000:48000,16000:48000,44100:16000",
+        help="输入:输出采样率列表，逗号分隔",
+    )
+    parser.add_argument("--frame-ms", type=int, default=20, help="帧长(毫秒)")
+    parser.add_argument("--duration", type=float, default=10.0, help="合成信号时长(秒)")
+    parser.add_argument("--taps", type=int, default=32, help="多相滤波器每相抽头数")
+    parser.add_argument(
+        "--min-snr", type=float, default=30.0, help="多相后端最低信噪比(dB)"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    header = (
+        f"{'信号':<10} {'采样率':>13} {'后端':<22} "
+        f"{'us/帧':>8} {'x实时':>8} {'SNR(dB)':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    for pair in args.pairs.split(","):
+        in_rate, out_rate = (int(v) for v in pair.split(":"))
+        frame = int(in_rate * args.frame_ms / 1000)
+        fixtures = load_fixtures(args.input, in_rate, out_rate, args.duration)
+        for name, signal in fixtures:
+            reference = soxr.resample(
+                signal.astype(np.float64), in_rate, out_rate, quality="HQ"
+            )
+
+            backends = [
+                (f"soxr-{q}", create_resampler(in_rate, out_rate, quality=q))
+                for q in SOXR_PRESETS
+            ]
+            if integer_ratio(in_rate, out_rate)[0] is not None:
+                backends.append(
+                    (
+                        "polyphase",
+                        PolyphaseResampler(in_rate, out_rate, taps_per_phase=args.taps),
+                    )
+                )
+            auto = create_resampler(
+                in_rate, out_rate, backend="auto", taps_per_phase=args.taps
+            )
+            backends.append((f"auto({describe_resampler(auto)})", auto))
+
+            for backend_name, resampler in backends:
+                output, per_frame = run_stream(resampler, signal, frame)
+                snr = snr_db(reference, output)
+                realtime = (args.frame_ms / 1000) / per_frame if per_frame else 0.0
+                print(
+                    f"{name:<10} {in_rate:>6}->{out_rate:<6} {backend_name:<22} "
+                    f"{per_frame * 1e6:8.1f} {realtime:8.0f} {snr:8.1f}"
+                )
+                if backend_name == "polyphase" and snr < args.min_snr:
+                    failed = True
+
+    print("结果: " + ("多相后端信噪比低于阈值" if failed else "通过"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
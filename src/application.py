@@ -8,7 +8,13 @@ import time
 import typing as _t  # noqa: F401
 from typing import Set
 
-from src.constants.constants import AbortReason, DeviceState, ListeningMode
+from src.audio_codecs.frame_queue import AudioFrameQueue
+from src.constants.constants import (
+    AbortReason,
+    AudioConfig,
+    DeviceState,
+    ListeningMode,
+)
 from src.mcp.mcp_server import McpServer
 from src.protocols.mqtt_protocol import MqttProtocol
 from src.protocols.websocket_protocol import WebsocketProtocol
@@ -152,22 +158,70 @@ class Application:
         self._state_lock = None
         self._abort_lock = None
 
-        # 音频与发送并发限制（避免任务风暴）
+        # 上行音频：每个音频会话一个发送任务，按序消费有界队列
         try:
-            audio_write_cc = int(
-                self.config.get_config("APP.AUDIO_WRITE_CONCURRENCY", 4)
+            uplink_maxsize = int(
+                self.config.get_config("APP.UPLINK_QUEUE_MAXSIZE", 50)
             )
         except Exception:
-            audio_write_cc = 4
+            uplink_maxsize = 50
+        uplink_policy = self.config.get_config(
+            "APP.UPLINK_OVERFLOW_POLICY", AudioFrameQueue.DROP_OLDEST
+        )
+        if uplink_policy not in (
+            AudioFrameQueue.DROP_OLDEST,
+            AudioFrameQueue.DROP_NEWEST,
+        ):
+            logger.warning(f"未知的上行溢出策略 {uplink_policy}，使用 drop_oldest")
+            uplink_policy = AudioFrameQueue.DROP_OLDEST
+        try:
+            self._uplink_batch_size = max(
+                1, int(self.config.get_config("APP.UPLINK_BATCH_SIZE", 8))
+            )
+        except Exception:
+            self._uplink_batch_size = 8
+        self._uplink_queue = AudioFrameQueue(
+            maxsize=uplink_maxsize, overflow=uplink_policy
+        )
+        self._uplink_task = None
+        # 上行编码参数自适应（音频初始化后按配置创建）
+        self._uplink_rate_controller = None
+        self._uplink_stats = {
+            "frames_sent": 0,
+            "frames_discarded": 0,
+            "batches": 0,
+            "coalesced_batches": 0,
+            "last_send_ms": 0.0,
+        }
+
+        # 下行音频：单一长期解码任务按序消费的帧队列
         try:
-            send_audio_cc = int(self.config.get_config("APP.SEND_AUDIO_CONCURRENCY", 4))
+            incoming_maxsize = int(
+                self.config.get_config("APP.INCOMING_AUDIO_QUEUE_MAXSIZE", 500)
+            )
+        except Exception:
+            incoming_maxsize = 500
+        try:
+            self._audio_write_batch_size = max(
+                1, int(self.config.get_config("APP.AUDIO_WRITE_BATCH_SIZE", 4))
+            )
+        except Exception:
+            self._audio_write_batch_size = 4
+        try:
+            # 播放端积压超过该帧数时暂停写入（背压）
+            self._audio_backlog_limit = max(
+                1, int(self.config.get_config("APP.AUDIO_BACKLOG_LIMIT", 400))
+            )
         except Exception:
-            send_audio_cc = 4
-        # 保存配置值，在_initialize_async_objects中创建Semaphore
-        self._audio_write_cc = audio_write_cc
-        self._send_audio_cc = send_audio_cc
-        self._audio_write_semaphore = None
-        self._send_audio_semaphore = None
+            self._audio_backlog_limit = 400
+        self._incoming_audio_queue = AudioFrameQueue(maxsize=incoming_maxsize)
+        self._incoming_audio_stats = {
+            "worker_tasks_created": 0,
+            "frames_written": 0,
+            "batches": 0,
+            "peak_queue_depth": 0,
+            "backpressure_waits": 0,
+        }
 
         # 最近一次接收到服务端音频的时间（用于应对TTS起止近邻竞态）
         self._last_incoming_audio_at: float = 0.0
@@ -226,10 +280,6 @@ class Application:
         self.aborted_event = asyncio.Event()
         self.aborted_event.clear()
 
-        # 初始化信号量
-        self._audio_write_semaphore = asyncio.Semaphore(self._audio_write_cc)
-        self._send_audio_semaphore = asyncio.Semaphore(self._send_audio_cc)
-
         # 初始化音频静默事件（默认置为已静默，避免无谓等待）
         self._incoming_audio_idle_event = asyncio.Event()
         self._incoming_audio_idle_event.set()
@@ -335,7 +385,11 @@ class Application:
             await self.audio_codec.initialize()
 
             # 设置实时编码回调 - 关键：确保麦克风数据实时发送
-            self.audio_codec.set_encoded_audio_callback(self._on_encoded_audio)
+            # 使用批量回调：流水线采集模式下一次唤醒产生的多个编码包只调度一次
+            self.audio_codec.set_encoded_audio_batch_callback(
+                self._on_encoded_audio_batch
+            )
+            self._initialize_uplink_rate_controller()
 
             logger.info("音频编解码器初始化成功")
 
@@ -344,90 +398,213 @@ class Application:
             # 确保初始化失败时audio_codec为None
             self.audio_codec = None
 
+    def _initialize_uplink_rate_controller(self):
+        """
+        按 AUDIO_OPTIONS.OPUS_ENCODER.* 创建上行编码参数控制器并设置初始参数.
+        """
+        from src.audio_codecs.uplink_controller import (
+            UplinkRateController,
+            rate_control_options,
+        )
+
+        options = rate_control_options(self.config)
+        if options is None:
+            logger.info("上行编码参数自适应已关闭")
+            return
+        try:
+            self._uplink_rate_controller = UplinkRateController(
+                self.audio_codec.set_encoder_settings,
+                AudioConfig.FRAME_DURATION,
+                **options,
+            )
+        except ValueError as e:
+            logger.warning(f"上行编码参数控制器创建失败: {e}")
+            return
+        initial = self._uplink_rate_controller.settings()
+        self.audio_codec.set_encoder_settings(initial)
+        logger.info(f"上行编码参数自适应已启用，初始参数: {initial}")
+
+    def _adjust_uplink_encoder(self, now: float):
+        """
+        收集丢包、队列溢出和编码耗时，交给控制器评估（上行发送任务中调用）.
+        """
+        encode = self.audio_codec.get_capture_timing()["stages"].get("encode")
+        encode_stats = (
+            (encode["count"], encode["count"] * encode["avg_ms"]) if encode else None
+        )
+        self._uplink_rate_controller.evaluate(
+            now,
+            self._uplink_queue.get_stats()["overruns"],
+            link_stats=self.protocol.get_audio_link_stats(),
+            encode_stats=encode_stats,
+        )
+
     def _on_encoded_audio(self, encoded_data: bytes):
         """处理编码后的音频数据回调.
 
-        注意：这个回调在音频驱动线程中被调用，需要线程安全地调度到主事件循环。
+        注意：这个回调在音频驱动线程中被调用，直接放入线程安全的上行队列。
         关键逻辑：只在LISTENING状态或SPEAKING+REALTIME模式下发送音频数据
         """
+        self._on_encoded_audio_batch((encoded_data,))
+
+    def _on_encoded_audio_batch(self, packets):
+        """批量编码音频回调（音频驱动线程或编码工作线程中调用）.
+
+        按顺序放入上行队列，由上行发送任务消费；仅在发送任务等待时唤醒事件循环.
+        """
         try:
             # 1. LISTENING状态：总是发送（包括实时模式下TTS播放期间）
             # 2. SPEAKING状态：只有在REALTIME模式下才发送（向后兼容）
-            should_send = self._should_send_microphone_audio()
-
             if (
-                should_send
+                self._should_send_microphone_audio()
                 and self.protocol
                 and self.protocol.is_audio_channel_opened()
             ):
-
-                # 线程安全地调度到主事件循环
-                if self._main_loop and not self._main_loop.is_closed():
-                    self._main_loop.call_soon_threadsafe(
-                        self._schedule_audio_send, encoded_data
-                    )
+                for encoded_data in packets:
+                    self._uplink_queue.put(encoded_data)
 
         except Exception as e:
             logger.error(f"处理编码音频数据回调失败: {e}")
 
-    def _schedule_audio_send(self, encoded_data: bytes):
+    def _start_uplink_sender(self):
         """
-        在主事件循环中调度音频发送任务.
+        为当前音频会话启动上行发送任务（已运行则跳过）.
         """
-        try:
-            if not self.running or not self.protocol:
-                return
-            # 再次检查状态（可能在调度期间状态已改变）
-            # 核心逻辑：LISTENING状态或SPEAKING+REALTIME模式下发送音频
-            should_send = self._should_send_microphone_audio()
+        if self._uplink_task and not self._uplink_task.done():
+            return
+        self._uplink_queue.clear()
+        self._uplink_task = self._create_task(self._uplink_sender(), "上行音频发送")
 
-            if (
-                should_send
-                and self.protocol
-                and self.protocol.is_audio_channel_opened()
-            ):
-                # 使用call_soon_threadsafe避免qasync任务重入
-                if self._main_loop and not self._main_loop.is_closed():
-                    self._main_loop.call_soon_threadsafe(
-                        self._schedule_audio_send_task, encoded_data
+    async def _stop_uplink_sender(self):
+        """
+        停止上行发送任务并丢弃未发送的帧.
+        """
+        task = self._uplink_task
+        self._uplink_task = None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._uplink_queue.clear()
+
+    async def _uplink_sender(self):
+        """
+        上行音频发送任务：按序消费上行队列，积压时把已排队的帧合并为一批发送.
+        """
+        queue = self._uplink_queue
+        stats = self._uplink_stats
+
+        while self.running:
+            try:
+                batch = [await queue.get()]
+                while len(batch) < self._uplink_batch_size:
+                    packet = queue.get_nowait()
+                    if packet is None:
+                        break
+                    batch.append(packet)
+
+                # 再次检查状态（排队期间状态可能已改变）
+                if not (
+                    self.protocol
+                    and self._should_send_microphone_audio()
+                    and self.protocol.is_audio_channel_opened()
+                ):
+                    stats["frames_discarded"] += len(batch)
+                    continue
+
+                start = time.monotonic()
+                await self.protocol.send_audio_batch(batch)
+                now = time.monotonic()
+                stats["last_send_ms"] = (now - start) * 1000
+                controller = self._uplink_rate_controller
+                if controller is not None:
+                    controller.observe_send(
+                        stats["last_send_ms"], len(batch), queue.qsize()
                     )
+                    if controller.due(now):
+                        self._adjust_uplink_encoder(now)
+                stats["frames_sent"] += len(batch)
+                stats["batches"] += 1
+                if len(batch) > 1:
+                    stats["coalesced_batches"] += 1
 
-        except Exception as e:
-            logger.error(f"调度音频发送失败: {e}")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"上行音频发送失败: {e}", exc_info=True)
+
+    def get_uplink_stats(self) -> dict:
+        """
+        获取上行音频统计（队列深度、丢弃帧数、发送批次等）.
+        """
+        queue_stats = self._uplink_queue.get_stats()
+        return {
+            **self._uplink_stats,
+            "queue_depth": queue_stats["size"],
+            "frames_dropped": queue_stats["overruns"],
+            "overflow_policy": self._uplink_queue.overflow_policy,
+            "queue": queue_stats,
+            "rate_control": (
+                self._uplink_rate_controller.get_status()
+                if self._uplink_rate_controller
+                else None
+            ),
+        }
 
-    def _schedule_audio_send_task(self, encoded_data: bytes):
+    async def _incoming_audio_worker(self):
         """
-        在主事件循环中创建音频发送任务.
+        下行音频解码任务：按到达顺序从帧队列小批量取出写入音频编解码器，播放端积压过多时等待.
         """
-        try:
-            if not self.running or not self.protocol:
-                return
-            
-            # 并发限制，避免任务风暴
-            async def _send():
-                async with self._send_audio_semaphore:
-                    await self.protocol.send_audio(encoded_data)
+        queue = self._incoming_audio_queue
+        stats = self._incoming_audio_stats
+        frame_interval = AudioConfig.FRAME_DURATION / 1000
 
-            self._create_background_task(_send(), "发送音频数据")
-        except Exception as e:
-            logger.error(f"创建音频发送任务失败: {e}", exc_info=True)
+        while self.running:
+            try:
+                batch = [await queue.get()]
+                while len(batch) < self._audio_write_batch_size:
+                    item = queue.get_nowait()
+                    if item is None:
+                        break
+                    batch.append(item)
+
+                if not self.audio_codec:
+                    continue
+
+                # 背压：播放端积压过多时暂停写入，剩余帧留在有界队列中
+                while (
+                    self.audio_codec
+                    and self.audio_codec.playback_backlog() >= self._audio_backlog_limit
+                ):
+                    stats["backpressure_waits"] += 1
+                    await asyncio.sleep(frame_interval)
 
-    def _schedule_audio_write_task(self, data: bytes):
+                if self.audio_codec:
+                    await self.audio_codec.write_audio_batch(batch)
+                    stats["frames_written"] += len(batch)
+                    stats["batches"] += 1
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"下行音频写入失败: {e}", exc_info=True)
+
+    def _clear_incoming_audio(self) -> int:
         """
-        在主事件循环中创建音频写入任务.
+        丢弃尚未写入编解码器的下行音频帧.
         """
-        try:
-            if not self.running or not self.audio_codec:
-                return
-            
-            # 音频数据处理需要实时性，限制并发，避免任务风暴
-            async def _write():
-                async with self._audio_write_semaphore:
-                    await self.audio_codec.write_audio(data)
+        return self._incoming_audio_queue.clear()
 
-            self._create_background_task(_write(), "写入音频数据")
-        except Exception as e:
-            logger.error(f"创建音频写入任务失败: {e}", exc_info=True)
+    def get_audio_pipeline_stats(self) -> dict:
+        """
+        获取下行音频管线统计（队列深度、溢出、任务创建数等）.
+        """
+        return {
+            **self._incoming_audio_stats,
+            "queue": self._incoming_audio_queue.get_stats(),
+        }
 
     def _should_send_microphone_audio(self) -> bool:
         """
@@ -555,6 +732,10 @@ class Application:
         # 命令处理任务
         self._create_task(self._command_processor(), "命令处理")
 
+        # 下行音频解码任务（单一消费者，保证帧序）
+        self._create_task(self._incoming_audio_worker(), "下行音频解码")
+        self._incoming_audio_stats["worker_tasks_created"] += 1
+
     def _create_task(self, coro, name: str) -> asyncio.Task:
         """
         创建并管理任务.
@@ -709,6 +890,7 @@ class Application:
             if not success:
                 return False
 
+        self._clear_incoming_audio()
         if self.audio_codec:
             await self.audio_codec.clear_audio_queue()
 
@@ -794,6 +976,7 @@ class Application:
         logger.info(f"中止语音输出，原因: {reason}")
         self.aborted = True
         self.aborted_event.set()
+        self._clear_incoming_audio()
         if self.audio_codec:
             await self.audio_codec.clear_audio_queue()
 
@@ -881,6 +1064,7 @@ class Application:
                 display_update = ("说话中...", True)
 
         # 锁外执行I/O与耗时操作
+        self._update_dtx_gate()
         if perform_idle:
             await self._handle_idle_state()
         elif perform_listening:
@@ -889,6 +1073,17 @@ class Application:
             text, connected = display_update
             self._update_display_async(self.display.update_status, text, connected)
 
+    def _update_dtx_gate(self):
+        """
+        只在自动/实时监听上传麦克风音频期间启用上行DTX，其他状态停用（不判定也不计入统计）.
+        """
+        if not self.audio_codec:
+            return
+        self.audio_codec.set_dtx_active(
+            self._should_send_microphone_audio()
+            and self.listening_mode in (ListeningMode.REALTIME, ListeningMode.AUTO_STOP)
+        )
+
     async def _handle_idle_state(self):
         """
         处理空闲状态.
@@ -952,9 +1147,12 @@ class Application:
         if self.protocol:
             await self.protocol.close_audio_channel()
 
-    def _on_incoming_audio(self, data):
-        """
-        接收音频数据回调.
+    def _on_incoming_audio(self, data, sequence=None):
+        """接收音频数据回调.
+
+        Args:
+            data: Opus音频数据
+            sequence: 数据包序列号（仅UDP通道提供）
         """
         # 在实时模式下，TTS播放时设备状态可能保持LISTENING，也需要播放音频
         should_play_audio = self.device_state == DeviceState.SPEAKING or (
@@ -1001,15 +1199,14 @@ class Application:
                         lambda: self._set_device_state_impl(DeviceState.SPEAKING)
                     )
 
-                # 使用call_soon_threadsafe避免qasync任务重入
-                if self._main_loop and not self._main_loop.is_closed():
-                    self._main_loop.call_soon_threadsafe(
-                        self._schedule_audio_write_task, data
-                    )
-            except RuntimeError as e:
-                logger.error(f"无法创建音频写入任务: {e}")
+                # 按序放入下行帧队列，由解码任务消费（队列满时丢弃最旧帧）
+                queue = self._incoming_audio_queue
+                queue.put((data, sequence, self._last_incoming_audio_at))
+                depth = queue.qsize()
+                if depth > self._incoming_audio_stats["peak_queue_depth"]:
+                    self._incoming_audio_stats["peak_queue_depth"] = depth
             except Exception as e:
-                logger.error(f"创建音频写入任务失败: {e}", exc_info=True)
+                logger.error(f"下行音频入队失败: {e}", exc_info=True)
 
     def _on_incoming_json(self, json_data):
         """
@@ -1096,17 +1293,7 @@ class Application:
             f"TTS停止，当前状态: {self.device_state}，监听模式: {self.listening_mode}"
         )
 
-        # 等待音频播放完成
-        if self.audio_codec:
-            logger.debug("等待TTS音频播放完成...")
-            try:
-                await self.audio_codec.wait_for_audio_complete()
-            except Exception as e:
-                logger.warning(f"TTS音频播放等待失败: {e}")
-            else:
-                logger.debug("TTS音频播放完成")
-
-        # 仅在非打断情况下，等待“静默事件”
+        # 仅在非打断情况下，先等待下行“静默事件”，确保迟到的尾包已到达
         if not self.aborted_event.is_set():
             try:
                 if self._incoming_audio_idle_event:
@@ -1121,6 +1308,25 @@ class Application:
             except Exception:
                 pass
 
+        # 等待最后一个音频样本实际播放完成（由播放回调通知，不固定等待）
+        if self.audio_codec:
+            logger.debug("等待TTS音频播放完成...")
+            try:
+                # 下行队列中尚有未写入编解码器的帧时，写入后再等一次排空
+                completed = False
+                for _ in range(3):
+                    completed = await self.audio_codec.wait_for_audio_complete()
+                    # 超时说明输出流停滞，不再重复等待
+                    if not completed:
+                        break
+                    if self._incoming_audio_queue.empty() or self.aborted_event.is_set():
+                        break
+            except Exception as e:
+                logger.warning(f"TTS音频播放等待失败: {e}")
+            else:
+                if completed:
+                    logger.debug("TTS音频播放完成")
+
         # 状态转换逻辑优化
         if self.device_state == DeviceState.SPEAKING:
             # 传统模式：从SPEAKING转换到LISTENING或IDLE
@@ -1159,6 +1365,8 @@ class Application:
         """
         logger.info("音频通道已打开")
         try:
+            self._start_uplink_sender()
+
             if self.audio_codec:
                 await self.audio_codec.start_streams()
 
@@ -1177,6 +1385,9 @@ class Application:
         音频通道关闭回调.
         """
         logger.info("音频通道已关闭")
+        await self._stop_uplink_sender()
+        if self.audio_codec:
+            self.audio_codec.finish_dtx_session()
         await self._set_device_state(DeviceState.IDLE)
         self.keep_listening = False
 
@@ -1372,6 +1583,10 @@ class Application:
 
                 self._main_tasks.clear()
 
+            # 上行发送任务已随主要任务取消，丢弃未发送的帧
+            self._uplink_task = None
+            self._uplink_queue.clear()
+
             # 4. 取消后台任务（短期任务池）
             try:
                 if self._bg_tasks:
@@ -1,13 +1,22 @@
 import platform
-from collections import deque
+import threading
 from typing import Any, Dict, Optional
 
 import numpy as np
-import sounddevice as sd
 
+from src.audio_codecs.delay_estimator import EchoDelayEstimator
+from src.audio_codecs.resampler import create_resampler, describe_resampler
+from src.audio_codecs.ring_buffer import AudioRingBuffer
 from src.constants.constants import AudioConfig
+from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
+try:
+    import sounddevice as sd
+except OSError:
+    # 缺少PortAudio时参考信号捕获不可用
+    sd = None
+
 logger = get_logger(__name__)
 
 
@@ -15,16 +24,51 @@ class AECProcessor:
     """
     音频回声消除处理器
     专门用于处理参考信号（扬声器输出）和麦克风输入的AEC
+
+    参考信号来源（AEC_OPTIONS.REFERENCE_SOURCE）：
+        - loopback：macOS 通过 BlackHole 回环设备单独采集扬声器信号（默认）
+        - internal：直接取 AudioCodec 播放回调写给设备的PCM，无需虚拟声卡，
+          macOS 和 Linux 均使用 WebRTC AEC
+
+    两种来源都经流式soxr重采样到16kHz后写入固定容量的环形缓冲，并记录环中最新
+    样本对应的时间；处理麦克风帧时按其采集时间定位参考数据，使两路信号对齐
+    （未提供采集时间时按先进先出读取）。
     """
+
+    REFERENCE_LOOPBACK = "loopback"
+    REFERENCE_INTERNAL = "internal"
+
+    # 参考环形缓冲容量（毫秒）
+    REFERENCE_BUFFER_MS = 200
+    # 未估计出回声延迟前使用的流延迟（毫秒）
+    DEFAULT_STREAM_DELAY_MS = 40
     
-    def __init__(self):
+    def __init__(self, device_backend=None):
+        # 音频设备后端（默认sounddevice）
+        self._sd = sd if device_backend is None else device_backend
+
         # 平台信息
         self._platform = platform.system().lower()
         self._is_macos = self._platform == 'darwin'
         self._is_linux = self._platform == 'linux'
         self._is_windows = self._platform == 'windows'
         
-        # WebRTC APM 实例（仅 macOS 使用）
+        # 参考信号来源
+        source = str(
+            ConfigManager.get_instance().get_config(
+                "AEC_OPTIONS.REFERENCE_SOURCE", self.REFERENCE_LOOPBACK
+            )
+        ).lower()
+        if source not in (self.REFERENCE_LOOPBACK, self.REFERENCE_INTERNAL):
+            logger.warning(f"未知AEC参考信号来源 {source}，使用 {self.REFERENCE_LOOPBACK}")
+            source = self.REFERENCE_LOOPBACK
+        self.reference_source = source
+        # macOS 始终使用 WebRTC；Linux 选择内部参考时也使用 WebRTC
+        self._use_webrtc = self._is_macos or (
+            self._is_linux and source == self.REFERENCE_INTERNAL
+        )
+        
+        # WebRTC APM 实例（macOS，或 Linux 内部参考）
         self.apm = None
         self.apm_config = None
         self.capture_config = None
@@ -34,11 +78,35 @@ class AECProcessor:
         self.reference_stream = None
         self.reference_device_id = None
         self.reference_sample_rate = None
+        self._reference_resampler = None
+        # 内部参考：播放设备采样率，attach_render_tap() 后有效
+        self.render_sample_rate = None
         
         # 缓冲区
-        self._reference_buffer = deque()
         self._webrtc_frame_size = 160  # WebRTC标准：16kHz, 10ms = 160 samples
         self._system_frame_size = AudioConfig.INPUT_FRAME_SIZE  # 系统配置的帧大小
+        # 参考信号环形缓冲（16kHz），参考回调写、录音路径读，读写在锁内完成
+        self._reference_buffer = AudioRingBuffer(
+            AudioConfig.INPUT_SAMPLE_RATE * self.REFERENCE_BUFFER_MS // 1000
+        )
+        self._reference_lock = threading.Lock()
+        # 环中最新样本之后一个样本的采集时间（参考流时钟，秒），未知时为None
+        self._reference_end_time = None
+        # 预分配的参考帧输出
+        self._reference_frame = np.zeros(self._system_frame_size, dtype=np.int16)
+        # 参考对齐统计（样本数）
+        self._reference_stats = {
+            "dropped_samples": 0,  # 早于采集帧被跳过的参考样本
+            "missing_samples": 0,  # 参考数据缺失时补零的样本
+            "last_offset": 0,  # 最近一帧采集时间相对环中最旧样本的偏移
+        }
+        # 预分配的处理输出（按指针直接交给WebRTC写入，帧长变化时重建）
+        self._processed = np.zeros(self._system_frame_size, dtype=np.int16)
+        
+        # 回声路径延迟（毫秒）：估计线程写入目标值，录音线程在处理前应用
+        self._stream_delay_ms = self.DEFAULT_STREAM_DELAY_MS
+        self._target_delay_ms = self.DEFAULT_STREAM_DELAY_MS
+        self._delay_estimator = None
         
         # 状态标志
         self._is_initialized = False
@@ -47,15 +115,18 @@ class AECProcessor:
     async def initialize(self):
         """初始化AEC处理器"""
         try:
-            if self._is_windows or self._is_linux:
+            if self._use_webrtc:
+                # WebRTC AEC，参考信号来自 BlackHole 回环或内部播放回调
+                await self._initialize_apm()
+                if self.reference_source == self.REFERENCE_LOOPBACK:
+                    await self._initialize_reference_capture()
+                else:
+                    logger.info("AEC使用内部播放参考信号，等待播放路径接入")
+            elif self._is_windows or self._is_linux:
                 # Windows 和 Linux 平台使用系统级AEC，无需额外处理
                 logger.info(f"{self._platform.capitalize()} 平台使用系统级回声消除，AEC处理器已启用")
                 self._is_initialized = True
                 return
-            elif self._is_macos:
-                # macOS 平台使用 WebRTC + BlackHole
-                await self._initialize_apm()
-                await self._initialize_reference_capture()
             else:
                 logger.warning(f"当前平台 {self._platform} 暂不支持AEC功能")
                 self._is_initialized = True
@@ -70,9 +141,9 @@ class AECProcessor:
             raise
     
     async def _initialize_apm(self):
-        """初始化WebRTC音频处理模块（仅macOS）"""
-        if not self._is_macos:
-            logger.warning("非macOS平台调用了_initialize_apm，这不应该发生")
+        """初始化WebRTC音频处理模块"""
+        if not self._use_webrtc:
+            logger.warning("系统级AEC平台调用了_initialize_apm，这不应该发生")
             return
             
         try:
@@ -109,8 +180,9 @@ class AECProcessor:
             self.capture_config = self.apm.create_stream_config(sample_rate, channels)
             self.render_config = self.apm.create_stream_config(sample_rate, channels)
             
-            # 设置流延迟
-            self.apm.set_stream_delay_ms(40)  # 50ms延迟
+            # 设置初始流延迟，启用延迟估计后按实测值更新
+            self.apm.set_stream_delay_ms(self._stream_delay_ms)
+            self._initialize_delay_estimator()
             
             logger.info("WebRTC APM初始化完成")
             
@@ -118,6 +190,78 @@ class AECProcessor:
             logger.error(f"WebRTC APM初始化失败: {e}")
             raise
     
+    def _initialize_delay_estimator(self):
+        """按配置启动后台回声延迟估计（AEC_OPTIONS.*）"""
+        config = ConfigManager.get_instance()
+        if not config.get_config("AEC_OPTIONS.DELAY_ESTIMATION", True):
+            logger.info("回声延迟估计已禁用，使用固定流延迟")
+            return
+        
+        self._delay_estimator = EchoDelayEstimator(
+            AudioConfig.INPUT_SAMPLE_RATE,
+            max_delay_ms=int(config.get_config("AEC_OPTIONS.MAX_DELAY_MS", 500)),
+            interval=float(
+                config.get_config("AEC_OPTIONS.DELAY_ESTIMATION_INTERVAL", 2.0)
+            ),
+            on_estimate=self._on_delay_estimate,
+        )
+        self._delay_estimator.start()
+    
+    def _on_delay_estimate(self, delay_ms: int):
+        """延迟估计线程回调：记录目标延迟，由录音线程应用"""
+        self._target_delay_ms = delay_ms
+    
+    @property
+    def uses_webrtc(self) -> bool:
+        """是否由本处理器执行 WebRTC AEC（否则为系统级AEC）"""
+        return self._use_webrtc
+    
+    @property
+    def wants_render_reference(self) -> bool:
+        """是否需要播放路径提供内部参考信号"""
+        return self._use_webrtc and self.reference_source == self.REFERENCE_INTERNAL
+    
+    def attach_render_tap(self, sample_rate: int):
+        """接入内部播放参考（播放设备采样率），之后由播放回调调用 write_render_reference"""
+        resampler = create_resampler(sample_rate, AudioConfig.INPUT_SAMPLE_RATE)
+        with self._reference_lock:
+            self._reference_buffer.clear()
+            self._reference_end_time = None
+            self._reference_resampler = resampler
+            self.render_sample_rate = sample_rate
+        logger.info(
+            f"AEC内部参考已接入: {sample_rate}Hz -> {AudioConfig.INPUT_SAMPLE_RATE}Hz "
+            f"({describe_resampler(resampler)})"
+        )
+    
+    def write_render_reference(self, samples: np.ndarray, dac_time: Optional[float] = None):
+        """播放回调调用：写入刚交给设备的一块PCM（单声道视图）及其播放时间.
+
+        Args:
+            samples: 播放设备采样率的样本（与写入设备的数据相同）
+            dac_time: 首样本到达DAC的时间（与录音流同一时钟，秒），未知时为None
+        """
+        if self._is_closing or self.render_sample_rate is None:
+            return
+        
+        try:
+            end_time = None
+            if dac_time is not None:
+                end_time = dac_time + len(samples) / self.render_sample_rate
+            self._write_reference(samples, end_time)
+        except Exception as e:
+            logger.error(f"写入内部参考信号失败: {e}")
+    
+    def _write_reference(self, samples: np.ndarray, end_time: Optional[float]):
+        """重采样到16kHz后写入参考环，并记录环中最新样本之后的时间"""
+        if self._reference_resampler is not None:
+            samples = self._reference_resampler.resample_chunk(samples, last=False)
+        
+        with self._reference_lock:
+            if len(samples) > 0:
+                self._reference_buffer.write(samples)
+            self._reference_end_time = end_time
+    
     async def _initialize_reference_capture(self):
         """初始化参考信号捕获（仅macOS）"""
         if not self._is_macos:
@@ -127,17 +271,29 @@ class AECProcessor:
             # 查找BlackHole 2ch设备
             reference_device = self._find_blackhole_device()
             if reference_device is None:
-                logger.warning("未找到BlackHole 2ch设备，参考信号捕获不可用")
+                logger.warning(
+                    "未找到BlackHole 2ch设备，参考信号捕获不可用"
+                    "（可将 AEC_OPTIONS.REFERENCE_SOURCE 设为 internal 使用内部播放参考）"
+                )
                 return
             
             self.reference_device_id = reference_device['id']
             self.reference_sample_rate = int(reference_device['default_samplerate'])
+            # 流式重采样到16kHz（同采样率时直通）
+            self._reference_resampler = create_resampler(
+                self.reference_sample_rate, AudioConfig.INPUT_SAMPLE_RATE
+            )
+            logger.info(
+                f"参考信号重采样: {self.reference_sample_rate}Hz -> "
+                f"{AudioConfig.INPUT_SAMPLE_RATE}Hz "
+                f"({describe_resampler(self._reference_resampler)})"
+            )
             
             # 创建参考信号输入流（固定使用10ms帧，匹配WebRTC标准）
             webrtc_frame_duration = 0.01  # 10ms，WebRTC标准帧长度
             reference_frame_size = int(self.reference_sample_rate * webrtc_frame_duration)
             
-            self.reference_stream = sd.InputStream(
+            self.reference_stream = self._sd.InputStream(
                 device=self.reference_device_id,
                 samplerate=self.reference_sample_rate,
                 channels=AudioConfig.CHANNELS,
@@ -159,7 +315,7 @@ class AECProcessor:
     def _find_blackhole_device(self) -> Optional[Dict[str, Any]]:
         """查找BlackHole 2ch虚拟设备"""
         try:
-            devices = sd.query_devices()
+            devices = self._sd.query_devices()
             for i, device in enumerate(devices):
                 device_name = device['name'].lower()
                 # 查找BlackHole 2ch设备
@@ -187,10 +343,7 @@ class AECProcessor:
             return None
     
     def _reference_callback(self, indata, frames, time_info, status):
-        """参考信号回调"""
-        # frames, time_info用于sounddevice回调，此处不使用但需要保留签名
-        _ = frames, time_info
-        
+        """参考信号回调：重采样到16kHz后写入环形缓冲并更新时间戳"""
         if status and "overflow" not in str(status).lower():
             logger.warning(f"参考信号流状态: {status}")
         
@@ -198,26 +351,11 @@ class AECProcessor:
             return
         
         try:
-            audio_data = indata.copy().flatten()
-            
-            # 重采样到16kHz（如果需要）
-            if self.reference_sample_rate != AudioConfig.INPUT_SAMPLE_RATE:
-                # 简单的降采样处理（实际应用中应使用更好的重采样器）
-                ratio = AudioConfig.INPUT_SAMPLE_RATE / self.reference_sample_rate
-                target_length = int(len(audio_data) * ratio)
-                audio_data = np.interp(
-                    np.linspace(0, len(audio_data) - 1, target_length),
-                    np.arange(len(audio_data)),
-                    audio_data
-                ).astype(np.int16)
-            
-            # 添加到参考缓冲区
-            self._reference_buffer.extend(audio_data)
-            
-            # 保持缓冲区大小合理
-            max_buffer_size = self._webrtc_frame_size * 20  # 保持约200ms的数据
-            while len(self._reference_buffer) > max_buffer_size:
-                self._reference_buffer.popleft()
+            # 本块最后一个样本之后的采集时间
+            end_time = None
+            if time_info is not None:
+                end_time = time_info.inputBufferAdcTime + frames / self.reference_sample_rate
+            self._write_reference(indata.reshape(-1), end_time)
                 
         except Exception as e:
             logger.error(f"参考信号回调错误: {e}")
@@ -226,26 +364,25 @@ class AECProcessor:
         """参考信号流结束回调"""
         logger.info("参考信号流已结束")
     
-    def process_audio(self, capture_audio: np.ndarray) -> np.ndarray:
+    def process_audio(
+        self, capture_audio: np.ndarray, capture_time: Optional[float] = None
+    ) -> np.ndarray:
         """
         处理音频帧，应用AEC
-        支持10ms/20ms/40ms/60ms等不同帧长度，通过分割处理实现
+        支持10ms/20ms/40ms/60ms等不同帧长度，在一次本地调用中逐个10ms块处理
         
         Args:
             capture_audio: 麦克风采集的音频数据 (16kHz, int16)
+            capture_time: 帧首样本的采集时间（与参考流同一时钟，秒），用于对齐参考信号
             
         Returns:
-            处理后的音频数据
+            处理后的音频数据（可能是内部缓冲视图，下一次调用前有效）
         """
         if not self._is_initialized:
             return capture_audio
         
-        # Windows 和 Linux 平台直接返回原始音频（系统级处理）
-        if self._is_windows or self._is_linux:
-            return capture_audio
-        
-        # macOS 平台使用 WebRTC AEC 处理
-        if not self._is_macos or self.apm is None:
+        # 系统级AEC平台直接返回原始音频
+        if not self._use_webrtc or self.apm is None:
             return capture_audio
         
         try:
@@ -254,103 +391,138 @@ class AECProcessor:
                 logger.warning(f"音频帧大小不是WebRTC帧的整数倍: {len(capture_audio)}, WebRTC帧: {self._webrtc_frame_size}")
                 return capture_audio
             
-            # 计算需要分割的块数
-            num_chunks = len(capture_audio) // self._webrtc_frame_size
-            
-            if num_chunks == 1:
-                # 10ms帧，直接处理
-                return self._process_single_aec_frame(capture_audio)
-            else:
-                # 20ms/40ms/60ms帧，分割处理
-                return self._process_chunked_aec_frames(capture_audio, num_chunks)
+            return self._process_aec_frame(capture_audio, capture_time)
             
         except Exception as e:
             logger.error(f"AEC处理失败: {e}")
             return capture_audio
     
-    def _process_single_aec_frame(self, capture_audio: np.ndarray) -> np.ndarray:
-        """处理单个10ms WebRTC帧（仅macOS）"""
-        if not self._is_macos:
+    def _process_aec_frame(
+        self, capture_audio: np.ndarray, capture_time: Optional[float] = None
+    ) -> np.ndarray:
+        """处理整帧（10ms的整数倍，WebRTC AEC）.
+
+        NumPy缓冲按指针直接交给WebRTC，各10ms块在一次调用内依次处理。
+        返回内部输出缓冲的视图，下一次调用前有效（调用方需立即拷贝）。
+        """
+        if not self._use_webrtc:
             return capture_audio
             
         try:
-            # 仅在macOS导入ctypes
-            import ctypes
-            
-            # 获取参考信号
-            reference_audio = self._get_reference_frame(self._webrtc_frame_size)
-            
-            # 创建ctypes缓冲区
-            capture_buffer = (ctypes.c_short * self._webrtc_frame_size)(*capture_audio)
-            reference_buffer = (ctypes.c_short * self._webrtc_frame_size)(*reference_audio)
-            
-            processed_capture = (ctypes.c_short * self._webrtc_frame_size)()
-            processed_reference = (ctypes.c_short * self._webrtc_frame_size)()
-            
-            # 首先处理参考信号（render stream）
-            render_result = self.apm.process_reverse_stream(
-                reference_buffer, self.render_config, self.render_config, processed_reference
-            )
-            
-            if render_result != 0:
-                logger.warning(f"参考信号处理失败，错误码: {render_result}")
-            
-            # 然后处理采集信号（capture stream）
-            capture_result = self.apm.process_stream(
-                capture_buffer, self.capture_config, self.capture_config, processed_capture
+            frame_size = len(capture_audio)
+            capture = np.ascontiguousarray(capture_audio, dtype=np.int16)
+            if len(self._processed) < frame_size:
+                self._processed = np.zeros(frame_size, dtype=np.int16)
+            processed = self._processed[:frame_size]
+
+            # 获取与整帧等长的参考信号
+            reference_audio = self._get_reference_frame(frame_size, capture_time)
+            
+            if self._delay_estimator is not None:
+                self._delay_estimator.feed(reference_audio, capture)
+            if self._target_delay_ms != self._stream_delay_ms:
+                self._stream_delay_ms = self._target_delay_ms
+                self.apm.set_stream_delay_ms(self._stream_delay_ms)
+
+            result = self.apm.process_chunks(
+                capture,
+                self.capture_config,
+                processed,
+                reference=reference_audio,
+                render_config=self.render_config,
             )
-            
-            if capture_result != 0:
-                logger.warning(f"采集信号处理失败，错误码: {capture_result}")
+            if result != 0:
+                logger.warning(f"AEC处理失败，错误码: {result}")
                 return capture_audio
-            
-            # 转换回numpy数组
-            return np.array(processed_capture, dtype=np.int16)
+
+            return processed
             
         except Exception as e:
             logger.error(f"AEC帧处理失败: {e}")
             return capture_audio
     
-    def _process_chunked_aec_frames(self, capture_audio: np.ndarray, num_chunks: int) -> np.ndarray:
-        """分割处理大帧（20ms/40ms/60ms等）"""
-        processed_chunks = []
-        
-        for i in range(num_chunks):
-            # 提取当前10ms块
-            start_idx = i * self._webrtc_frame_size
-            end_idx = (i + 1) * self._webrtc_frame_size
-            chunk = capture_audio[start_idx:end_idx]
-            
-            # 处理这个10ms块
-            processed_chunk = self._process_single_aec_frame(chunk)
-            processed_chunks.append(processed_chunk)
-        
-        # 将所有处理后的块重新组合
-        return np.concatenate(processed_chunks)
-    
-    def _get_reference_frame(self, frame_size: int) -> np.ndarray:
-        """获取指定大小的参考信号帧"""
-        # 如果没有参考信号或缓冲区不足，返回静音
-        if len(self._reference_buffer) < frame_size:
-            return np.zeros(frame_size, dtype=np.int16)
+    def _get_reference_frame(
+        self, frame_size: int, capture_time: Optional[float] = None
+    ) -> np.ndarray:
+        """获取指定大小的参考信号帧（写入预分配缓冲，下一次调用前有效）.
+
+        提供采集时间且参考时间戳可用时，跳过早于该时间的参考样本，
+        参考数据尚未到达的部分补零；否则按先进先出读取，不足一帧时返回静音。
+        """
+        if len(self._reference_frame) < frame_size:
+            self._reference_frame = np.zeros(frame_size, dtype=np.int16)
+        frame = self._reference_frame[:frame_size]
+        stats = self._reference_stats
         
-        # 从缓冲区提取一帧
-        frame_data = []
-        for _ in range(frame_size):
-            frame_data.append(self._reference_buffer.popleft())
+        with self._reference_lock:
+            buffer = self._reference_buffer
+            available = len(buffer)
+            end_time = self._reference_end_time
+            
+            if capture_time is None or end_time is None:
+                if buffer.read(frame_size, out=frame) is None:
+                    frame.fill(0)
+                    stats["missing_samples"] += frame_size
+                return frame
+            
+            # 采集帧首样本相对环中最旧参考样本的偏移
+            oldest_time = end_time - available / AudioConfig.INPUT_SAMPLE_RATE
+            offset = int(round((capture_time - oldest_time) * AudioConfig.INPUT_SAMPLE_RATE))
+            stats["last_offset"] = offset
+            
+            lead = 0
+            if offset > 0:
+                # 早于采集帧的参考样本已无用
+                stats["dropped_samples"] += buffer.skip(offset)
+            elif offset < 0:
+                # 采集帧开头早于环中最旧样本（已被覆盖或从未收到），补零
+                lead = min(-offset, frame_size)
+                frame[:lead].fill(0)
+            
+            count = min(frame_size - lead, len(buffer))
+            if count > 0:
+                buffer.read(count, out=frame[lead:])
+            if lead + count < frame_size:
+                frame[lead + count :].fill(0)
+            stats["missing_samples"] += frame_size - count
         
-        return np.array(frame_data, dtype=np.int16)
+        return frame
     
     def is_reference_available(self) -> bool:
         """检查参考信号是否可用"""
-        if self._is_windows or self._is_linux:
+        if not self._use_webrtc:
             # Windows 和 Linux 使用系统级AEC，总是可用
             return self._is_initialized
         
-        # macOS 需要检查参考信号流
+        has_data = len(self._reference_buffer) >= self._webrtc_frame_size
+        if self.reference_source == self.REFERENCE_INTERNAL:
+            return self.render_sample_rate is not None and has_data
+        
+        # 回环参考需要检查参考信号流
         return (self.reference_stream is not None and 
                 self.reference_stream.active and 
-                len(self._reference_buffer) >= self._webrtc_frame_size)
+                has_data)
+    
+    def get_reference_buffer_status(self) -> Dict[str, Any]:
+        """获取参考环形缓冲的填充与对齐统计"""
+        sample_rate = AudioConfig.INPUT_SAMPLE_RATE
+        with self._reference_lock:
+            size = len(self._reference_buffer)
+            capacity = self._reference_buffer.capacity
+            overflow = self._reference_buffer.overflow_samples
+        return {
+            'samples': size,
+            'capacity': capacity,
+            'fill_ms': round(size * 1000 / sample_rate, 1),
+            'fill_percent': round(size * 100 / capacity, 1),
+            'overflow_samples': overflow,
+            'dropped_samples': self._reference_stats['dropped_samples'],
+            'missing_samples': self._reference_stats['missing_samples'],
+            'last_offset_ms': round(
+                self._reference_stats['last_offset'] * 1000 / sample_rate, 1
+            ),
+            'timestamped': self._reference_end_time is not None,
+        }
     
     def get_status(self) -> Dict[str, Any]:
         """获取AEC处理器状态"""
@@ -360,7 +532,31 @@ class AECProcessor:
             'reference_available': self.is_reference_available(),
         }
         
-        if self._is_windows:
+        if self._use_webrtc:
+            if self.reference_source == self.REFERENCE_INTERNAL:
+                status.update({
+                    'aec_type': 'webrtc_internal',
+                    'description': 'WebRTC + 内部播放参考信号',
+                    'reference_sample_rate': self.render_sample_rate,
+                })
+            else:
+                status.update({
+                    'aec_type': 'webrtc_blackhole',
+                    'description': 'WebRTC + BlackHole 参考信号',
+                    'reference_device_id': self.reference_device_id,
+                    'reference_sample_rate': self.reference_sample_rate,
+                })
+            status.update({
+                'reference_source': self.reference_source,
+                'reference_buffer': self.get_reference_buffer_status(),
+                'stream_delay_ms': self._stream_delay_ms,
+                'delay_estimate': (
+                    self._delay_estimator.get_status()
+                    if self._delay_estimator is not None else None
+                ),
+                'webrtc_apm_active': self.apm is not None
+            })
+        elif self._is_windows:
             status.update({
                 'aec_type': 'system_level',
                 'description': 'Windows 系统底层回声消除'
@@ -370,14 +566,6 @@ class AECProcessor:
                 'aec_type': 'system_level',
                 'description': 'Linux 系统级回声消除（PulseAudio）'
             })
-        elif self._is_macos:
-            status.update({
-                'aec_type': 'webrtc_blackhole',
-                'description': 'WebRTC + BlackHole 参考信号',
-                'reference_device_id': self.reference_device_id,
-                'reference_buffer_size': len(self._reference_buffer),
-                'webrtc_apm_active': self.apm is not None
-            })
         else:
             status.update({
                 'aec_type': 'unsupported',
@@ -395,8 +583,16 @@ class AECProcessor:
         logger.info("开始关闭AEC处理器...")
         
         try:
-            # 仅在 macOS 平台清理 WebRTC 相关资源
-            if self._is_macos:
+            # 清理 WebRTC 相关资源
+            if self._use_webrtc:
+                # 停止接收内部参考
+                self.render_sample_rate = None
+                
+                # 停止延迟估计线程
+                if self._delay_estimator is not None:
+                    self._delay_estimator.stop()
+                    self._delay_estimator = None
+                
                 # 停止参考信号流
                 if self.reference_stream:
                     try:
@@ -422,7 +618,12 @@ class AECProcessor:
                         self.apm = None
             
             # 清理缓冲区
-            self._reference_buffer.clear()
+            with self._reference_lock:
+                self._reference_buffer.clear()
+                self._reference_end_time = None
+            if self._reference_resampler is not None:
+                self._reference_resampler.clear()
+                self._reference_resampler = None
             
             self._is_initialized = False
             logger.info("AEC处理器已关闭")
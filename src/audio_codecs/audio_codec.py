@@ -1,19 +1,40 @@
 import asyncio
+import ctypes
 import gc
+import threading
 import time
-from collections import deque
-from typing import Optional
+from typing import List, Optional
 
 import numpy as np
 import opuslib
-import sounddevice as sd
-import soxr
 
 from src.audio_codecs.aec_processor import AECProcessor
+from src.audio_codecs.calibration import load_calibration
+from src.audio_codecs.capture_pipeline import CaptureEncoderWorker
+from src.audio_codecs.dtx_gate import UplinkDtxGate, dtx_options
+from src.audio_codecs.frame_pool import AudioFramePool
+from src.audio_codecs.frame_queue import AudioFrameQueue
+from src.audio_codecs.input_downmix import InputDownmixer, downmix_options
+from src.audio_codecs.jitter_buffer import JitterBuffer
+from src.audio_codecs.mic_tap import MicrophoneTap, MicTapReader
+from src.audio_codecs.output_mixer import MixerSource, OutputMixer
+from src.audio_codecs.resampler import (
+    create_resampler,
+    describe_resampler,
+    resampler_options,
+)
+from src.audio_codecs.ring_buffer import AudioRingBuffer
+from src.audio_codecs.stage_timer import StageTimer
 from src.constants.constants import AudioConfig
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
+try:
+    import sounddevice as sd
+except OSError:
+    # 缺少PortAudio（如CI环境）时仍可使用文件设备后端
+    sd = None
+
 logger = get_logger(__name__)
 
 
@@ -22,30 +43,74 @@ class AudioCodec:
     音频编解码器，负责录音编码和播放解码
     主要功能：
     1. 录音：麦克风 -> 重采样16kHz -> Opus编码 -> 发送
-    2. 播放：接收 -> Opus解码24kHz -> 播放队列 -> 扬声器
+    2. 播放：接收 -> Opus解码24kHz -> 播放队列 -> 混音(音乐/提示音) -> 扬声器
     """
 
-    def __init__(self):
+    # 重采样环形缓冲区可容纳的帧数
+    RESAMPLE_BUFFER_FRAMES = 8
+    # 启用抖动缓冲时，播放泵保持的已解码帧数
+    PLAYOUT_QUEUE_FRAMES = 2
+    # 麦克风广播缓冲时长（秒），消费者落后超过该时长时丢弃最旧数据
+    MIC_TAP_SECONDS = 2
+    # 录音帧池槽位数：槽位只在处理当前帧期间被引用
+    CAPTURE_FRAME_POOL = 2
+    # Opus单包最大字节数（RFC 6716 上限1275字节/帧，留余量）
+    MAX_OPUS_PACKET = 4000
+    # 运行时可调的Opus编码参数及对应的 (设置, 读取) CTL
+    ENCODER_CTLS = {
+        "bitrate": (opuslib.api.ctl.set_bitrate, opuslib.api.ctl.get_bitrate),
+        "complexity": (opuslib.api.ctl.set_complexity, opuslib.api.ctl.get_complexity),
+        "inband_fec": (opuslib.api.ctl.set_inband_fec, opuslib.api.ctl.get_inband_fec),
+        "packet_loss_perc": (
+            opuslib.api.ctl.set_packet_loss_perc,
+            opuslib.api.ctl.get_packet_loss_perc,
+        ),
+    }
+
+    def __init__(self, device_backend=None):
+        """
+        Args:
+            device_backend: 音频设备后端，需提供与 sounddevice 相同的
+                default/query_devices/InputStream/OutputStream 接口，
+                默认使用 sounddevice（离线测试可传入 FileAudioBackend）
+        """
         # 获取配置管理器
         self.config = ConfigManager.get_instance()
 
+        # 设备后端：自定义后端不读取也不保存配置中的设备选择
+        self._use_system_devices = device_backend is None
+        self._sd = sd if device_backend is None else device_backend
+
         # Opus编解码器：录音16kHz编码，播放24kHz解码
         self.opus_encoder = None
         self.opus_decoder = None
+        # 编码参数：其他线程提交的变更由录音线程在下一次编码前应用
+        self._encoder_settings = {}
+        self._pending_encoder_settings = None
+        self._encoder_settings_lock = threading.Lock()
 
         # 设备信息
         self.device_input_sample_rate = None
+        # 输入声道：设备以多声道打开时在回调中转为单声道
+        self.input_channels = AudioConfig.CHANNELS
+        self._downmixer = InputDownmixer(AudioConfig.CHANNELS)
         self.device_output_sample_rate = None
         self.mic_device_id = None  # 麦克风设备ID
         self.speaker_device_id = None  # 扬声器设备ID
+        # 采样率协商结果（设备默认采样率、实际打开采样率、是否需要重采样）
+        self._sample_rate_negotiation = {}
 
         # 重采样器：录音重采样到16kHz，播放重采样到设备采样率
         self.input_resampler = None  # 设备采样率 -> 16kHz
         self.output_resampler = None  # 24kHz -> 设备采样率(播放用)
 
-        # 重采样缓冲区
-        self._resample_input_buffer = deque()
-        self._resample_output_buffer = deque()
+        # 重采样缓冲区（预分配环形缓冲，容量在创建重采样器时按设备采样率调整）
+        self._resample_input_buffer = AudioRingBuffer(
+            AudioConfig.INPUT_FRAME_SIZE * self.RESAMPLE_BUFFER_FRAMES
+        )
+        self._resample_output_buffer = AudioRingBuffer(
+            AudioConfig.OUTPUT_FRAME_SIZE * self.RESAMPLE_BUFFER_FRAMES
+        )
 
         self._device_input_frame_size = None
         self._is_closing = False
@@ -54,61 +119,216 @@ class AudioCodec:
         self.input_stream = None  # 录音流
         self.output_stream = None  # 播放流
 
-        # 队列：唤醒词检测和播放缓冲
-        self._wakeword_buffer = asyncio.Queue(maxsize=100)
-        self._output_buffer = asyncio.Queue(maxsize=500)
+        # 播放缓冲（跨线程SPSC队列，满时丢弃最旧帧）
+        self._output_buffer = AudioFrameQueue(maxsize=500)
+
+        # 播放混音：TTS播放队列作为最高优先级源，音乐等源由调用方添加
+        self._mixer = OutputMixer(
+            AudioConfig.OUTPUT_SAMPLE_RATE,
+            AudioConfig.OUTPUT_FRAME_SIZE,
+            attack_ms=float(
+                self.config.get_config("AUDIO_OPTIONS.MIXER.DUCK_ATTACK_MS", 50)
+            ),
+            release_ms=float(
+                self.config.get_config("AUDIO_OPTIONS.MIXER.DUCK_RELEASE_MS", 400)
+            ),
+        )
+        self._tts_source = self._mixer.add_source(
+            "tts", priority=OutputMixer.PRIORITY_TTS, chunks=self._output_buffer
+        )
+        # 软件音量后端：启动时恢复上次保存的音量
+        if self.config.get_config("AUDIO_OPTIONS.VOLUME_BACKEND", "system") == "software":
+            from src.utils.software_volume import SoftwareVolumeController
+
+            self._mixer.master_gain = SoftwareVolumeController.volume_to_gain(
+                SoftwareVolumeController.saved_volume()
+            )
+
+        # 播放排空通知：播放回调在最后一个TTS样本到达DAC后唤醒等待者
+        self._drain_waiters: List[asyncio.Future] = []
+        self._drain_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._drain_requested = False
+        # 播放回调线程状态：上次看到的TTS已输出样本数，及其最后样本的播放结束时间
+        self._tts_samples_seen = 0
+        self._tts_render_end: Optional[float] = None
+        # 上一次播放回调是否输出了TTS数据（用于区分播放中途欠载与空闲静音）
+        self._tts_playing = False
+
+        # 麦克风广播：唤醒词、VAD等消费者共享同一路采集数据
+        self._mic_tap = MicrophoneTap(
+            AudioConfig.INPUT_SAMPLE_RATE,
+            AudioConfig.INPUT_SAMPLE_RATE * self.MIC_TAP_SECONDS,
+        )
+
+        # 录音帧池：16kHz帧写入预分配槽位，编码器直接读取
+        self._capture_frames = AudioFramePool(
+            self.CAPTURE_FRAME_POOL, AudioConfig.INPUT_FRAME_SIZE
+        )
+        self._encode_output = ctypes.create_string_buffer(self.MAX_OPUS_PACKET)
+        # 直接模式交付编码包复用的列表（批量回调不得持有该列表）
+        self._capture_packets = []
 
         # 实时编码回调（直接发送，不走队列）
         self._encoded_audio_callback = None
+        self._encoded_audio_batch_callback = None
+
+        # 流水线采集：回调只拷贝样本，由工作线程重采样/AEC/编码
+        self._pipelined_capture = bool(
+            self.config.get_config("AUDIO_OPTIONS.PIPELINED_CAPTURE", False)
+        )
+        self._capture_worker = None
+        # 重采样环形缓冲非线程安全：清空请求由各自的录音/播放线程在下次使用前执行
+        self._clear_resample_input = False
+        self._clear_resample_output = False
+        # 上行DTX（AUDIO_OPTIONS.DTX.*，在initialize中创建，由应用按监听模式启用）
+        self._dtx_gate = None
+        self._dtx_active = False
+        self._dtx_reset = False
+        self._dtx_session_base = (0, 0)
+        # 分阶段耗时直方图与设备xrun计数
+        self._capture_timer = StageTimer(
+            "callback", "copy", "resample", "aec", "vad", "encode", "dispatch"
+        )
+        self._playback_timer = StageTimer("callback", "mix", "resample", "copy")
+        self._input_overflows = 0
+        self._output_underflows = 0
+        self._stats_log_task = None
+
+        # 抖动缓冲与播放泵（在initialize中按配置创建）
+        self._jitter_buffer = None
+        self._playout_task = None
+        self._playout_event = None
 
         # AEC处理器
-        self.aec_processor = AECProcessor()
+        self.aec_processor = AECProcessor(device_backend=self._sd)
         self._aec_enabled = False
+        # 内部AEC参考：播放回调把写给设备的PCM交给该处理器（未启用时为None）
+        self._render_reference = None
 
     async def initialize(self):
         """
         初始化音频设备.
         """
         try:
+            if self._sd is None:
+                raise RuntimeError("PortAudio不可用，无法打开音频设备")
+
             # 显示并选择音频设备
-            await self._select_audio_devices()
+            if self._use_system_devices:
+                await self._select_audio_devices()
+            else:
+                logger.info(f"使用自定义音频设备后端: {type(self._sd).__name__}")
 
-            input_device_info = sd.query_devices(
-                self.mic_device_id or sd.default.device[0]
+            input_device_info = self._sd.query_devices(
+                self.mic_device_id or self._sd.default.device[0]
+            )
+            output_device_info = self._sd.query_devices(
+                self.speaker_device_id or self._sd.default.device[1]
             )
-            output_device_info = sd.query_devices(
-                self.speaker_device_id or sd.default.device[1]
+            # 输入声道布局（多声道麦克风在重采样前转单声道）
+            options = downmix_options(
+                self.config, int(input_device_info.get("max_input_channels", 1) or 1)
             )
-            self.device_input_sample_rate = int(input_device_info["default_samplerate"])
-            self.device_output_sample_rate = int(
-                output_device_info["default_samplerate"]
+            self.input_channels = options["channels"]
+
+            # 设备支持协议采样率时直接以该采样率打开，省去重采样
+            self.device_input_sample_rate = self._negotiate_sample_rate(
+                is_input=True,
+                device=self.mic_device_id,
+                default_rate=int(input_device_info["default_samplerate"]),
+                preferred_rate=AudioConfig.INPUT_SAMPLE_RATE,
+            )
+            self.device_output_sample_rate = self._negotiate_sample_rate(
+                is_input=False,
+                device=self.speaker_device_id,
+                default_rate=int(output_device_info["default_samplerate"]),
+                preferred_rate=AudioConfig.OUTPUT_SAMPLE_RATE,
             )
             frame_duration_sec = AudioConfig.FRAME_DURATION / 1000
             self._device_input_frame_size = int(
                 self.device_input_sample_rate * frame_duration_sec
             )
+            self._downmixer = InputDownmixer(
+                options["channels"],
+                select=options["select"],
+                weights=options["weights"],
+                max_frames=self._device_input_frame_size,
+            )
+            logger.info(f"输入声道布局: {self._downmixer.describe()}")
 
+            negotiation = self._sample_rate_negotiation
             logger.info(
-                f"输入采样率: {self.device_input_sample_rate}Hz, 输出: {self.device_output_sample_rate}Hz"
+                f"输入采样率: {self.device_input_sample_rate}Hz"
+                f"{'' if negotiation['input']['resampling'] else '（无需重采样）'}, "
+                f"输出: {self.device_output_sample_rate}Hz"
+                f"{'' if negotiation['output']['resampling'] else '（无需重采样）'}"
             )
             await self._create_resamplers()
-            sd.default.samplerate = None
-            sd.default.channels = AudioConfig.CHANNELS
-            sd.default.dtype = np.int16
-            await self._create_streams()
+            if self._pipelined_capture:
+                self._capture_worker = CaptureEncoderWorker(
+                    self._process_captured_frame,
+                    self._deliver_encoded_audio,
+                    self._capture_timer,
+                    frame_size=self._device_input_frame_size,
+                )
+            # 编解码器需在音频流启动前创建，避免首批回调无编码器可用
             self.opus_encoder = opuslib.Encoder(
                 AudioConfig.INPUT_SAMPLE_RATE,
                 AudioConfig.CHANNELS,
                 opuslib.APPLICATION_AUDIO,
             )
+            calibration = load_calibration(self.config)
+            if calibration is not None:
+                # 性能校准选出的复杂度（自适应控制器以此为上限）
+                self.set_encoder_settings(
+                    {"complexity": calibration["OPUS_COMPLEXITY"]}
+                )
+            self._encoder_settings = self._read_encoder_settings()
+            options = dtx_options(self.config)
+            if options is not None:
+                self._dtx_gate = UplinkDtxGate(
+                    AudioConfig.INPUT_SAMPLE_RATE, AudioConfig.FRAME_DURATION, **options
+                )
+                logger.info(f"上行DTX已启用: {options}")
             self.opus_decoder = opuslib.Decoder(
                 AudioConfig.OUTPUT_SAMPLE_RATE, AudioConfig.CHANNELS
             )
+            self._sd.default.samplerate = None
+            self._sd.default.channels = AudioConfig.CHANNELS
+            self._sd.default.dtype = np.int16
+            await self._create_streams()
+            if self._capture_worker is not None:
+                self._capture_worker.start()
+
+            if self.config.get_config("AUDIO_OPTIONS.JITTER_BUFFER.ENABLED", True):
+                self._jitter_buffer = JitterBuffer(
+                    AudioConfig.FRAME_DURATION,
+                    start_threshold_ms=int(
+                        self.config.get_config(
+                            "AUDIO_OPTIONS.JITTER_BUFFER.START_THRESHOLD_MS", 60
+                        )
+                    ),
+                    max_delay_ms=int(
+                        self.config.get_config(
+                            "AUDIO_OPTIONS.JITTER_BUFFER.MAX_DELAY_MS", 600
+                        )
+                    ),
+                    max_conceal_frames=int(
+                        self.config.get_config(
+                            "AUDIO_OPTIONS.JITTER_BUFFER.MAX_CONCEAL_FRAMES", 2
+                        )
+                    ),
+                )
+
+            self._start_stats_logger()
 
             # 初始化AEC处理器
             try:
                 await self.aec_processor.initialize()
                 self._aec_enabled = True
+                if self.aec_processor.wants_render_reference:
+                    self.aec_processor.attach_render_tap(self.device_output_sample_rate)
+                    self._render_reference = self.aec_processor
                 logger.info("AEC处理器启用")
             except Exception as e:
                 logger.warning(f"AEC处理器初始化失败，将使用原始音频: {e}")
@@ -120,32 +340,91 @@ class AudioCodec:
             await self.close()
             raise
 
+    def _negotiate_sample_rate(
+        self, is_input: bool, device, default_rate: int, preferred_rate: int
+    ) -> int:
+        """协商设备采样率：探测设备是否原生支持协议采样率.
+
+        Args:
+            is_input: 是否为输入设备
+            device: 设备ID（None为默认设备）
+            default_rate: 设备默认采样率
+            preferred_rate: 协议采样率（录音16kHz / 播放24kHz）
+
+        Returns:
+            实际用于打开音频流的采样率
+        """
+        kind = "input" if is_input else "output"
+        rate = default_rate
+        if default_rate != preferred_rate and self.config.get_config(
+            "AUDIO_OPTIONS.NEGOTIATE_SAMPLE_RATE", True
+        ):
+            check = (
+                self._sd.check_input_settings
+                if is_input
+                else self._sd.check_output_settings
+            )
+            try:
+                check(
+                    device=device,
+                    samplerate=preferred_rate,
+                    channels=self.input_channels if is_input else AudioConfig.CHANNELS,
+                    dtype="int16",
+                )
+                rate = preferred_rate
+            except Exception as e:
+                logger.info(
+                    f"{'输入' if is_input else '输出'}设备不支持 {preferred_rate}Hz，"
+                    f"使用默认采样率 {default_rate}Hz: {e}"
+                )
+
+        self._sample_rate_negotiation[kind] = {
+            "default_rate": default_rate,
+            "protocol_rate": preferred_rate,
+            "device_rate": rate,
+            "resampling": rate != preferred_rate,
+        }
+        return rate
+
     async def _create_resamplers(self):
         """
         创建重采样器 输入：设备采样率 -> 16kHz（用于编码） 输出：24kHz -> 设备采样率（播放用）
+
+        后端与质量由 AUDIO_OPTIONS.RESAMPLER.* 配置（soxr预设或整数倍率多相FIR）.
         """
+        options = resampler_options(self.config)
+
         # 输入重采样器：设备采样率 -> 16kHz（用于编码）
         if self.device_input_sample_rate != AudioConfig.INPUT_SAMPLE_RATE:
-            self.input_resampler = soxr.ResampleStream(
+            self.input_resampler = create_resampler(
                 self.device_input_sample_rate,
                 AudioConfig.INPUT_SAMPLE_RATE,
                 AudioConfig.CHANNELS,
-                dtype="int16",
-                quality="QQ",
+                **options,
+            )
+            logger.info(
+                f"输入重采样: {self.device_input_sample_rate}Hz -> 16kHz "
+                f"({describe_resampler(self.input_resampler)})"
             )
-            logger.info(f"输入重采样: {self.device_input_sample_rate}Hz -> 16kHz")
 
         # 输出重采样器：24kHz -> 设备采样率
         if self.device_output_sample_rate != AudioConfig.OUTPUT_SAMPLE_RATE:
-            self.output_resampler = soxr.ResampleStream(
+            self.output_resampler = create_resampler(
                 AudioConfig.OUTPUT_SAMPLE_RATE,
                 self.device_output_sample_rate,
                 AudioConfig.CHANNELS,
-                dtype="int16",
-                quality="QQ",
+                **options,
+            )
+            device_output_frame_size = int(
+                self.device_output_sample_rate * (AudioConfig.FRAME_DURATION / 1000)
+            )
+            self._resample_output_buffer = AudioRingBuffer(
+                device_output_frame_size * self.RESAMPLE_BUFFER_FRAMES
             )
             logger.info(
-                f"输出重采样: {AudioConfig.OUTPUT_SAMPLE_RATE}Hz -> {self.device_output_sample_rate}Hz"
+                f"输出重采样: {AudioConfig.OUTPUT_SAMPLE_RATE}Hz -> "
+                f"{self.device_output_sample_rate}Hz "
+                f"({describe_resampler(self.output_resampler)})"
             )
 
     # async def _select_audio_devices(self):
@@ -241,7 +520,7 @@ class AudioCodec:
             input_device_id = audio_config.get("input_device_id")
             output_device_id = audio_config.get("output_device_id")
             
-            devices = sd.query_devices()
+            devices = self._sd.query_devices()
             
             # 验证配置的输入设备是否有效（支持整数ID和字符串标识）
             if input_device_id is not None:
@@ -265,7 +544,7 @@ class AudioCodec:
                         # 直接使用字符串标识，不做范围检查（由sounddevice内部验证）
                         # 尝试查询设备信息，确认是否存在
                         try:
-                            device_info = sd.query_devices(input_device_id)
+                            device_info = self._sd.query_devices(input_device_id)
                             if device_info['max_input_channels'] > 0:
                                 self.mic_device_id = input_device_id
                                 logger.info(f"使用配置的麦克风设备: {input_device_id} ({device_info['name']})")
@@ -303,7 +582,7 @@ class AudioCodec:
                     
                     elif isinstance(output_device_id, str):
                         try:
-                            device_info = sd.query_devices(output_device_id)
+                            device_info = self._sd.query_devices(output_device_id)
                             if device_info['max_output_channels'] > 0:
                                 self.speaker_device_id = output_device_id
                                 logger.info(f"使用配置的扬声器设备: {output_device_id} ({device_info['name']})")
@@ -324,12 +603,12 @@ class AudioCodec:
             
             # 以下为原逻辑（使用默认设备 + 保存配置），无需修改
             if input_device_id is None or output_device_id is None:
-                default_input = sd.default.device[0] if sd.default.device else None
-                default_output = sd.default.device[1] if sd.default.device else None
+                default_input = self._sd.default.device[0] if self._sd.default.device else None
+                default_output = self._sd.default.device[1] if self._sd.default.device else None
                 
                 if input_device_id is None and default_input is not None:
                     self.mic_device_id = default_input
-                    input_device_info = devices[default_input] if isinstance(default_input, int) else sd.query_devices(default_input)
+                    input_device_info = devices[default_input] if isinstance(default_input, int) else self._sd.query_devices(default_input)
                     logger.info(f"使用系统默认麦克风设备: [{default_input}] {input_device_info['name']}")
                 elif input_device_id is None:
                     logger.warning("无法获取默认输入设备")
@@ -337,7 +616,7 @@ class AudioCodec:
                 
                 if output_device_id is None and default_output is not None:
                     self.speaker_device_id = default_output
-                    output_device_info = devices[default_output] if isinstance(default_output, int) else sd.query_devices(default_output)
+                    output_device_info = devices[default_output] if isinstance(default_output, int) else self._sd.query_devices(default_output)
                     logger.info(f"使用系统默认扬声器设备: [{default_output}] {output_device_info['name']}")
                 elif output_device_id is None:
                     logger.warning("无法获取默认输出设备")
@@ -361,13 +640,13 @@ class AudioCodec:
         保存默认音频设备配置到配置文件.
         """
         try:
-            devices = sd.query_devices()
+            devices = self._sd.query_devices()
             audio_config = {}
             
             # 保存输入设备配置
             if input_device_id is not None and 0 <= input_device_id < len(devices):
                 input_device = devices[input_device_id]
-                default_mark = " (默认)" if input_device_id == sd.default.device[0] else ""
+                default_mark = " (默认)" if input_device_id == self._sd.default.device[0] else ""
                 audio_config.update({
                     "input_device_id": input_device_id,
                     "input_device_name": input_device['name'] + default_mark,
@@ -377,7 +656,7 @@ class AudioCodec:
             # 保存输出设备配置
             if output_device_id is not None and 0 <= output_device_id < len(devices):
                 output_device = devices[output_device_id]
-                default_mark = " (默认)" if output_device_id == sd.default.device[1] else ""
+                default_mark = " (默认)" if output_device_id == self._sd.default.device[1] else ""
                 audio_config.update({
                     "output_device_id": output_device_id,
                     "output_device_name": output_device['name'] + default_mark,
@@ -401,10 +680,10 @@ class AudioCodec:
         """
         try:
             # 麦克风输入流，使用指定设备
-            self.input_stream = sd.InputStream(
+            self.input_stream = self._sd.InputStream(
                 device=self.mic_device_id,  # 指定麦克风设备ID
                 samplerate=self.device_input_sample_rate,
-                channels=AudioConfig.CHANNELS,
+                channels=self.input_channels,
                 dtype=np.int16,
                 blocksize=self._device_input_frame_size,
                 callback=self._input_callback,
@@ -424,7 +703,7 @@ class AudioCodec:
                     self.device_output_sample_rate * (AudioConfig.FRAME_DURATION / 1000)
                 )
 
-            self.output_stream = sd.OutputStream(
+            self.output_stream = self._sd.OutputStream(
                 device=self.speaker_device_id,  # 指定扬声器设备ID
                 samplerate=output_sample_rate,
                 channels=AudioConfig.CHANNELS,
@@ -447,94 +726,295 @@ class AudioCodec:
     def _input_callback(self, indata, frames, time_info, status):
         """
         录音回调，硬件驱动调用 处理流程：原始音频 -> 重采样16kHz -> 编码发送 + 唤醒词检测.
+        流水线模式下回调只拷贝样本，其余处理交给编码工作线程.
         """
-        if status and "overflow" not in str(status).lower():
-            logger.warning(f"输入流状态: {status}")
+        if status:
+            if status.input_overflow:
+                self._input_overflows += 1
+            if "overflow" not in str(status).lower():
+                logger.warning(f"输入流状态: {status}")
 
         if self._is_closing:
             return
 
+        start = time.perf_counter()
         try:
-            audio_data = indata.copy().flatten()
+            # 块首样本的采集时间，用于AEC参考信号对齐
+            capture_time = time_info.inputBufferAdcTime if time_info is not None else None
+            # 多声道输入先转单声道，之后只处理一个声道
+            samples = self._downmixer.process(indata)
+            if self._capture_worker is not None:
+                self._capture_worker.submit(samples, capture_time)
+                self._capture_timer.record("copy", time.perf_counter() - start)
+            else:
+                # 直接在回调内处理，indata 的视图在回调返回前一直有效
+                packets = self._capture_packets
+                self._process_captured_frame(samples, capture_time, packets)
+                if packets:
+                    dispatch_start = time.perf_counter()
+                    self._deliver_encoded_audio(packets)
+                    packets.clear()
+                    self._capture_timer.record(
+                        "dispatch", time.perf_counter() - dispatch_start
+                    )
 
-            # 重采样到16kHz（如果设备不是16kHz）
-            if self.input_resampler is not None:
-                audio_data = self._process_input_resampling(audio_data)
-                if audio_data is None:
-                    return
+        except Exception as e:
+            logger.error(f"输入回调错误: {e}")
+        finally:
+            self._capture_timer.record("callback", time.perf_counter() - start)
 
-            # 应用AEC处理（仅 macOS 需要）
-            if (self._aec_enabled and len(audio_data) == AudioConfig.INPUT_FRAME_SIZE and self.aec_processor._is_macos):
+    def _process_captured_frame(
+        self,
+        audio_data: np.ndarray,
+        capture_time: Optional[float],
+        packets: List[bytes],
+    ):
+        """处理一帧原始录音：重采样16kHz -> AEC -> DTX判定 -> Opus编码，并写入麦克风广播.
 
-                try:
-                    audio_data = self.aec_processor.process_audio(audio_data)
-                except Exception as e:
-                    logger.warning(f"AEC处理失败，使用原始音频: {e}")
+        直接模式在音频回调中调用，流水线模式在编码工作线程中调用。
+        16kHz帧写入录音帧池的预分配槽位，编码器直接读取该槽位，
+        再原位拷入麦克风广播的共享环，整个过程不分配新的数组.
 
-            # 实时编码并发送（不走队列，减少延迟）
-            if (
-                self._encoded_audio_callback
-                and len(audio_data) == AudioConfig.INPUT_FRAME_SIZE
-            ):
-                try:
-                    pcm_data = audio_data.astype(np.int16).tobytes()
-                    encoded_data = self.opus_encoder.encode(
-                        pcm_data, AudioConfig.INPUT_FRAME_SIZE
-                    )
+        Args:
+            audio_data: 设备采样率的原始样本
+            capture_time: 块首样本的采集时间（设备时钟，秒），未知时为None
+            packets: 编码包按顺序追加到该列表（DTX语音起始时先追加预录帧）；
+                未设置编码回调、数据不足一帧或DTX抑制时不追加
+        """
+        pool = self._capture_frames
+        frame_size = AudioConfig.INPUT_FRAME_SIZE
+
+        if self.input_resampler is not None:
+            # 重采样到16kHz，凑满一帧时直接读入帧池槽位
+            stage_start = time.perf_counter()
+            index = pool.acquire()
+            ready = self._process_input_resampling(audio_data, pool.frames[index])
+            self._capture_timer.record("resample", time.perf_counter() - stage_start)
+            if not ready:
+                return
+        elif len(audio_data) == frame_size:
+            stage_start = time.perf_counter()
+            index = pool.acquire()
+            np.copyto(pool.frames[index], audio_data)
+            self._capture_timer.record("copy", time.perf_counter() - stage_start)
+        else:
+            # 设备块大小与帧长不一致：无法编码，仅提供给麦克风消费者
+            self._mic_tap.write(audio_data)
+            return
 
-                    if encoded_data:
-                        self._encoded_audio_callback(encoded_data)
+        frame = pool.frames[index]
 
+        # 应用AEC处理（仅 macOS 需要）
+        if self._aec_enabled and self.aec_processor.uses_webrtc:
+            stage_start = time.perf_counter()
+            try:
+                frame_time = self._frame_capture_time(audio_data, capture_time)
+                np.copyto(frame, self.aec_processor.process_audio(frame, frame_time))
+            except Exception as e:
+                logger.warning(f"AEC处理失败，使用原始音频: {e}")
+            self._capture_timer.record("aec", time.perf_counter() - stage_start)
+
+        # 实时编码（不走队列，减少延迟）
+        if self._encoded_audio_callback or self._encoded_audio_batch_callback:
+            decision = self._dtx_decision(frame)
+            if decision != UplinkDtxGate.SUPPRESS:
+                stage_start = time.perf_counter()
+                try:
+                    if self._pending_encoder_settings is not None:
+                        self._apply_pending_encoder_settings()
+                    if decision == UplinkDtxGate.ONSET:
+                        for pointer in self._dtx_gate.take_preroll():
+                            packets.append(self._encode_frame(pointer))
+                    encoded_data = self._encode_frame(pool.pointers[index])
+                    packets.append(encoded_data)
+                    if decision in (UplinkDtxGate.HANGOVER, UplinkDtxGate.KEEPALIVE):
+                        self._dtx_gate.record_silence_packet(len(encoded_data))
                 except Exception as e:
                     logger.warning(f"实时录音编码失败: {e}")
+                self._capture_timer.record(
+                    "encode", time.perf_counter() - stage_start
+                )
 
-            # 同时提供给唤醒词检测（走队列）
-            self._put_audio_data_safe(self._wakeword_buffer, audio_data.copy())
+        # 同时广播给唤醒词、VAD等麦克风消费者
+        self._mic_tap.write(frame)
 
-        except Exception as e:
-            logger.error(f"输入回调错误: {e}")
+    def _dtx_decision(self, frame: np.ndarray) -> int:
+        """
+        DTX判定（未启用或当前监听模式不需要时总是发送）.
+        """
+        gate = self._dtx_gate
+        if gate is None or not self._dtx_active:
+            return UplinkDtxGate.SEND
+        stage_start = time.perf_counter()
+        if self._dtx_reset:
+            self._dtx_reset = False
+            gate.reset()
+        decision = gate.process(frame)
+        self._capture_timer.record("vad", time.perf_counter() - stage_start)
+        return decision
+
+    def set_dtx_active(self, active: bool):
+        """设置当前监听是否启用上行DTX（启用配置时才生效）.
+
+        每次调用都重新开始判定：先按语音处理满 hangover 时长，避免切掉开头.
+        """
+        self._dtx_active = bool(active) and self._dtx_gate is not None
+        self._dtx_reset = True
 
-    def _process_input_resampling(self, audio_data):
+    def finish_dtx_session(self) -> Optional[dict]:
         """
-        输入重采样到16kHz.
+        结束一次会话的DTX统计：记录日志并返回本次会话抑制的帧数和估算节省的字节数.
         """
-        try:
-            resampled_data = self.input_resampler.resample_chunk(audio_data, last=False)
-            if len(resampled_data) > 0:
-                self._resample_input_buffer.extend(resampled_data.astype(np.int16))
+        gate = self._dtx_gate
+        if gate is None:
+            return None
+        total, suppressed = gate.frames_total, gate.frames_suppressed
+        base_total, base_suppressed = self._dtx_session_base
+        self._dtx_session_base = (total, suppressed)
+        frames = total - base_total
+        if frames <= 0:
+            return None
+        saved = suppressed - base_suppressed
+        summary = {
+            "frames": frames,
+            "frames_suppressed": saved,
+            "bytes_saved": gate.estimated_bytes_saved(saved),
+            "suppressed_ratio": round(saved / frames, 3),
+        }
+        logger.info(
+            f"本次会话DTX: 未发送 {saved}/{frames} 帧 ({summary['suppressed_ratio']:.0%})，"
+            f"约节省 {summary['bytes_saved']} 字节"
+        )
+        return summary
+
+    def _frame_capture_time(
+        self, audio_data: np.ndarray, capture_time: Optional[float]
+    ) -> Optional[float]:
+        """
+        推算刚取出的16kHz帧首样本的采集时间：块末时间减去重采样缓冲中剩余样本和一帧的时长.
+        """
+        if capture_time is None:
+            return None
+        if self.input_resampler is None:
+            return capture_time
+        rate = AudioConfig.INPUT_SAMPLE_RATE
+        block_end = capture_time + len(audio_data) / self.device_input_sample_rate
+        pending = len(self._resample_input_buffer) + AudioConfig.INPUT_FRAME_SIZE
+        return block_end - pending / rate
+
+    def _encode_frame(self, pcm_pointer) -> bytes:
+        """
+        直接从帧池指针编码一帧16kHz PCM，输出写入预分配缓冲，只为结果包分配一次.
+        """
+        result = opuslib.api.encoder.libopus_encode(
+            self.opus_encoder.encoder_state,
+            pcm_pointer,
+            AudioConfig.INPUT_FRAME_SIZE,
+            self._encode_output,
+            self.MAX_OPUS_PACKET,
+        )
+        if result < 0:
+            raise opuslib.OpusError(result)
+        return ctypes.string_at(self._encode_output, result)
+
+    def set_encoder_settings(self, settings: dict):
+        """提交Opus编码参数变更（bitrate/complexity/inband_fec/packet_loss_perc）.
+
+        可在任意线程调用；参数在录音线程下一次编码前应用，避免与编码并发修改编码器状态.
+        """
+        unknown = set(settings) - set(self.ENCODER_CTLS)
+        if unknown:
+            raise ValueError(f"不支持的编码参数: {sorted(unknown)}")
+        with self._encoder_settings_lock:
+            if self._pending_encoder_settings is None:
+                self._pending_encoder_settings = dict(settings)
+            else:
+                self._pending_encoder_settings.update(settings)
 
-            expected_frame_size = AudioConfig.INPUT_FRAME_SIZE
-            if len(self._resample_input_buffer) < expected_frame_size:
-                return None
+    def get_encoder_settings(self) -> dict:
+        """
+        获取编码器当前生效的参数，以及是否有尚未应用的变更.
+        """
+        return {
+            **self._encoder_settings,
+            "pending": self._pending_encoder_settings is not None,
+        }
+
+    def _apply_pending_encoder_settings(self):
+        with self._encoder_settings_lock:
+            pending, self._pending_encoder_settings = (
+                self._pending_encoder_settings,
+                None,
+            )
+        if not pending or self.opus_encoder is None:
+            return
+        state = self.opus_encoder.encoder_state
+        for name, value in pending.items():
+            try:
+                opuslib.api.encoder.encoder_ctl(
+                    state, self.ENCODER_CTLS[name][0], int(value)
+                )
+            except opuslib.OpusError as e:
+                logger.warning(f"设置Opus编码参数 {name}={value} 失败: {e}")
+        self._encoder_settings = self._read_encoder_settings()
+
+    def _read_encoder_settings(self) -> dict:
+        state = self.opus_encoder.encoder_state
+        return {
+            name: opuslib.api.encoder.encoder_ctl(state, getter)
+            for name, (_, getter) in self.ENCODER_CTLS.items()
+        }
+
+    def _deliver_encoded_audio(self, packets):
+        """
+        交付编码数据：优先整批交给批量回调，否则逐包调用单包回调.
+        """
+        batch_callback = self._encoded_audio_batch_callback
+        if batch_callback:
+            batch_callback(packets)
+            return
 
-            frame_data = []
-            for _ in range(expected_frame_size):
-                frame_data.append(self._resample_input_buffer.popleft())
+        callback = self._encoded_audio_callback
+        if callback:
+            for packet in packets:
+                callback(packet)
 
-            return np.array(frame_data, dtype=np.int16)
+    def _process_input_resampling(self, audio_data, out: np.ndarray) -> bool:
+        """输入重采样到16kHz.
 
-        except Exception as e:
-            logger.error(f"输入重采样失败: {e}")
-            return None
+        Args:
+            audio_data: 设备采样率的原始样本
+            out: 预分配的16kHz帧缓冲，凑满一帧时写入
 
-    def _put_audio_data_safe(self, queue, audio_data):
-        """
-        安全入队，队列满时丢弃最旧数据.
+        Returns:
+            是否已写入完整一帧
         """
         try:
-            queue.put_nowait(audio_data)
-        except asyncio.QueueFull:
-            try:
-                queue.get_nowait()
-                queue.put_nowait(audio_data)
-            except asyncio.QueueEmpty:
-                queue.put_nowait(audio_data)
+            if self._clear_resample_input:
+                self._clear_resample_input = False
+                self._resample_input_buffer.clear()
+
+            resampled_data = self.input_resampler.resample_chunk(audio_data, last=False)
+            if len(resampled_data) > 0:
+                self._resample_input_buffer.write(resampled_data)
+
+            return (
+                self._resample_input_buffer.read(AudioConfig.INPUT_FRAME_SIZE, out=out)
+                is not None
+            )
+
+        except Exception as e:
+            logger.error(f"输入重采样失败: {e}")
+            return False
 
     def _output_callback(self, outdata: np.ndarray, frames: int, time_info, status):
         """
         播放回调，硬件驱动调用 从播放队列取数据输出到扬声器.
         """
+        start = time.perf_counter()
         if status:
+            if status.output_underflow:
+                self._output_underflows += 1
             if "underflow" not in str(status).lower():
                 logger.warning(f"输出流状态: {status}")
 
@@ -549,61 +1029,142 @@ class AudioCodec:
         except Exception as e:
             logger.error(f"输出回调错误: {e}")
             outdata.fill(0)
+        finally:
+            self._track_playback_drain(frames, time_info)
+            # 把实际写给设备的数据（含静音）作为AEC内部参考
+            render_reference = self._render_reference
+            if render_reference is not None:
+                render_reference.write_render_reference(
+                    outdata[:, 0],
+                    time_info.outputBufferDacTime if time_info is not None else None,
+                )
+            self._playback_timer.record("callback", time.perf_counter() - start)
 
-    def _output_callback_direct(self, outdata: np.ndarray, frames: int):
-        """
-        直接播放24kHz数据（设备支持24kHz时）
+    def _track_playback_drain(self, frames: int, time_info):
+        """播放回调中跟踪TTS播放进度，有排空等待者且最后一个样本已输出时通知事件循环.
+
+        用PortAudio的 outputBufferDacTime 推算本次取出的TTS数据何时播完，
+        之后的回调以 currentTime 判断是否已越过该时间；不可用时只看队列是否为空。
         """
+        played = self._tts_source.samples_played
+        self._tts_playing = played != self._tts_samples_seen
+        if self._tts_playing:
+            self._tts_samples_seen = played
+            if time_info is None:
+                self._tts_render_end = None
+                return
+            # 本次输出之外还留在重采样缓冲中的样本稍后播放
+            pending = len(self._resample_output_buffer) if self.output_resampler else 0
+            self._tts_render_end = time_info.outputBufferDacTime + (
+                frames + pending
+            ) / self.device_output_sample_rate
+            return
+
+        if not self._drain_requested or self._playback_pending():
+            return
+        if (
+            time_info is not None
+            and self._tts_render_end is not None
+            and time_info.currentTime < self._tts_render_end
+        ):
+            return
+
+        self._drain_requested = False
         try:
-            # 从播放队列获取音频数据
-            audio_data = self._output_buffer.get_nowait()
+            self._drain_loop.call_soon_threadsafe(self._resolve_drain_waiters)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
 
-            if len(audio_data) >= frames:
-                output_frames = audio_data[:frames]
-                outdata[:] = output_frames.reshape(-1, AudioConfig.CHANNELS)
-            else:
-                outdata[: len(audio_data)] = audio_data.reshape(
-                    -1, AudioConfig.CHANNELS
-                )
-                outdata[len(audio_data) :] = 0
+    def _playback_pending(self) -> bool:
+        """
+        是否还有待播放的TTS数据（抖动缓冲或播放队列）.
+        """
+        if self._tts_source.has_data():
+            return True
+        return self._jitter_buffer is not None and self._jitter_buffer.has_pending()
+
+    def _record_playback_underrun(self):
+        """静音回调中记录播放欠载.
 
-        except asyncio.QueueEmpty:
+        TTS播放中途数据不足时计一次；空闲静音和正常播完（已请求排空且无待播数据）不计.
+        """
+        if self._tts_playing and (
+            not self._drain_requested or self._playback_pending()
+        ):
+            self._output_buffer.record_underrun()
+
+    def _resolve_drain_waiters(self):
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(True)
+
+    def _output_callback_direct(self, outdata: np.ndarray, frames: int):
+        """
+        直接播放24kHz数据（设备支持24kHz时）
+        """
+        # 从混音器获取一帧（TTS播放队列 + 其他混音源）
+        start = time.perf_counter()
+        audio_data = self._mixer.mix()
+        copy_start = time.perf_counter()
+        self._playback_timer.record("mix", copy_start - start)
+        if audio_data is None:
             # 无数据时输出静音
+            self._record_playback_underrun()
             outdata.fill(0)
+            return
+
+        if len(audio_data) >= frames:
+            output_frames = audio_data[:frames]
+            outdata[:] = output_frames.reshape(-1, AudioConfig.CHANNELS)
+        else:
+            outdata[: len(audio_data)] = audio_data.reshape(-1, AudioConfig.CHANNELS)
+            outdata[len(audio_data) :] = 0
+        self._playback_timer.record("copy", time.perf_counter() - copy_start)
 
     def _output_callback_with_resample(self, outdata: np.ndarray, frames: int):
         """
         重采样播放（24kHz -> 设备采样率）
         """
         try:
-            # 持续处理24kHz数据进行重采样
-            while len(self._resample_output_buffer) < frames:
-                try:
-                    audio_data = self._output_buffer.get_nowait()
+            mix_time = 0.0
+            resample_time = 0.0
+            if self._clear_resample_output:
+                self._clear_resample_output = False
+                self._resample_output_buffer.clear()
 
-                    # 24kHz -> 设备采样率重采样
-                    resampled_data = self.output_resampler.resample_chunk(
-                        audio_data, last=False
-                    )
-                    if len(resampled_data) > 0:
-                        self._resample_output_buffer.extend(
-                            resampled_data.astype(np.int16)
-                        )
-
-                except asyncio.QueueEmpty:
+            # 持续混合24kHz数据，混合结果统一重采样一次
+            while len(self._resample_output_buffer) < frames:
+                start = time.perf_counter()
+                audio_data = self._mixer.mix()
+                resample_start = time.perf_counter()
+                mix_time += resample_start - start
+                if audio_data is None:
                     break
 
-            # 从重采样缓冲区取数据
-            if len(self._resample_output_buffer) >= frames:
-                frame_data = []
-                for _ in range(frames):
-                    frame_data.append(self._resample_output_buffer.popleft())
+                # 24kHz -> 设备采样率重采样
+                resampled_data = self.output_resampler.resample_chunk(
+                    audio_data, last=False
+                )
+                if len(resampled_data) > 0:
+                    self._resample_output_buffer.write(resampled_data)
+                resample_time += time.perf_counter() - resample_start
+
+            self._playback_timer.record("mix", mix_time)
+            if resample_time:
+                self._playback_timer.record("resample", resample_time)
 
-                output_array = np.array(frame_data, dtype=np.int16)
-                outdata[:] = output_array.reshape(-1, AudioConfig.CHANNELS)
-            else:
+            # 从重采样缓冲区直接拷贝到输出缓冲
+            copy_start = time.perf_counter()
+            if (
+                self._resample_output_buffer.read(frames, out=outdata.reshape(-1))
+                is None
+            ):
                 # 数据不足时输出静音
+                self._record_playback_underrun()
                 outdata.fill(0)
+            self._playback_timer.record("copy", time.perf_counter() - copy_start)
 
         except Exception as e:
             logger.warning(f"重采样输出失败: {e}")
@@ -640,9 +1201,9 @@ class AudioCodec:
                     self.input_stream.stop()
                     self.input_stream.close()
 
-                self.input_stream = sd.InputStream(
+                self.input_stream = self._sd.InputStream(
                     samplerate=self.device_input_sample_rate,
-                    channels=AudioConfig.CHANNELS,
+                    channels=self.input_channels,
                     dtype=np.int16,
                     blocksize=self._device_input_frame_size,
                     callback=self._input_callback,
@@ -670,7 +1231,7 @@ class AudioCodec:
                         * (AudioConfig.FRAME_DURATION / 1000)
                     )
 
-                self.output_stream = sd.OutputStream(
+                self.output_stream = self._sd.OutputStream(
                     device=self.speaker_device_id,  # 指定扬声器设备ID
                     samplerate=output_sample_rate,
                     channels=AudioConfig.CHANNELS,
@@ -691,28 +1252,71 @@ class AudioCodec:
             else:
                 raise
 
-    async def get_raw_audio_for_detection(self) -> Optional[bytes]:
+    def register_mic_consumer(
+        self, name: str, frame_size: int, sample_rate: Optional[int] = None
+    ) -> MicTapReader:
+        """注册麦克风消费者，返回带独立读游标的读端.
+
+        所有消费者共享 AudioCodec 的同一路采集流，不需要再打开其他输入流。
+
+        Args:
+            name: 消费者名称
+            frame_size: 每次读取的样本数（按 sample_rate 计）
+            sample_rate: 需要的采样率，默认16kHz，不同时由读端自行重采样
         """
-        获取唤醒词音频数据.
+        return self._mic_tap.register(name, frame_size, sample_rate)
+
+    def unregister_mic_consumer(self, reader: MicTapReader):
         """
-        try:
-            if self._wakeword_buffer.empty():
-                return None
+        注销麦克风消费者.
+        """
+        self._mic_tap.unregister(reader)
+
+    def add_mixer_source(
+        self,
+        name: str,
+        priority: int = OutputMixer.PRIORITY_MUSIC,
+        gain: float = 1.0,
+        duck_gain: float = 1.0,
+        maxsize: int = 64,
+    ) -> MixerSource:
+        """添加播放混音源（音乐、提示音等），与TTS共用同一个输出流.
 
-            audio_data = self._wakeword_buffer.get_nowait()
+        Args:
+            name: 源名称
+            priority: 优先级，TTS为 OutputMixer.PRIORITY_TTS
+            gain: 源增益（线性）
+            duck_gain: 有更高优先级源播放时叠加的增益
+            maxsize: 待播放块队列容量
 
-            if hasattr(audio_data, "tobytes"):
-                return audio_data.tobytes()
-            elif hasattr(audio_data, "astype"):
-                return audio_data.astype("int16").tobytes()
-            else:
-                return audio_data
+        数据须为 AudioConfig.OUTPUT_SAMPLE_RATE 采样率的单声道int16样本.
+        """
+        return self._mixer.add_source(
+            name, priority=priority, gain=gain, duck_gain=duck_gain, maxsize=maxsize
+        )
 
-        except asyncio.QueueEmpty:
-            return None
-        except Exception as e:
-            logger.error(f"获取唤醒词音频数据失败: {e}")
-            return None
+    def remove_mixer_source(self, source: MixerSource):
+        """
+        移除播放混音源并丢弃其未播放的数据.
+        """
+        self._mixer.remove_source(source)
+
+    def set_output_gain(self, gain: float):
+        """
+        设置播放主增益（线性，软件音量），在下一帧内平滑过渡到新值.
+        """
+        self._mixer.master_gain = max(0.0, float(gain))
+
+    def get_output_gain(self) -> float:
+        return self._mixer.master_gain
+
+    def get_queue_stats(self) -> dict:
+        """
+        获取跨线程音频队列统计（队列深度、溢出和欠载次数）.
+        """
+        return {
+            "output": self._output_buffer.get_stats(),
+        }
 
     def set_encoded_audio_callback(self, callback):
         """
@@ -725,6 +1329,133 @@ class AudioCodec:
         else:
             logger.info("禁用编码回调")
 
+    def set_encoded_audio_batch_callback(self, callback):
+        """设置批量编码回调.
+
+        设置后编码数据以列表形式整批交付（流水线模式下一次唤醒产生的所有包），
+        优先于单包回调。列表在回调返回后可能被复用，回调不得持有列表本身.
+        """
+        self._encoded_audio_batch_callback = callback
+
+        if callback:
+            logger.info("启用批量实时编码")
+        else:
+            logger.info("禁用批量编码回调")
+
+    def get_capture_timing(self) -> dict:
+        """
+        获取录音路径各阶段耗时统计（callback/copy/resample/aec/encode/dispatch）.
+        """
+        stats = {
+            "pipelined": self._capture_worker is not None,
+            "stages": self._capture_timer.snapshot(),
+        }
+        if self._capture_worker is not None:
+            stats["worker"] = self._capture_worker.get_stats()
+        return stats
+
+    def get_audio_stats(self) -> dict:
+        """获取音频管线统计.
+
+        包含录音/播放各阶段耗时直方图（毫秒），设备溢出/欠载次数，
+        以及各级缓冲因溢出丢弃的帧数（重采样缓冲为样本数）.
+        """
+        queues = self.get_queue_stats()
+        mic_consumers = self._mic_tap.get_stats()
+        dropped = {
+            "mic_tap_samples": sum(
+                reader["overrun_samples"] for reader in mic_consumers.values()
+            ),
+            "output_frames": queues["output"]["overruns"],
+            "input_resample_samples": self._resample_input_buffer.overflow_samples,
+            "output_resample_samples": self._resample_output_buffer.overflow_samples,
+        }
+        if self._capture_worker is not None:
+            dropped["capture_worker_frames"] = self._capture_worker.get_stats()[
+                "queue"
+            ]["overruns"]
+
+        return {
+            "frame_duration_ms": AudioConfig.FRAME_DURATION,
+            "device_input_sample_rate": self.device_input_sample_rate,
+            "device_output_sample_rate": self.device_output_sample_rate,
+            "input_channels": self._downmixer.describe(),
+            "sample_rate_negotiation": self.get_sample_rate_status(),
+            "capture": self._capture_timer.snapshot(),
+            "playback": self._playback_timer.snapshot(),
+            "input_overflows": self._input_overflows,
+            "output_underflows": self._output_underflows,
+            "playback_underruns": queues["output"]["underruns"],
+            "dropped": dropped,
+            "mic_consumers": mic_consumers,
+            "mixer": self._mixer.get_stats(),
+            "output_gain": round(self._mixer.master_gain, 3),
+            "encoder": self.get_encoder_settings(),
+            "dtx": self._dtx_gate.get_stats() if self._dtx_gate else None,
+            "jitter_buffer": self.get_jitter_buffer_stats(),
+        }
+
+    def get_sample_rate_status(self) -> dict:
+        """
+        获取采样率协商结果（input/output：默认采样率、实际采样率、是否重采样）.
+        """
+        return {kind: dict(info) for kind, info in self._sample_rate_negotiation.items()}
+
+    def reset_audio_stats(self):
+        """
+        重置阶段耗时统计和xrun计数（队列计数不受影响）.
+        """
+        self._capture_timer.reset()
+        self._playback_timer.reset()
+        self._input_overflows = 0
+        self._output_underflows = 0
+
+    def _start_stats_logger(self):
+        """
+        按配置启动周期性统计日志（AUDIO_OPTIONS.STATS_LOG_INTERVAL 秒，0为关闭）.
+        """
+        try:
+            interval = float(
+                self.config.get_config("AUDIO_OPTIONS.STATS_LOG_INTERVAL", 0)
+            )
+        except (TypeError, ValueError):
+            interval = 0
+        if interval <= 0:
+            return
+        self._stats_log_task = asyncio.create_task(
+            self._stats_log_loop(interval), name="音频统计日志"
+        )
+
+    async def _stats_log_loop(self, interval: float):
+        """
+        周期性输出一行音频管线统计摘要.
+        """
+        while not self._is_closing:
+            try:
+                await asyncio.sleep(interval)
+                stats = self.get_audio_stats()
+                capture = stats["capture"]
+                playback = stats["playback"]
+                dropped = stats["dropped"]
+                resample_dropped = (
+                    dropped["input_resample_samples"] + dropped["output_resample_samples"]
+                )
+                logger.info(
+                    f"音频统计: 录音回调 p99={capture['callback']['p99_ms']:.2f}ms "
+                    f"max={capture['callback']['max_ms']:.2f}ms "
+                    f"编码 avg={capture['encode']['avg_ms']:.2f}ms | "
+                    f"播放回调 p99={playback['callback']['p99_ms']:.2f}ms "
+                    f"max={playback['callback']['max_ms']:.2f}ms | "
+                    f"输入溢出={stats['input_overflows']} "
+                    f"输出欠载={stats['output_underflows']} "
+                    f"播放欠载={stats['playback_underruns']} "
+                    f"丢帧(播放/重采样)={dropped['output_frames']}/{resample_dropped}"
+                )
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"输出音频统计失败: {e}")
+
     def is_aec_enabled(self) -> bool:
         """
         检查AEC是否启用.
@@ -768,15 +1499,76 @@ class AudioCodec:
         logger.info(f"AEC状态: {'启用' if self._aec_enabled else '禁用'}")
         return self._aec_enabled
 
-    async def write_audio(self, opus_data: bytes):
+    async def write_audio(
+        self,
+        opus_data: bytes,
+        sequence: Optional[int] = None,
+        arrival: Optional[float] = None,
+    ):
+        """解码音频并播放 网络接收的Opus数据 -> 解码24kHz -> 播放队列.
+
+        启用抖动缓冲时先写入抖动缓冲，由播放泵按播放进度解码.
+
+        Args:
+            opus_data: Opus数据包
+            sequence: 数据包序列号（UDP通道提供，用于重排和丢包判断）
+            arrival: 到达时间（time.monotonic），用于抖动估计
+        """
+        if self._jitter_buffer is not None:
+            if self._jitter_buffer.push(opus_data, sequence, arrival):
+                self._ensure_playout_task()
+                self._playout_event.set()
+            return
+
+        audio_array = self._decode_opus_frame(opus_data)
+        if audio_array is not None:
+            # 放入播放队列
+            self._output_buffer.put(audio_array)
+
+    async def write_audio_batch(self, frames):
+        """按顺序写入一批下行音频.
+
+        Args:
+            frames: (opus_data, sequence, arrival) 元组列表
+        """
+        for opus_data, sequence, arrival in frames:
+            await self.write_audio(opus_data, sequence, arrival)
+
+    def playback_backlog(self) -> int:
+        """
+        播放端积压的帧数（抖动缓冲 + 已解码播放队列），用于上游背压.
         """
-        解码音频并播放 网络接收的Opus数据 -> 解码24kHz -> 播放队列.
+        backlog = self._output_buffer.qsize()
+        if self._jitter_buffer is not None:
+            backlog += self._jitter_buffer.depth()
+        return backlog
+
+    def _decode_opus_frame(
+        self, opus_data: Optional[bytes], decode_fec: bool = False
+    ) -> Optional[np.ndarray]:
+        """解码一帧Opus数据为24kHz PCM.
+
+        Args:
+            opus_data: Opus数据，为None时执行丢包隐藏(PLC)
+            decode_fec: 是否从该包的带内FEC恢复上一帧
+
+        Returns:
+            PCM数组，解码失败返回None
         """
         try:
-            # Opus解码为24kHz PCM数据
-            pcm_data = self.opus_decoder.decode(
-                opus_data, AudioConfig.OUTPUT_FRAME_SIZE
-            )
+            if opus_data is None:
+                pcm_data = opuslib.api.decoder.decode(
+                    self.opus_decoder.decoder_state,
+                    None,
+                    0,
+                    AudioConfig.OUTPUT_FRAME_SIZE,
+                    False,
+                    channels=AudioConfig.CHANNELS,
+                )
+            else:
+                pcm_data = self.opus_decoder.decode(
+                    opus_data, AudioConfig.OUTPUT_FRAME_SIZE, decode_fec
+                )
 
             audio_array = np.frombuffer(pcm_data, dtype=np.int16)
 
@@ -785,30 +1577,111 @@ class AudioCodec:
                 logger.warning(
                     f"解码音频长度异常: {len(audio_array)}, 期望: {expected_length}"
                 )
-                return
+                return None
 
-            # 放入播放队列
-            self._put_audio_data_safe(self._output_buffer, audio_array)
+            return audio_array
 
         except opuslib.OpusError as e:
             logger.warning(f"Opus解码失败，丢弃此帧: {e}")
         except Exception as e:
             logger.warning(f"音频写入失败，丢弃此帧: {e}")
+        return None
+
+    def _ensure_playout_task(self):
+        """
+        按需启动抖动缓冲播放泵.
+        """
+        if self._playout_task is None or self._playout_task.done():
+            self._playout_event = asyncio.Event()
+            self._playout_task = asyncio.create_task(
+                self._playout_loop(), name="音频播放泵"
+            )
+
+    async def _playout_loop(self):
+        """
+        播放泵：保持播放队列浅水位，从抖动缓冲按序取帧解码，缺失帧用FEC/PLC隐藏.
+        """
+        frame_interval = AudioConfig.FRAME_DURATION / 1000
+        jitter_buffer = self._jitter_buffer
+
+        while not self._is_closing and jitter_buffer is self._jitter_buffer:
+            try:
+                while self._output_buffer.qsize() < self.PLAYOUT_QUEUE_FRAMES:
+                    decision = jitter_buffer.pop()
+                    if decision is None:
+                        break
+
+                    kind, packet = decision
+                    if kind == JitterBuffer.PACKET:
+                        audio_array = self._decode_opus_frame(packet)
+                    else:
+                        # 有后续包时尝试带内FEC恢复，否则PLC
+                        audio_array = self._decode_opus_frame(
+                            packet, decode_fec=packet is not None
+                        )
+                    if audio_array is not None:
+                        self._output_buffer.put(audio_array)
+
+                if jitter_buffer.is_playing:
+                    # 播放中：按半帧间隔补充播放队列
+                    await asyncio.sleep(frame_interval / 2)
+                else:
+                    # 缓冲中或已耗尽：等待新数据到达
+                    self._playout_event.clear()
+                    if not jitter_buffer.has_pending():
+                        await self._playout_event.wait()
+                    else:
+                        await asyncio.wait_for(
+                            self._playout_event.wait(), timeout=frame_interval
+                        )
+            except asyncio.TimeoutError:
+                continue
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"播放泵处理失败: {e}")
+                await asyncio.sleep(frame_interval)
 
-    async def wait_for_audio_complete(self, timeout=10.0):
+    def get_jitter_buffer_stats(self) -> dict:
+        """
+        获取抖动缓冲统计（当前深度、目标深度、隐藏帧、晚到帧等）.
         """
-        等待播放完成.
+        if self._jitter_buffer is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._jitter_buffer.get_stats()}
+
+    def playback_drained(self) -> asyncio.Future:
+        """返回播放排空Future（仅限事件循环线程调用）.
+
+        已排队的TTS数据全部播完、最后一个样本到达设备后由播放回调置位；
+        播放流未运行时若无待播数据则立即完成。等待方可安全地取消该Future。
         """
-        start = time.time()
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
 
-        while not self._output_buffer.empty() and time.time() - start < timeout:
-            await asyncio.sleep(0.05)
+        stream = self.output_stream
+        if (stream is None or not stream.active) and not self._playback_pending():
+            waiter.set_result(True)
+            return waiter
 
-        await asyncio.sleep(0.3)
+        self._drain_loop = loop
+        self._drain_waiters.append(waiter)
+        self._drain_requested = True
+        return waiter
 
-        if not self._output_buffer.empty():
+    async def wait_for_audio_complete(self, timeout=10.0) -> bool:
+        """等待播放完成（事件驱动，不轮询）.
+
+        Returns:
+            是否在超时前播放完成
+        """
+        try:
+            await asyncio.wait_for(self.playback_drained(), timeout)
+            return True
+        except asyncio.TimeoutError:
             output_remaining = self._output_buffer.qsize()
             logger.warning(f"音频播放超时，剩余队列 - 输出: {output_remaining} 帧")
+            return False
 
     async def clear_audio_queue(self):
         """
@@ -816,26 +1689,24 @@ class AudioCodec:
         """
         cleared_count = 0
 
-        queues_to_clear = [
-            self._wakeword_buffer,
-            self._output_buffer,
-        ]
+        cleared_count += self._tts_source.clear()
+        self._mic_tap.discard_all()
 
-        for queue in queues_to_clear:
-            while not queue.empty():
-                try:
-                    queue.get_nowait()
-                    cleared_count += 1
-                except asyncio.QueueEmpty:
-                    break
+        if self._capture_worker is not None:
+            cleared_count += self._capture_worker.clear()
+
+        if self._jitter_buffer is not None:
+            cleared_count += self._jitter_buffer.depth()
+            self._jitter_buffer.reset()
 
+        # 重采样缓冲交给录音/播放线程清空，避免与其读写并发
         if self._resample_input_buffer:
             cleared_count += len(self._resample_input_buffer)
-            self._resample_input_buffer.clear()
+            self._clear_resample_input = True
 
         if self._resample_output_buffer:
             cleared_count += len(self._resample_output_buffer)
-            self._resample_output_buffer.clear()
+            self._clear_resample_output = True
 
         if cleared_count > 0:
             logger.info(f"清空音频队列，丢弃 {cleared_count} 帧音频数据")
@@ -917,6 +1788,23 @@ class AudioCodec:
                 finally:
                     self.input_stream = None
 
+            if self._capture_worker is not None:
+                self._capture_worker.stop()
+                self._capture_worker = None
+
+            if self._stats_log_task is not None and not self._stats_log_task.done():
+                self._stats_log_task.cancel()
+            self._stats_log_task = None
+
+            if self._playout_task is not None and not self._playout_task.done():
+                self._playout_task.cancel()
+                try:
+                    await self._playout_task
+                except asyncio.CancelledError:
+                    pass
+            self._playout_task = None
+            self._jitter_buffer = None
+
             if self.output_stream:
                 try:
                     self.output_stream.stop()
@@ -935,6 +1823,7 @@ class AudioCodec:
             self._resample_output_buffer.clear()
 
             # 关闭AEC处理器
+            self._render_reference = None
             if self.aec_processor:
                 try:
                     await self.aec_processor.close()
@@ -945,6 +1834,7 @@ class AudioCodec:
 
             self.opus_encoder = None
             self.opus_decoder = None
+            self._encoder_settings = {}
 
             gc.collect()
 
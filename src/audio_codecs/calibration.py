@@ -0,0 +1,207 @@
+import platform
+import time
+from datetime import datetime
+from typing import Optional
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 校准结果保存位置及相关配置
+CALIBRATION_KEY = "AUDIO_OPTIONS.CALIBRATION"
+CPU_BUDGET_KEY = "AUDIO_OPTIONS.CPU_BUDGET"
+AUTO_CALIBRATE_KEY = "AUDIO_OPTIONS.AUTO_CALIBRATE"
+
+# 音频管线允许占用的单核CPU比例
+DEFAULT_CPU_BUDGET = 0.2
+# 候选帧时长（从低延迟到低开销）与Opus复杂度（从高到低）
+FRAME_DURATIONS = (20, 60)
+COMPLEXITIES = tuple(range(10, -1, -1))
+
+# 基准负载：典型设备采样率下的录音重采样+编码、解码+播放重采样
+DEVICE_SAMPLE_RATE = 48000
+INPUT_SAMPLE_RATE = 16000
+# 按官方服务器的24kHz下行测量，其他服务器（16kHz）开销更低
+OUTPUT_SAMPLE_RATE = 24000
+BENCHMARK_SECONDS = 1.0
+BENCHMARK_REPEATS = 3
+
+
+def get_cpu_budget(config) -> float:
+    """
+    读取音频管线CPU预算（AUDIO_OPTIONS.CPU_BUDGET，单核占用比例0~1）.
+    """
+    try:
+        budget = float(config.get_config(CPU_BUDGET_KEY, DEFAULT_CPU_BUDGET))
+    except (TypeError, ValueError):
+        budget = DEFAULT_CPU_BUDGET
+    if not 0 < budget <= 1:
+        logger.warning(f"CPU预算无效: {budget}，使用 {DEFAULT_CPU_BUDGET}")
+        budget = DEFAULT_CPU_BUDGET
+    return budget
+
+
+def load_calibration(config=None) -> Optional[dict]:
+    """读取已保存的校准结果.
+
+    结果与当前主机架构或CPU预算不一致（如配置被拷贝到其他设备）时视为无效.
+
+    Returns:
+        校准结果（FRAME_DURATION/OPUS_COMPLEXITY/CPU_LOAD等），无有效结果时返回None
+    """
+    config = config or ConfigManager.get_instance()
+    result = config.get_config(CALIBRATION_KEY, None)
+    if not isinstance(result, dict):
+        return None
+    if result.get("MACHINE") != platform.machine():
+        return None
+    if result.get("CPU_BUDGET") != get_cpu_budget(config):
+        return None
+    if result.get("FRAME_DURATION") not in FRAME_DURATIONS:
+        return None
+    if result.get("OPUS_COMPLEXITY") not in COMPLEXITIES:
+        return None
+    return result
+
+
+def measure_pipeline_load(
+    frame_duration_ms: int,
+    complexity: int,
+    seconds: float = BENCHMARK_SECONDS,
+    repeats: int = BENCHMARK_REPEATS,
+) -> float:
+    """测量在本机处理音频的CPU占用比例（处理耗时 / 音频时长）.
+
+    每帧执行：设备采样率 -> 16kHz 重采样、Opus编码（指定复杂度）、
+    24kHz Opus解码、24kHz -> 设备采样率重采样。取多次测量的最小值以排除干扰.
+    """
+    import numpy as np
+    import opuslib
+
+    from src.audio_codecs.resampler import create_resampler, resampler_options
+
+    options = resampler_options(ConfigManager.get_instance())
+    device_frame = DEVICE_SAMPLE_RATE * frame_duration_ms // 1000
+    input_frame = INPUT_SAMPLE_RATE * frame_duration_ms // 1000
+    output_frame = OUTPUT_SAMPLE_RATE * frame_duration_ms // 1000
+    frames = max(1, int(seconds * 1000 / frame_duration_ms))
+
+    # 类语音测试信号：谐波 + 噪声，避免编码器对静音走捷径
+    rng = np.random.default_rng(0)
+    t = np.arange(device_frame * frames) / DEVICE_SAMPLE_RATE
+    signal = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 12))
+    signal = signal + 0.3 * rng.standard_normal(len(t))
+    device_audio = (6000 * signal / np.max(np.abs(signal))).astype(np.int16)
+
+    # 下行包预先编码，计时只包含解码
+    downlink_encoder = opuslib.Encoder(OUTPUT_SAMPLE_RATE, 1, opuslib.APPLICATION_AUDIO)
+    downlink_audio = device_audio[:: DEVICE_SAMPLE_RATE // OUTPUT_SAMPLE_RATE]
+    packets = [
+        downlink_encoder.encode(
+            downlink_audio[i * output_frame : (i + 1) * output_frame].tobytes(),
+            output_frame,
+        )
+        for i in range(frames)
+    ]
+
+    best = float("inf")
+    for _ in range(repeats):
+        encoder = opuslib.Encoder(INPUT_SAMPLE_RATE, 1, opuslib.APPLICATION_AUDIO)
+        encoder.complexity = complexity
+        decoder = opuslib.Decoder(OUTPUT_SAMPLE_RATE, 1)
+        input_resampler = create_resampler(
+            DEVICE_SAMPLE_RATE, INPUT_SAMPLE_RATE, **options
+        )
+        output_resampler = create_resampler(
+            OUTPUT_SAMPLE_RATE, DEVICE_SAMPLE_RATE, **options
+        )
+        pending = np.zeros(0, dtype=np.int16)
+
+        start = time.perf_counter()
+        for i in range(frames):
+            block = device_audio[i * device_frame : (i + 1) * device_frame]
+            resampled = input_resampler.resample_chunk(block)
+            pending = np.concatenate((pending, resampled))
+            if len(pending) >= input_frame:
+                encoder.encode(pending[:input_frame].tobytes(), input_frame)
+                pending = pending[input_frame:]
+            pcm = decoder.decode(packets[i], output_frame)
+            output_resampler.resample_chunk(np.frombuffer(pcm, dtype=np.int16))
+        best = min(best, time.perf_counter() - start)
+
+    return best / (frames * frame_duration_ms / 1000)
+
+
+def calibrate(budget: float) -> dict:
+    """选择满足CPU预算的最短帧时长，以及该帧时长下预算内的最高复杂度.
+
+    所有组合都超出预算时使用最长帧时长和最低复杂度.
+    """
+    from src.utils.opus_loader import setup_opus
+
+    setup_opus()
+
+    chosen = None
+    for duration in FRAME_DURATIONS:
+        for complexity in COMPLEXITIES:
+            load = measure_pipeline_load(duration, complexity)
+            logger.debug(f"校准: {duration}ms 复杂度{complexity} CPU占用 {load:.1%}")
+            if load <= budget:
+                chosen = (duration, complexity, load)
+                break
+        if chosen:
+            break
+
+    if chosen is None:
+        duration, complexity = FRAME_DURATIONS[-1], COMPLEXITIES[-1]
+        chosen = (duration, complexity, measure_pipeline_load(duration, complexity))
+        logger.warning(
+            f"音频管线在最低配置下仍超出CPU预算 {budget:.1%}（{chosen[2]:.1%}）"
+        )
+
+    duration, complexity, load = chosen
+    return {
+        "FRAME_DURATION": duration,
+        "OPUS_COMPLEXITY": complexity,
+        "CPU_LOAD": round(load, 4),
+        "CPU_BUDGET": budget,
+        "MACHINE": platform.machine(),
+        "CALIBRATED_AT": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def ensure_calibration(force: bool = False) -> Optional[dict]:
+    """启动时调用：没有有效的已保存结果时运行校准并写入配置.
+
+    必须在导入 src.constants.constants 之前调用，帧时长在导入时确定。
+    AUDIO_OPTIONS.AUTO_CALIBRATE 为False时只在 force 时运行.
+
+    Args:
+        force: 忽略已保存的结果重新校准（命令行 --calibrate-audio）
+
+    Returns:
+        当前有效的校准结果，未校准或校准失败时返回None
+    """
+    config = ConfigManager.get_instance()
+    if not force:
+        result = load_calibration(config)
+        if result is not None or not config.get_config(AUTO_CALIBRATE_KEY, True):
+            return result
+
+    budget = get_cpu_budget(config)
+    logger.info(f"开始音频性能校准（CPU预算 {budget:.0%}）")
+    start = time.perf_counter()
+    try:
+        result = calibrate(budget)
+    except Exception as e:
+        logger.error(f"音频性能校准失败，使用默认帧时长: {e}", exc_info=True)
+        return None
+
+    config.update_config(CALIBRATION_KEY, result)
+    logger.info(
+        f"音频性能校准完成（{time.perf_counter() - start:.1f}s）: "
+        f"帧时长 {result['FRAME_DURATION']}ms, Opus复杂度 {result['OPUS_COMPLEXITY']}, "
+        f"CPU占用 {result['CPU_LOAD']:.1%}"
+    )
+    return result
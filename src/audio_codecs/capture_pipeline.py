@@ -0,0 +1,133 @@
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from src.audio_codecs.frame_pool import AudioFramePool
+from src.audio_codecs.frame_queue import AudioFrameQueue
+from src.audio_codecs.stage_timer import StageTimer
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CaptureEncoderWorker:
+    """
+    录音编码工作线程（流水线采集模式）.
+
+    输入回调只把原始样本拷贝进有界队列；本线程负责重采样、AEC和Opus编码，
+    并把同一次唤醒中产生的编码包批量交付，减少跨线程调度次数。
+    """
+
+    def __init__(
+        self,
+        process_frame: Callable[[np.ndarray, Optional[float], List[bytes]], None],
+        deliver_batch: Callable[[List[bytes]], None],
+        timer: StageTimer,
+        maxsize: int = 50,
+        frame_size: Optional[int] = None,
+    ):
+        """
+        Args:
+            process_frame: 处理一帧原始音频及其采集时间，把编码包按顺序追加到给定列表
+            deliver_batch: 交付一批编码包，在工作线程中调用
+            timer: 阶段耗时统计
+            maxsize: 原始帧队列容量，满时丢弃最旧帧
+            frame_size: 设备每块样本数，提供时回调直接拷入预分配帧池
+        """
+        self._process_frame = process_frame
+        self._deliver_batch = deliver_batch
+        self._timer = timer
+
+        self._frames = AudioFrameQueue(maxsize=maxsize)
+        # 帧池容量为队列的两倍，工作线程处理中的槽位不会被回调覆盖
+        self._pool = (
+            AudioFramePool(maxsize * 2, frame_size) if frame_size else None
+        )
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.batch_count = 0
+        # 已处理（含交付）的帧数
+        self.frames_processed = 0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="CaptureEncoder", daemon=True
+        )
+        self._thread.start()
+        logger.info("录音编码工作线程已启动")
+
+    def stop(self, timeout: float = 1.0):
+        self._running = False
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        self._frames.clear()
+        logger.info("录音编码工作线程已停止")
+
+    def is_running(self) -> bool:
+        return self._running and self._thread is not None
+
+    def submit(self, indata: np.ndarray, capture_time: Optional[float] = None):
+        """
+        音频回调中调用：仅拷贝样本（连同采集时间）并唤醒工作线程.
+        """
+        samples = indata.reshape(-1)
+        pool = self._pool
+        if pool is not None and len(samples) == pool.frame_size:
+            index = pool.acquire()
+            np.copyto(pool.frames[index], samples)
+            self._frames.put((pool.views[index], capture_time))
+        else:
+            self._frames.put((samples.copy(), capture_time))
+        self._wakeup.set()
+
+    def clear(self) -> int:
+        return self._frames.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "running": self.is_running(),
+            "batches": self.batch_count,
+            "frames_processed": self.frames_processed,
+            "queue": self._frames.get_stats(),
+        }
+
+    def _run(self):
+        while self._running:
+            if self._frames.empty():
+                self._wakeup.wait(timeout=0.1)
+            self._wakeup.clear()
+
+            # 单批上限为队列容量，持续积压时分批交付，避免批次无限增长
+            packets = []
+            processed = 0
+            while self._running and len(packets) < self._frames.maxsize:
+                item = self._frames.get_nowait()
+                if item is None:
+                    break
+                processed += 1
+                try:
+                    self._process_frame(*item, packets)
+                except Exception as e:
+                    logger.warning(f"录音编码线程处理失败: {e}")
+
+            if not packets:
+                self.frames_processed += processed
+                continue
+
+            start = time.perf_counter()
+            try:
+                self._deliver_batch(packets)
+            except Exception as e:
+                logger.warning(f"交付编码数据失败: {e}")
+            self._timer.record("dispatch", time.perf_counter() - start)
+            self.batch_count += 1
+            self.frames_processed += processed
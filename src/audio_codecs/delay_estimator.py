@@ -0,0 +1,232 @@
+import threading
+from typing import Callable, Optional
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class EchoDelayEstimator:
+    """
+    回声路径延迟估计器（参考信号 -> 麦克风）.
+
+    录音路径每帧调用 feed() 把参考帧和采集帧写入各自的历史环（仅两次切片拷贝）；
+    后台线程定期取出最近的窗口，用 FFT 计算 GCC-PHAT 互相关，在允许的延迟范围内
+    找峰值。峰值相对次峰越突出置信度越高，置信度足够的估计按置信度加权平滑，
+    结果通过回调交给调用方（由录音线程在下一帧应用到WebRTC）。
+    """
+
+    # 计算置信度时视为同一回声路径（直达声+早期反射）的主峰邻域
+    PEAK_GUARD_MS = 5
+    # 广义PHAT加权指数：1为纯相位变换，略小于1保留部分幅度信息以抗噪
+    PHAT_BETA = 0.8
+    # 互功率谱跨轮次的递归平均系数（保留上一轮的比例），双讲时累积证据
+    SPECTRUM_DECAY = 0.5
+
+    def __init__(
+        self,
+        sample_rate: int,
+        window_ms: int = 1000,
+        max_delay_ms: int = 500,
+        interval: float = 2.0,
+        min_confidence: float = 0.3,
+        smoothing: float = 0.5,
+        min_reference_rms: float = 100.0,
+        on_estimate: Optional[Callable[[int], None]] = None,
+    ):
+        """
+        Args:
+            sample_rate: 参考与采集信号的采样率
+            window_ms: 每次估计使用的信号窗口长度
+            max_delay_ms: 搜索的最大延迟
+            interval: 后台估计间隔（秒）
+            min_confidence: 接受估计的最低置信度（0~1）
+            smoothing: 平滑系数（0~1，越大越快跟随新估计）
+            min_reference_rms: 参考信号能量低于该值时跳过估计（无回声可测）
+            on_estimate: 平滑后的延迟（毫秒）变化时调用，在估计线程中执行
+        """
+        if window_ms <= 0 or max_delay_ms <= 0:
+            raise ValueError(f"延迟估计窗口参数无效: {window_ms}ms / {max_delay_ms}ms")
+
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.min_confidence = min_confidence
+        self.smoothing = smoothing
+        self.min_reference_rms = min_reference_rms
+        self._on_estimate = on_estimate
+
+        self._window = sample_rate * window_ms // 1000
+        self._max_lag = sample_rate * max_delay_ms // 1000
+        # 历史环：参考需要多保留一个最大延迟，采集窗口与参考窗口末端对齐
+        self._capacity = self._window + self._max_lag
+        self._reference = np.zeros(self._capacity, dtype=np.int16)
+        self._capture = np.zeros(self._capacity, dtype=np.int16)
+        self._write_total = 0
+        self._lock = threading.Lock()
+
+        # FFT长度取不小于线性互相关所需长度的2的幂，避免循环卷绕
+        self._nfft = 1 << int(np.ceil(np.log2(2 * self._capacity)))
+        self._ref_window = np.zeros(self._capacity, dtype=np.float32)
+        self._cap_window = np.zeros(self._capacity, dtype=np.float32)
+        self._cross_spectrum: Optional[np.ndarray] = None
+
+        # 估计结果
+        self.delay_ms: Optional[float] = None
+        self.confidence = 0.0
+        self.raw_delay_ms: Optional[float] = None
+        self.estimates = 0
+        self.rejected = 0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="EchoDelayEstimator", daemon=True
+        )
+        self._thread.start()
+        logger.info("回声延迟估计线程已启动")
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def feed(self, reference: np.ndarray, capture: np.ndarray):
+        """
+        录音路径调用：写入等长的参考帧和采集帧（不分配内存）.
+        """
+        n = min(len(reference), len(capture), self._capacity)
+        if n == 0:
+            return
+        with self._lock:
+            pos = self._write_total % self._capacity
+            first = min(n, self._capacity - pos)
+            self._reference[pos : pos + first] = reference[:first]
+            self._capture[pos : pos + first] = capture[:first]
+            if first < n:
+                self._reference[: n - first] = reference[first:n]
+                self._capture[: n - first] = capture[first:n]
+            self._write_total += n
+
+    def reset(self):
+        """
+        清空历史和估计结果（如设备切换后）.
+        """
+        with self._lock:
+            self._write_total = 0
+        self._cross_spectrum = None
+        self.delay_ms = None
+        self.raw_delay_ms = None
+        self.confidence = 0.0
+
+    def estimate(self) -> Optional[float]:
+        """立即执行一次估计并更新平滑结果.
+
+        Returns:
+            平滑后的延迟（毫秒），历史不足或置信度不够时返回当前值（可能为None）
+        """
+        if not self._snapshot():
+            return self.delay_ms
+
+        reference = self._ref_window
+        if np.sqrt(np.mean(np.square(reference))) < self.min_reference_rms:
+            return self.delay_ms
+
+        lag, confidence = self._correlate(reference, self._cap_window)
+        self.raw_delay_ms = lag * 1000 / self.sample_rate
+        self.estimates += 1
+
+        if confidence < self.min_confidence:
+            self.rejected += 1
+            return self.delay_ms
+
+        if self.delay_ms is None:
+            self.delay_ms = self.raw_delay_ms
+        else:
+            weight = self.smoothing * confidence
+            self.delay_ms += weight * (self.raw_delay_ms - self.delay_ms)
+        self.confidence = confidence
+        return self.delay_ms
+
+    def get_status(self) -> dict:
+        return {
+            "delay_ms": round(self.delay_ms, 1) if self.delay_ms is not None else None,
+            "raw_delay_ms": (
+                round(self.raw_delay_ms, 1) if self.raw_delay_ms is not None else None
+            ),
+            "confidence": round(self.confidence, 3),
+            "estimates": self.estimates,
+            "rejected": self.rejected,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+    def _snapshot(self) -> bool:
+        """
+        在锁内把历史环按时间顺序拷入浮点窗口，历史未满时返回False.
+        """
+        with self._lock:
+            if self._write_total < self._capacity:
+                return False
+            pos = self._write_total % self._capacity
+            tail = self._capacity - pos
+            self._ref_window[:tail] = self._reference[pos:]
+            self._ref_window[tail:] = self._reference[:pos]
+            self._cap_window[:tail] = self._capture[pos:]
+            self._cap_window[tail:] = self._capture[:pos]
+        return True
+
+    def _correlate(self, reference: np.ndarray, capture: np.ndarray):
+        """GCC-PHAT 互相关，返回 (延迟样本数, 置信度).
+
+        只取采集窗口末尾 window 个样本，与整个参考历史做互相关，
+        capture[n] ≈ g * reference[n - lag] 时峰值位于 lag 处。互功率谱与前几轮
+        递归平均后再做PHAT加权，延迟变化时旧证据按轮次衰减。
+        """
+        nfft = self._nfft
+        cap = capture.copy()
+        cap[: self._max_lag] = 0
+        spectrum = np.fft.rfft(cap, nfft) * np.conj(np.fft.rfft(reference, nfft))
+        if self._cross_spectrum is not None:
+            spectrum += self.SPECTRUM_DECAY * self._cross_spectrum
+        self._cross_spectrum = spectrum
+        spectrum = spectrum / (np.abs(spectrum) ** self.PHAT_BETA + 1e-9)
+        correlation = np.fft.irfft(spectrum, nfft)[: self._max_lag + 1]
+
+        lag = int(np.argmax(correlation))
+        peak = correlation[lag]
+        if peak <= 0:
+            return lag, 0.0
+
+        # 次峰：排除主峰附近 ±5ms（早期反射）后的最大值
+        guard = max(1, self.sample_rate * self.PEAK_GUARD_MS // 1000)
+        masked = correlation.copy()
+        masked[max(0, lag - guard) : lag + guard + 1] = -np.inf
+        second = max(float(np.max(masked)), 0.0) if np.isfinite(masked).any() else 0.0
+        confidence = float(np.clip(1.0 - second / peak, 0.0, 1.0))
+        return lag, confidence
+
+    def _run(self):
+        applied = None
+        while not self._stop.wait(self.interval):
+            try:
+                delay = self.estimate()
+            except Exception as e:
+                logger.warning(f"回声延迟估计失败: {e}")
+                continue
+            if delay is None:
+                continue
+            rounded = int(round(delay))
+            if rounded != applied:
+                applied = rounded
+                logger.info(
+                    f"回声延迟估计: {rounded}ms (置信度 {self.confidence:.2f})"
+                )
+                if self._on_estimate:
+                    self._on_estimate(rounded)
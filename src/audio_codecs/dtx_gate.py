@@ -0,0 +1,247 @@
+import math
+from typing import Optional
+
+import numpy as np
+
+from src.audio_codecs.frame_pool import AudioFramePool
+from src.utils.logging_config import get_logger
+
+try:
+    import webrtcvad
+
+    WEBRTC_VAD_AVAILABLE = True
+except ImportError:
+    WEBRTC_VAD_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+
+class UplinkDtxGate:
+    """
+    上行不连续发送（DTX）门限：静音期间不编码、不发送录音帧.
+
+    每帧先算能量（dBFS）与自适应噪声底比较，超过门限的帧再交给WebRTC VAD
+    （可用时）确认。判为语音后继续发送 hangover 时长的静音帧，保证服务端能检测到
+    句尾；之后进入静音，帧只拷入预分配的预录环。重新检测到语音时先编码发送预录环
+    中的帧，避免切掉语音起始。静音期间可按 keepalive 间隔发送单帧保活。
+    """
+
+    # process() 的判定结果
+    SEND = 0
+    SUPPRESS = 1
+    ONSET = 2
+    HANGOVER = 3
+    KEEPALIVE = 4
+
+    # 噪声底跟踪：低于噪声底时立即下降；否则缓慢上升，超过门限的帧（可能是语音）更慢，
+    # 背景噪声持续升高时仍能在数十秒内跟上
+    NOISE_FLOOR_RISE = 0.02
+    NOISE_FLOOR_RISE_SPEECH = 0.001
+    NOISE_FLOOR_INITIAL_DB = -60.0
+    # 低于该电平的帧一律视为静音
+    MIN_SPEECH_DB = -55.0
+    # WebRTC VAD 支持的子帧时长
+    VAD_FRAME_MS = 20
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_duration_ms: int,
+        hangover_ms: int = 1000,
+        preroll_ms: int = 200,
+        keepalive_ms: int = 1000,
+        threshold_db: float = 10.0,
+        use_webrtc_vad: bool = True,
+        vad_mode: int = 2,
+    ):
+        """
+        Args:
+            sample_rate: 帧采样率（16kHz）
+            frame_duration_ms: 帧时长
+            hangover_ms: 语音结束后继续发送的时长
+            preroll_ms: 语音起始前补发的时长
+            keepalive_ms: 静音期间保活帧的间隔，0为不发送
+            threshold_db: 判为语音需高出噪声底的分贝数
+            use_webrtc_vad: 是否用WebRTC VAD确认（未安装时只用能量门限）
+            vad_mode: WebRTC VAD 灵敏度（0-3，越大越倾向判为静音）
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_duration_ms // 1000
+        self.hangover_frames = max(0, math.ceil(hangover_ms / frame_duration_ms))
+        self.keepalive_frames = (
+            max(1, keepalive_ms // frame_duration_ms) if keepalive_ms > 0 else 0
+        )
+        self.threshold_db = threshold_db
+
+        self._vad = None
+        if use_webrtc_vad:
+            if WEBRTC_VAD_AVAILABLE:
+                self._vad = webrtcvad.Vad(vad_mode)
+            else:
+                logger.warning("webrtcvad 未安装，DTX 仅使用能量门限")
+        self._vad_frame = sample_rate * self.VAD_FRAME_MS // 1000
+
+        # 预录环：静音帧写入循环槽位，起始时按时间顺序读出
+        preroll_frames = math.ceil(preroll_ms / frame_duration_ms)
+        self._preroll = (
+            AudioFramePool(preroll_frames, self.frame_size) if preroll_frames else None
+        )
+        self._preroll_count = 0
+        self._preroll_next = 0
+        self._energy = np.zeros(self.frame_size, dtype=np.float32)
+
+        self.noise_floor_db = self.NOISE_FLOOR_INITIAL_DB
+        self._hangover = self.hangover_frames
+        self._since_sent = 0
+
+        # 累计统计（只由录音线程写入）
+        self.frames_total = 0
+        self.frames_suppressed = 0
+        self.frames_keepalive = 0
+        self.onsets = 0
+        # 已发送静音帧（hangover/保活）的平均包长，用于估算节省的字节数
+        self.silence_packet_bytes: Optional[float] = None
+
+    def reset(self):
+        """
+        开始新的监听：先按语音处理（hangover计满），清空预录.
+        """
+        self._hangover = self.hangover_frames
+        self._since_sent = 0
+        self._preroll_count = 0
+
+    def process(self, frame: np.ndarray) -> int:
+        """判定一帧16kHz样本是否发送.
+
+        Returns:
+            SEND（语音，编码发送）/ HANGOVER（语音结束后的静音，编码发送）/
+            SUPPRESS（已存入预录，不发送）/ ONSET（语音起始：先发送预录帧再发送本帧）/
+            KEEPALIVE（静音保活帧，编码发送）
+        """
+        self.frames_total += 1
+
+        if self._is_speech(frame):
+            onset = self._hangover == 0
+            self._hangover = self.hangover_frames
+            self._since_sent = 0
+            if onset:
+                self.onsets += 1
+                return self.ONSET
+            return self.SEND
+
+        if self._hangover > 0:
+            self._hangover -= 1
+            self._since_sent = 0
+            return self.HANGOVER
+
+        self._since_sent += 1
+        if self.keepalive_frames and self._since_sent >= self.keepalive_frames:
+            # 保活帧之前的预录已无意义（服务端已看到更新的帧）
+            self._since_sent = 0
+            self._preroll_count = 0
+            self.frames_keepalive += 1
+            return self.KEEPALIVE
+
+        self.frames_suppressed += 1
+        pool = self._preroll
+        if pool is not None:
+            index = self._preroll_next
+            self._preroll_next = index + 1 if index + 1 < pool.slots else 0
+            np.copyto(pool.frames[index], frame)
+            self._preroll_count = min(self._preroll_count + 1, pool.slots)
+        return self.SUPPRESS
+
+    def take_preroll(self):
+        """取出预录帧的指针（按时间先后），供起始时编码；取出后清空.
+
+        预录帧原本计为抑制，取出时从抑制计数中扣除。
+        """
+        pool = self._preroll
+        count = self._preroll_count
+        self._preroll_count = 0
+        if pool is None or count == 0:
+            return ()
+        self.frames_suppressed -= count
+        slots = pool.slots
+        first = (self._preroll_next - count) % slots
+        return [pool.pointers[(first + i) % slots] for i in range(count)]
+
+    def record_silence_packet(self, size: int):
+        """
+        记录一个已发送静音帧（hangover/保活）的包长.
+        """
+        if self.silence_packet_bytes is None:
+            self.silence_packet_bytes = float(size)
+        else:
+            self.silence_packet_bytes += 0.05 * (size - self.silence_packet_bytes)
+
+    def _is_speech(self, frame: np.ndarray) -> bool:
+        energy = self._energy
+        np.copyto(energy, frame)
+        power = float(np.dot(energy, energy)) / len(energy)
+        level_db = 10 * math.log10(power / (32768.0 * 32768.0) + 1e-12)
+
+        floor = self.noise_floor_db
+        loud = level_db >= max(floor + self.threshold_db, self.MIN_SPEECH_DB)
+        if level_db < floor:
+            self.noise_floor_db = level_db
+        else:
+            rise = self.NOISE_FLOOR_RISE_SPEECH if loud else self.NOISE_FLOOR_RISE
+            self.noise_floor_db = floor + rise * (level_db - floor)
+
+        if not loud:
+            return False
+        if self._vad is None:
+            return True
+
+        step = self._vad_frame
+        for start in range(0, len(frame) - step + 1, step):
+            if self._vad.is_speech(frame[start : start + step].tobytes(), self.sample_rate):
+                return True
+        return False
+
+    def get_stats(self) -> dict:
+        return {
+            "frames_total": self.frames_total,
+            "frames_suppressed": self.frames_suppressed,
+            "frames_keepalive": self.frames_keepalive,
+            "onsets": self.onsets,
+            "bytes_saved": self.estimated_bytes_saved(self.frames_suppressed),
+            "noise_floor_db": round(self.noise_floor_db, 1),
+            "webrtc_vad": self._vad is not None,
+        }
+
+    def estimated_bytes_saved(self, frames: int) -> int:
+        """
+        按已发送静音帧的平均包长估算未发送帧节省的字节数.
+        """
+        if self.silence_packet_bytes is None:
+            return 0
+        return int(frames * self.silence_packet_bytes)
+
+
+def dtx_options(config) -> Optional[dict]:
+    """从配置读取上行DTX选项（AUDIO_OPTIONS.DTX.*），未启用时返回None.
+
+    Returns:
+        UplinkDtxGate 的构造参数（不含采样率和帧时长）
+    """
+    if not config.get_config("AUDIO_OPTIONS.DTX.ENABLED", False):
+        return None
+
+    def read(key, default, cast=int):
+        try:
+            return cast(config.get_config(f"AUDIO_OPTIONS.DTX.{key}", default))
+        except (TypeError, ValueError):
+            logger.warning(f"DTX配置 {key} 无效，使用默认值 {default}")
+            return default
+
+    vad_mode = read("VAD_MODE", 2)
+    return {
+        "hangover_ms": max(0, read("HANGOVER_MS", 1000)),
+        "preroll_ms": max(0, read("PREROLL_MS", 200)),
+        "keepalive_ms": max(0, read("KEEPALIVE_MS", 1000)),
+        "threshold_db": read("THRESHOLD_DB", 10.0, float),
+        "use_webrtc_vad": bool(config.get_config("AUDIO_OPTIONS.DTX.WEBRTC_VAD", True)),
+        "vad_mode": vad_mode if 0 <= vad_mode <= 3 else 2,
+    }
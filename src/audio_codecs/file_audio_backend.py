@@ -0,0 +1,494 @@
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def load_wav(path: Union[str, Path]) -> Tuple[np.ndarray, int]:
+    """读取16位PCM WAV文件.
+
+    Returns:
+        (样本数组[帧数, 声道数], 采样率)
+    """
+    with wave.open(str(path), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"仅支持16位PCM WAV: {path}")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    return data.reshape(-1, channels), rate
+
+
+def save_wav(path: Union[str, Path], samples: np.ndarray, sample_rate: int):
+    """
+    保存16位PCM WAV文件（一维数组视为单声道）.
+    """
+    samples = np.asarray(samples, dtype=np.int16)
+    if samples.ndim == 1:
+        samples = samples.reshape(-1, 1)
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(samples.shape[1])
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.tobytes())
+
+
+class FileCallbackFlags:
+    """
+    回调状态标志，兼容 sounddevice.CallbackFlags 的布尔值和字符串用法.
+    """
+
+    def __init__(self, input_overflow: bool = False, output_underflow: bool = False):
+        self.input_overflow = input_overflow
+        self.output_underflow = output_underflow
+
+    def __bool__(self) -> bool:
+        return self.input_overflow or self.output_underflow
+
+    def __str__(self) -> str:
+        flags = []
+        if self.input_overflow:
+            flags.append("input overflow")
+        if self.output_underflow:
+            flags.append("output underflow")
+        return ", ".join(flags)
+
+
+class FileTimeInfo:
+    """
+    回调时间信息，字段与PortAudio的time_info一致（单位秒，虚拟时钟）.
+    """
+
+    __slots__ = ("currentTime", "inputBufferAdcTime", "outputBufferDacTime")
+
+    def __init__(self, current: float):
+        self.currentTime = current
+        self.inputBufferAdcTime = current
+        self.outputBufferDacTime = current
+
+
+class _FileStream:
+    """
+    文件设备流基类，接口与 sounddevice.InputStream/OutputStream 的常用部分一致.
+    """
+
+    is_input = False
+
+    def __init__(
+        self,
+        backend: "FileAudioBackend",
+        samplerate: Optional[float] = None,
+        channels: Optional[int] = None,
+        dtype=np.int16,
+        blocksize: Optional[int] = None,
+        callback: Optional[Callable] = None,
+        finished_callback: Optional[Callable] = None,
+        device=None,
+        latency=None,
+        **kwargs,
+    ):
+        if np.dtype(dtype) != np.int16:
+            raise ValueError(f"文件设备仅支持int16: {dtype}")
+
+        self._backend = backend
+        self.device = device
+        self.samplerate = float(samplerate or backend.sample_rate(self.is_input))
+        self.channels = int(channels or backend.channels)
+        self.blocksize = int(blocksize or self.samplerate * 0.02)
+        self.dtype = "int16"
+        self.latency = self.blocksize / self.samplerate
+        self._callback = callback
+        self._finished_callback = finished_callback
+
+        self._buffer = np.zeros((self.blocksize, self.channels), dtype=np.int16)
+        self._block_duration = self.blocksize / self.samplerate
+        self._next_due = 0.0
+        self._active = False
+        self._closed = False
+
+        # 统计（仅驱动线程写入）
+        self.callback_count = 0
+        self.xrun_count = 0
+        self.callback_times: List[float] = []
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    @property
+    def stopped(self) -> bool:
+        return not self._active
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def start(self):
+        if self._closed:
+            raise RuntimeError("流已关闭")
+        if not self._active:
+            self._backend._start_stream(self)
+
+    def stop(self):
+        if self._active:
+            self._backend._stop_stream(self)
+            if self._finished_callback:
+                self._finished_callback()
+
+    abort = stop
+
+    def close(self, ignore_errors: bool = True):
+        self.stop()
+        self._closed = True
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _tick(self, now: float, status: FileCallbackFlags):
+        raise NotImplementedError
+
+
+class FileInputStream(_FileStream):
+    """
+    从内存样本（WAV文件）读取数据的输入流.
+    """
+
+    is_input = True
+
+    def __init__(self, backend: "FileAudioBackend", **kwargs):
+        super().__init__(backend, **kwargs)
+        self._position = 0
+
+    def skip_blocks(self, blocks: int):
+        # 模拟真实设备溢出：错过的样本被丢弃
+        self._position += blocks * self.blocksize
+
+    def _tick(self, now: float, status: FileCallbackFlags):
+        self._position = self._backend._read_input(
+            self._buffer, self._position, self.channels
+        )
+        self._callback(self._buffer, self.blocksize, FileTimeInfo(now), status)
+
+
+class FileOutputStream(_FileStream):
+    """
+    把回调输出写入内存（可保存为WAV）的输出流.
+    """
+
+    def skip_blocks(self, blocks: int):
+        pass
+
+    def _tick(self, now: float, status: FileCallbackFlags):
+        self._callback(self._buffer, self.blocksize, FileTimeInfo(now), status)
+        self._backend._capture_output(self._buffer)
+
+
+class _Defaults:
+    """
+    对应 sounddevice.default 的默认设置.
+    """
+
+    def __init__(self):
+        self.device = (0, 1)
+        self.samplerate = None
+        self.channels = None
+        self.dtype = None
+
+
+class FileAudioBackend:
+    """
+    文件音频设备后端（用于离线测试和性能分析）.
+
+    提供与 sounddevice 模块相同的常用接口（default/query_devices/InputStream/OutputStream），
+    可作为 AudioCodec 的设备后端，无需PortAudio和真实声卡：
+    1. 输入流按块读取WAV/数组样本，读完后输出静音（或循环播放）
+    2. 输出流把回调产生的样本保存在内存，可写入WAV文件
+    3. 所有流由同一个驱动线程按各自的块时长调度：
+       realtime=True 时按墙钟节拍回调，回调晚于一个块时长记为xrun；
+       realtime=False 时按虚拟时钟尽快运行，用于吞吐量测试
+    """
+
+    def __init__(
+        self,
+        input_data: Optional[np.ndarray] = None,
+        input_path: Optional[Union[str, Path]] = None,
+        input_sample_rate: Optional[int] = None,
+        output_sample_rate: Optional[int] = None,
+        channels: int = 1,
+        realtime: bool = False,
+        loop_input: bool = False,
+        capture_output: bool = True,
+    ):
+        """
+        Args:
+            input_data: 输入样本（一维或[帧数, 声道数]的int16数组）
+            input_path: 输入WAV文件，与 input_data 二选一
+            input_sample_rate: 输入设备采样率，与WAV采样率不同时会先重采样
+            output_sample_rate: 输出设备采样率，默认与输入相同
+            channels: 设备声道数
+            realtime: 是否按实时节拍驱动回调
+            loop_input: 输入读完后是否从头循环
+            capture_output: 是否保存输出流样本
+        """
+        file_rate = None
+        if input_path is not None:
+            input_data, file_rate = load_wav(input_path)
+        if input_data is None:
+            input_data = np.zeros((0, channels), dtype=np.int16)
+
+        input_data = np.asarray(input_data, dtype=np.int16)
+        if input_data.ndim == 1:
+            input_data = input_data.reshape(-1, 1)
+
+        self.input_rate = int(input_sample_rate or file_rate or 16000)
+        if file_rate and file_rate != self.input_rate and len(input_data):
+            import soxr
+
+            input_data = soxr.resample(input_data, file_rate, self.input_rate).astype(
+                np.int16
+            )
+
+        # 声道数不一致时先混为单声道再复制到各声道
+        if input_data.shape[1] != channels:
+            mono = input_data.mean(axis=1).astype(np.int16)
+            input_data = np.repeat(mono.reshape(-1, 1), channels, axis=1)
+
+        self.output_rate = int(output_sample_rate or self.input_rate)
+        self.channels = channels
+        self.realtime = realtime
+        self.loop_input = loop_input
+        self.capture_output = capture_output
+
+        self._input = np.ascontiguousarray(input_data)
+        self._output_chunks: List[np.ndarray] = []
+        self.input_finished = threading.Event()
+
+        self.default = _Defaults()
+        self._devices = [
+            {
+                "name": "File Input",
+                "index": 0,
+                "hostapi": 0,
+                "max_input_channels": channels,
+                "max_output_channels": 0,
+                "default_samplerate": float(self.input_rate),
+            },
+            {
+                "name": "File Output",
+                "index": 1,
+                "hostapi": 0,
+                "max_input_channels": 0,
+                "max_output_channels": channels,
+                "default_samplerate": float(self.output_rate),
+            },
+        ]
+
+        # 驱动线程
+        self._streams: List[_FileStream] = []
+        self._all_streams: List[_FileStream] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._epoch = time.perf_counter()
+        self._virtual_now = 0.0
+
+    # ------------------------------------------------------------ sounddevice接口
+    def query_devices(self, device=None, kind: Optional[str] = None):
+        if kind is not None:
+            device = self.default.device[0 if kind == "input" else 1]
+        if device is None:
+            return [dict(info) for info in self._devices]
+        if isinstance(device, int):
+            if 0 <= device < len(self._devices):
+                return dict(self._devices[device])
+        else:
+            for info in self._devices:
+                if info["name"] == device:
+                    return dict(info)
+        raise ValueError(f"未找到设备: {device}")
+
+    def check_input_settings(self, device=None, samplerate=None, channels=None, **_):
+        """
+        校验输入参数：文件设备只支持其固定采样率，不支持时抛出ValueError.
+        """
+        self._check_settings(self.input_rate, samplerate, channels)
+
+    def check_output_settings(self, device=None, samplerate=None, channels=None, **_):
+        """
+        校验输出参数：文件设备只支持其固定采样率，不支持时抛出ValueError.
+        """
+        self._check_settings(self.output_rate, samplerate, channels)
+
+    def _check_settings(self, rate: int, samplerate, channels):
+        if samplerate is not None and int(samplerate) != rate:
+            raise ValueError(f"Invalid sample rate: {samplerate} (设备采样率 {rate})")
+        if channels is not None and channels > self.channels:
+            raise ValueError(f"Invalid number of channels: {channels}")
+
+    def InputStream(self, **kwargs) -> FileInputStream:  # noqa: N802
+        stream = FileInputStream(self, **kwargs)
+        self._all_streams.append(stream)
+        return stream
+
+    def OutputStream(self, **kwargs) -> FileOutputStream:  # noqa: N802
+        stream = FileOutputStream(self, **kwargs)
+        self._all_streams.append(stream)
+        return stream
+
+    # ------------------------------------------------------------ 结果
+    def sample_rate(self, is_input: bool) -> int:
+        return self.input_rate if is_input else self.output_rate
+
+    def input_duration(self) -> float:
+        """
+        输入样本时长（秒）.
+        """
+        return len(self._input) / self.input_rate
+
+    def wait_input_finished(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待输入样本全部送入回调.
+        """
+        return self.input_finished.wait(timeout)
+
+    def get_output(self) -> np.ndarray:
+        """
+        返回输出流捕获的全部样本[帧数, 声道数].
+        """
+        if not self._output_chunks:
+            return np.zeros((0, self.channels), dtype=np.int16)
+        return np.concatenate(self._output_chunks)
+
+    def save_output(self, path: Union[str, Path]):
+        save_wav(path, self.get_output(), self.output_rate)
+
+    def get_stats(self) -> Dict[str, dict]:
+        """
+        按流类型汇总回调次数、xrun次数和回调耗时分位数（毫秒）.
+        """
+        stats = {}
+        for kind, is_input in (("input", True), ("output", False)):
+            streams = [s for s in self._all_streams if s.is_input == is_input]
+            times = np.array(
+                [t for s in streams for t in s.callback_times], dtype=np.float64
+            )
+            summary = {
+                "callbacks": sum(s.callback_count for s in streams),
+                "xruns": sum(s.xrun_count for s in streams),
+            }
+            if len(times):
+                p50, p95, p99 = np.percentile(times, [50, 95, 99]) * 1000
+                summary.update(
+                    p50_ms=float(p50),
+                    p95_ms=float(p95),
+                    p99_ms=float(p99),
+                    max_ms=float(times.max() * 1000),
+                )
+            stats[kind] = summary
+        return stats
+
+    # ------------------------------------------------------------ 数据
+    def _read_input(self, block: np.ndarray, position: int, channels: int) -> int:
+        frames = len(block)
+        total = len(self._input)
+        filled = 0
+        while filled < frames:
+            if position >= total:
+                if self.loop_input and total:
+                    position %= total
+                else:
+                    self.input_finished.set()
+                    block[filled:] = 0
+                    return position + frames - filled
+            n = min(frames - filled, total - position)
+            block[filled : filled + n] = self._input[position : position + n, :channels]
+            filled += n
+            position += n
+        return position
+
+    def _capture_output(self, block: np.ndarray):
+        if self.capture_output:
+            self._output_chunks.append(block.copy())
+
+    # ------------------------------------------------------------ 驱动线程
+    def _now(self) -> float:
+        if self.realtime:
+            return time.perf_counter() - self._epoch
+        return self._virtual_now
+
+    def _start_stream(self, stream: _FileStream):
+        with self._cond:
+            stream._next_due = self._now()
+            stream._active = True
+            self._streams.append(stream)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="FileAudioDriver", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _stop_stream(self, stream: _FileStream):
+        with self._cond:
+            stream._active = False
+            if stream in self._streams:
+                self._streams.remove(stream)
+            self._cond.notify_all()
+        thread = self._thread
+        if not self._streams and thread and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._streams:
+                    self._thread = None
+                    return
+                stream = min(self._streams, key=lambda s: s._next_due)
+                due = stream._next_due
+
+                if self.realtime:
+                    delay = due - self._now()
+                    if delay > 0:
+                        # 等待期间流可能被停止或新增
+                        self._cond.wait(delay)
+                        continue
+                else:
+                    self._virtual_now = due
+
+            status = FileCallbackFlags()
+            if self.realtime:
+                missed = int((self._now() - due) // stream._block_duration)
+                if missed > 0:
+                    # 驱动落后超过一个块：模拟设备溢出/欠载，丢弃错过的块
+                    stream.xrun_count += 1
+                    stream.skip_blocks(missed)
+                    due += missed * stream._block_duration
+                    if stream.is_input:
+                        status.input_overflow = True
+                    else:
+                        status.output_underflow = True
+
+            start = time.perf_counter()
+            try:
+                stream._tick(due, status)
+            except Exception as e:
+                logger.error(f"文件设备回调异常，停止该流: {e}")
+                with self._cond:
+                    stream._active = False
+                    if stream in self._streams:
+                        self._streams.remove(stream)
+                continue
+            stream.callback_times.append(time.perf_counter() - start)
+            stream.callback_count += 1
+            stream._next_due = due + stream._block_duration
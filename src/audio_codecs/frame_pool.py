@@ -0,0 +1,48 @@
+import ctypes
+
+import numpy as np
+
+
+class AudioFramePool:
+    """
+    预分配的定长音频帧池（按槽位循环复用）.
+
+    生产端通过 frames[i] 原位写入，消费端拿到 views[i] 只读视图，
+    多个消费者共享同一份数据而不各自拷贝。视图和ctypes指针在创建时
+    一次性生成，取槽位时不分配任何对象。
+
+    槽位循环复用：池容量必须大于所有下游队列容量之和，
+    保证某个槽位被重新写入时已没有消费者在使用它。
+    """
+
+    def __init__(self, slots: int, frame_size: int, dtype=np.int16):
+        if slots <= 0 or frame_size <= 0:
+            raise ValueError(f"帧池参数无效: slots={slots}, frame_size={frame_size}")
+
+        self._buffer = np.zeros((slots, frame_size), dtype=dtype)
+        self._next = 0
+        self.frame_size = frame_size
+
+        # 可写行视图（生产端）
+        self.frames = [self._buffer[i] for i in range(slots)]
+        # 只读行视图（消费端共享）
+        self.views = []
+        for frame in self.frames:
+            view = frame.view()
+            view.flags.writeable = False
+            self.views.append(view)
+        # 供C库直接读取的指针（如Opus编码）
+        pointer_type = ctypes.POINTER(np.ctypeslib.as_ctypes_type(self._buffer.dtype))
+        self.pointers = [frame.ctypes.data_as(pointer_type) for frame in self.frames]
+
+    @property
+    def slots(self) -> int:
+        return len(self.frames)
+
+    def acquire(self) -> int:
+        """
+        取下一个槽位的索引（覆盖最早写入的槽位）.
+        """
+        index = self._next
+        self._next = index + 1 if index + 1 < len(self.frames) else 0
+        return index
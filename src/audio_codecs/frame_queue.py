@@ -0,0 +1,146 @@
+import asyncio
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class AudioFrameQueue:
+    """
+    跨线程音频帧队列（单生产者/单消费者）.
+
+    用于PortAudio回调线程与asyncio事件循环之间传递音频帧：
+    1. 基于 deque 的原子 append/popleft，生产端和消费端都不加锁
+    2. 有界，满时按溢出策略丢帧（overrun计数）
+    3. 溢出策略可选：丢弃最旧帧(drop_oldest) 或丢弃新帧(drop_newest)
+    4. 消费端可 await get()，生产端仅在有等待者时通过
+       call_soon_threadsafe 唤醒事件循环，避免每帧都投递回调
+    """
+
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+    def __init__(self, maxsize: int, overflow: str = DROP_OLDEST):
+        if maxsize <= 0:
+            raise ValueError(f"队列容量必须大于0: {maxsize}")
+        if overflow not in (self.DROP_OLDEST, self.DROP_NEWEST):
+            raise ValueError(f"不支持的溢出策略: {overflow}")
+
+        self._maxsize = maxsize
+        self._overflow = overflow
+        self._frames = deque(maxlen=maxsize)
+
+        # 等待者（仅消费端设置），以及其所属事件循环
+        self._waiter: Optional[asyncio.Future] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 统计计数：每个计数只由一端修改
+        self.put_count = 0
+        self.overruns = 0  # 生产端：队列满按策略丢帧
+        self.underruns = 0  # 消费端：需要数据时队列为空
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def overflow_policy(self) -> str:
+        return self._overflow
+
+    def qsize(self) -> int:
+        return len(self._frames)
+
+    def empty(self) -> bool:
+        return not self._frames
+
+    def full(self) -> bool:
+        return len(self._frames) >= self._maxsize
+
+    def put(self, frame: Any) -> bool:
+        """生产端入队，可在任意线程调用，永不阻塞.
+
+        Returns:
+            False 表示队列已满，按溢出策略丢弃了最旧帧或本帧
+        """
+        dropped = len(self._frames) >= self._maxsize
+        if dropped:
+            self.overruns += 1
+            if self._overflow == self.DROP_NEWEST:
+                return False
+        # deque(maxlen) 满时 append 会原子地挤掉最旧元素
+        self._frames.append(frame)
+        self.put_count += 1
+
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            try:
+                self._loop.call_soon_threadsafe(self._wake_waiter, waiter)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+        return not dropped
+
+    def get_nowait(self) -> Optional[Any]:
+        """
+        消费端非阻塞出队，队列为空时返回None.
+        """
+        try:
+            return self._frames.popleft()
+        except IndexError:
+            return None
+
+    async def get(self) -> Any:
+        """
+        消费端等待并出队（仅限事件循环线程调用）.
+        """
+        while True:
+            try:
+                return self._frames.popleft()
+            except IndexError:
+                pass
+
+            loop = asyncio.get_running_loop()
+            self._loop = loop
+            waiter = loop.create_future()
+            self._waiter = waiter
+            try:
+                # 先登记等待者再复查，避免与生产端竞争丢失唤醒
+                if self._frames:
+                    continue
+                await waiter
+            finally:
+                self._waiter = None
+
+    def record_underrun(self):
+        """
+        消费端记录一次欠载（例如播放回调因无数据输出静音）.
+        """
+        self.underruns += 1
+
+    def clear(self) -> int:
+        """
+        清空队列，返回丢弃的帧数.
+        """
+        cleared = 0
+        while True:
+            try:
+                self._frames.popleft()
+            except IndexError:
+                break
+            cleared += 1
+        return cleared
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取队列统计信息.
+        """
+        return {
+            "size": len(self._frames),
+            "maxsize": self._maxsize,
+            "put_count": self.put_count,
+            "overruns": self.overruns,
+            "underruns": self.underruns,
+        }
+
+    @staticmethod
+    def _wake_waiter(waiter: asyncio.Future):
+        if not waiter.done():
+            waiter.set_result(None)
@@ -0,0 +1,154 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class InputDownmixer:
+    """
+    多声道麦克风转单声道：选取单一声道或按权重混合.
+
+    在重采样之前执行，之后只有一个声道参与重采样、AEC和编码。
+    单声道输入直接返回视图；选声道拷贝到预分配缓冲（保证连续内存）；
+    加权混合先把输入转入预分配的浮点缓冲，用一次矩阵乘得到混合结果，
+    再取整限幅写入预分配的int16缓冲，整个过程不分配临时数组。
+    """
+
+    MODE_MONO = "mono"
+    MODE_SELECT = "select"
+    MODE_WEIGHTED = "weighted"
+
+    def __init__(
+        self,
+        channels: int,
+        select: Optional[int] = None,
+        weights: Optional[Sequence[float]] = None,
+        max_frames: int = 0,
+    ):
+        """
+        Args:
+            channels: 设备输入声道数
+            select: 选取的声道序号（从0开始），与weights二选一
+            weights: 各声道权重，默认多声道取平均
+            max_frames: 每块最大帧数，用于预分配缓冲（不足时按需扩容）
+        """
+        if channels <= 0:
+            raise ValueError(f"输入声道数必须大于0: {channels}")
+
+        self.channels = channels
+        self.select = None
+        self.weights = None
+
+        if channels == 1:
+            self.mode = self.MODE_MONO
+        elif select is not None:
+            if not 0 <= select < channels:
+                raise ValueError(f"选取的声道超出范围: {select} (共 {channels} 声道)")
+            self.mode = self.MODE_SELECT
+            self.select = int(select)
+        else:
+            if weights is None:
+                weights = [1.0 / channels] * channels
+            if len(weights) != channels:
+                raise ValueError(f"声道权重数量 {len(weights)} 与声道数 {channels} 不一致")
+            self.mode = self.MODE_WEIGHTED
+            self.weights = np.asarray(weights, dtype=np.float32)
+
+        self._allocate(max_frames)
+
+    def process(self, indata: np.ndarray) -> np.ndarray:
+        """把一块 [帧数, 声道数] 的int16输入转为一维单声道样本.
+
+        Returns:
+            单声道样本（输入视图或内部缓冲，下一次调用前有效）
+        """
+        if self.mode == self.MODE_MONO:
+            return indata.reshape(-1)
+
+        frames = len(indata)
+        if len(self._output) < frames:
+            self._allocate(frames)
+        output = self._output[:frames]
+
+        if self.mode == self.MODE_SELECT:
+            np.copyto(output, indata[:, self.select])
+            return output
+
+        converted = self._converted[:frames]
+        mixed = self._mixed[:frames]
+        np.copyto(converted, indata)
+        np.matmul(converted, self.weights, out=mixed)
+        np.rint(mixed, out=mixed)
+        np.clip(mixed, -32768, 32767, out=mixed)
+        np.copyto(output, mixed, casting="unsafe")
+        return output
+
+    def _allocate(self, frames: int):
+        channels = self.channels if self.mode == self.MODE_WEIGHTED else 0
+        self._converted = np.zeros((frames, channels), dtype=np.float32)
+        self._mixed = np.zeros(frames, dtype=np.float32)
+        self._output = np.zeros(frames, dtype=np.int16)
+
+    def describe(self) -> dict:
+        """
+        声道布局描述（用于音频状态）.
+        """
+        info = {"channels": self.channels, "mode": self.mode}
+        if self.mode == self.MODE_SELECT:
+            info["channel"] = self.select
+        elif self.mode == self.MODE_WEIGHTED:
+            info["weights"] = [round(float(w), 4) for w in self.weights]
+        return info
+
+
+def downmix_options(config, device_channels: int) -> dict:
+    """从配置读取输入声道选项，按设备最大输入声道数校正.
+
+    AUDIO_OPTIONS.INPUT_CHANNELS 为打开的声道数（0 表示设备全部声道），
+    INPUT_CHANNEL_SELECT 选取单一声道，INPUT_CHANNEL_WEIGHTS 为各声道混合权重；
+    选择或权重无效时改为平均混合。
+
+    Args:
+        config: 配置管理器
+        device_channels: 设备最大输入声道数
+
+    Returns:
+        InputDownmixer 的构造参数（channels/select/weights）
+    """
+    try:
+        channels = int(config.get_config("AUDIO_OPTIONS.INPUT_CHANNELS", 1))
+    except (TypeError, ValueError):
+        channels = 1
+    if channels <= 0:
+        # 0 表示使用设备全部输入声道
+        channels = device_channels
+    if device_channels > 0 and channels > device_channels:
+        logger.warning(f"输入设备仅支持 {device_channels} 声道，请求 {channels} 声道")
+        channels = device_channels
+    channels = max(1, channels)
+
+    select = config.get_config("AUDIO_OPTIONS.INPUT_CHANNEL_SELECT", None)
+    weights = config.get_config("AUDIO_OPTIONS.INPUT_CHANNEL_WEIGHTS", None)
+    if channels == 1:
+        return {"channels": 1, "select": None, "weights": None}
+
+    if select is not None:
+        try:
+            select = int(select)
+        except (TypeError, ValueError):
+            select = None
+        if select is None or not 0 <= select < channels:
+            logger.warning(f"输入声道选择无效: {select}，改为平均混合")
+            select = None
+    if select is None and weights is not None:
+        try:
+            weights = [float(w) for w in weights]
+        except (TypeError, ValueError):
+            weights = None
+        if weights is None or len(weights) != channels:
+            logger.warning(f"输入声道权重无效: {weights}，改为平均混合")
+            weights = None
+    return {"channels": channels, "select": select, "weights": weights}
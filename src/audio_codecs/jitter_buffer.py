@@ -0,0 +1,277 @@
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_SEQ_MOD = 1 << 32
+
+
+def _seq_diff(a: int, b: int) -> int:
+    """
+    32位序列号差值 a - b（处理回绕）.
+    """
+    diff = (a - b) % _SEQ_MOD
+    return diff - _SEQ_MOD if diff >= _SEQ_MOD // 2 else diff
+
+
+class JitterBuffer:
+    """
+    TTS播放抖动缓冲区（位于Opus解码之前）.
+
+    1. 按序列号重排接收到的Opus包，无序列号时按到达顺序编号
+    2. 根据到达时间抖动自适应调整目标缓冲深度，缓冲达到目标后才开始播放
+    3. 播放时所需包缺失视为丢包，由调用方用FEC/PLC隐藏；晚到的包直接丢弃
+    4. 缓冲区耗尽时进入重新缓冲状态
+
+    无序列号的流（WebSocket等可靠有序传输）不会丢包也不会乱序：欠载时的隐藏帧
+    只是插入的时间，不占用序列号，之后到达的包照常播放；到达间隔中包含服务端
+    停发的时段，不用于抖动估计，目标深度只在持续到达中仍欠载时提高。
+
+    push() 在事件循环中调用，pop() 在播放泵中调用，内部用短锁保护。
+    """
+
+    # 序列号相差过大时视为新的音频流（服务端重置了序列号）
+    RESYNC_THRESHOLD = 50
+
+    PACKET = "packet"
+    LOST = "lost"
+
+    def __init__(
+        self,
+        frame_duration_ms: int,
+        start_threshold_ms: int = 60,
+        max_delay_ms: int = 600,
+        max_conceal_frames: int = 2,
+    ):
+        """
+        Args:
+            frame_duration_ms: 每个Opus包的时长
+            start_threshold_ms: 开始播放前的最小缓冲时长（也是目标深度下限）
+            max_delay_ms: 目标缓冲时长上限
+            max_conceal_frames: 缓冲耗尽时最多连续隐藏的帧数
+        """
+        self.frame_duration_ms = frame_duration_ms
+        self.start_threshold_ms = max(0, start_threshold_ms)
+        self.max_delay_ms = max(self.start_threshold_ms, max_delay_ms)
+        self.max_conceal_frames = max(0, max_conceal_frames)
+
+        self._lock = threading.Lock()
+        self._packets: Dict[int, bytes] = {}
+
+        # 播放状态
+        self._playing = False
+        self._next_seq: Optional[int] = None  # 下一个待播放的序列号
+        self._has_played = False  # 是否已有帧出队（之后小于_next_seq的包视为晚到）
+        self._auto_seq = 0  # 无序列号时按到达顺序编号
+        self._sequenced = False  # 最近的包是否带有传输层序列号
+        self._conceal_run = 0  # 当前连续隐藏帧数
+        self._last_arrival = 0.0
+
+        # 抖动估计（毫秒）：以最早传输时延为基准，统计包相对基准的迟到量
+        self._base_transit: Optional[float] = None
+        self._jitter_ms = 0.0
+
+        # 统计
+        self.received_frames = 0
+        self.played_frames = 0
+        self.concealed_frames = 0
+        self.late_frames = 0
+        self.underrun_frames = 0
+        self.duplicate_frames = 0
+        self.rebuffer_count = 0
+
+    # ---------------------------------------------------------------- 入队
+    def push(
+        self,
+        packet: bytes,
+        sequence: Optional[int] = None,
+        arrival: Optional[float] = None,
+    ) -> bool:
+        """写入一个Opus包.
+
+        Returns:
+            False 表示该包晚到或重复而被丢弃
+        """
+        if arrival is None:
+            arrival = time.monotonic()
+
+        with self._lock:
+            self._sequenced = sequence is not None
+            if sequence is None:
+                sequence = self._auto_seq
+            self._auto_seq = (sequence + 1) % _SEQ_MOD
+
+            if self._next_seq is not None:
+                behind = _seq_diff(self._next_seq, sequence)
+                if behind > self.RESYNC_THRESHOLD or (
+                    -behind > self.RESYNC_THRESHOLD and not self._packets
+                ):
+                    # 序列号跳变：视为新流
+                    self._resync_locked()
+                elif behind > 0 and self._has_played:
+                    # 该序列号已播放或已被隐藏
+                    self.late_frames += 1
+                    return False
+
+            if sequence in self._packets:
+                self.duplicate_frames += 1
+                return False
+
+            # 长时间无数据后的新一段语音：重新建立时延基准
+            if (
+                not self._packets
+                and not self._playing
+                and arrival - self._last_arrival > self.max_delay_ms / 1000 * 2
+            ):
+                self._base_transit = None
+
+            self._packets[sequence] = packet
+            self.received_frames += 1
+            self._last_arrival = arrival
+            if self._next_seq is None or _seq_diff(sequence, self._next_seq) < 0:
+                self._next_seq = sequence
+            if self._sequenced:
+                self._update_jitter_locked(sequence, arrival)
+            return True
+
+    # ---------------------------------------------------------------- 出队
+    def pop(self) -> Optional[Tuple[str, Optional[bytes]]]:
+        """取出下一帧的播放决策.
+
+        Returns:
+            None: 缓冲中（未达到目标深度）或已耗尽
+            ("packet", data): 正常播放该包
+            ("lost", next_packet): 该帧丢失，next_packet 为下一包（可用于FEC，可能为None）
+        """
+        with self._lock:
+            if not self._playing:
+                if not self._packets:
+                    return None
+                target = self._target_frames_locked()
+                # 未达目标深度且数据仍在到达时继续缓冲；
+                # 超过目标时长无新数据（如短句结尾）则直接开始播放
+                if (
+                    self._depth_locked() < target
+                    and time.monotonic() - self._last_arrival
+                    < target * self.frame_duration_ms / 1000
+                ):
+                    return None
+                self._playing = True
+
+            seq = self._next_seq
+            packet = self._packets.pop(seq, None) if seq is not None else None
+            if packet is not None:
+                self._advance_locked()
+                self._conceal_run = 0
+                self.played_frames += 1
+                return self.PACKET, packet
+
+            if self._packets:
+                # 中间缺包：后续包已到，当前包视为丢失
+                self._advance_locked()
+                self.concealed_frames += 1
+                return self.LOST, self._packets.get(self._next_seq)
+
+            # 缓冲耗尽：流仍在持续到达时短暂隐藏，否则进入重新缓冲
+            live_window = self._target_frames_locked() * self.frame_duration_ms / 1000
+            if (
+                self._conceal_run < self.max_conceal_frames
+                and time.monotonic() - self._last_arrival <= live_window
+            ):
+                self._conceal_run += 1
+                if self._sequenced:
+                    self._advance_locked()
+                # 无序列号时隐藏帧不占用序列号，下一个到达的包仍按顺序播放
+                self.concealed_frames += 1
+                self.underrun_frames += 1
+                # 持续到达中仍然欠载，说明缓冲不足，提高目标深度
+                self._jitter_ms = min(
+                    self._jitter_ms + self.frame_duration_ms / 2, self.max_delay_ms
+                )
+                return self.LOST, None
+
+            self._playing = False
+            self._conceal_run = 0
+            self.rebuffer_count += 1
+            return None
+
+    def reset(self):
+        """
+        清空缓冲并重置播放状态（打断/清空队列时调用）.
+        """
+        with self._lock:
+            self._packets.clear()
+            self._resync_locked()
+
+    # ---------------------------------------------------------------- 状态
+    @property
+    def is_playing(self) -> bool:
+        return self._playing
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._depth_locked()
+
+    def target_depth(self) -> int:
+        with self._lock:
+            return self._target_frames_locked()
+
+    def has_pending(self) -> bool:
+        return bool(self._packets)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "playing": self._playing,
+                "depth": self._depth_locked(),
+                "target_depth": self._target_frames_locked(),
+                "jitter_ms": round(self._jitter_ms, 2),
+                "received_frames": self.received_frames,
+                "played_frames": self.played_frames,
+                "concealed_frames": self.concealed_frames,
+                "late_frames": self.late_frames,
+                "underrun_frames": self.underrun_frames,
+                "duplicate_frames": self.duplicate_frames,
+                "rebuffer_count": self.rebuffer_count,
+            }
+
+    # ---------------------------------------------------------------- 内部
+    def _depth_locked(self) -> int:
+        return len(self._packets)
+
+    def _target_frames_locked(self) -> int:
+        target_ms = max(self.start_threshold_ms, self._jitter_ms)
+        target_ms = min(target_ms, self.max_delay_ms)
+        return max(1, math.ceil(target_ms / self.frame_duration_ms))
+
+    def _advance_locked(self):
+        self._next_seq = (self._next_seq + 1) % _SEQ_MOD
+        self._has_played = True
+
+    def _resync_locked(self):
+        self._playing = False
+        self._next_seq = None
+        self._has_played = False
+        self._conceal_run = 0
+        self._base_transit = None
+
+    def _update_jitter_locked(self, sequence: int, arrival: float):
+        # 传输时延 = 到达时间 - 包的媒体时间；只关心相对最小值的迟到量
+        transit = arrival * 1000 - sequence * self.frame_duration_ms
+        if self._base_transit is None or transit < self._base_transit:
+            self._base_transit = transit
+        else:
+            # 基准缓慢上浮，适应发送节奏变化
+            self._base_transit += (transit - self._base_transit) / 256
+
+        lateness = transit - self._base_transit
+        if lateness > self._jitter_ms:
+            # 快速上升
+            self._jitter_ms = lateness
+        else:
+            # 缓慢回落
+            self._jitter_ms += (lateness - self._jitter_ms) / 64
@@ -0,0 +1,252 @@
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.audio_codecs.resampler import create_resampler
+from src.audio_codecs.ring_buffer import AudioRingBuffer
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class MicTapReader:
+    """
+    麦克风广播的读端：持有独立读游标，按自己的帧长和采样率取数据.
+
+    每个读端只应由一个消费者线程使用；写端（录音路径）永不等待读端，
+    读端落后超过共享环容量时丢弃最旧数据并计入 overrun_samples。
+    """
+
+    def __init__(
+        self, tap: "MicrophoneTap", name: str, frame_size: int, sample_rate: int
+    ):
+        self.name = name
+        self.frame_size = frame_size
+        self.sample_rate = sample_rate
+
+        self._tap = tap
+        self._cursor = tap.write_total  # 只接收注册之后的音频
+        self._discard_requested = False
+        self._event = threading.Event()
+        self._closed = False
+
+        # 采样率不同时经独立重采样器转换，结果暂存在本地缓冲
+        self._resampler = None
+        self._pending = None
+        self._scratch = None
+        if sample_rate != tap.sample_rate:
+            self._resampler = create_resampler(tap.sample_rate, sample_rate)
+            # 每次最多转换约两帧，保证结果能放入本地缓冲
+            chunk = int(frame_size * tap.sample_rate / sample_rate) * 2 + 1
+            self._scratch = np.zeros(chunk, dtype=np.int16)
+            self._pending = AudioRingBuffer(frame_size * 4)
+
+        # 统计
+        self.frames_read = 0
+        self.overrun_samples = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def available(self) -> int:
+        """
+        可读样本数（按共享环采样率计，重采样读端为近似值）.
+        """
+        pending = len(self._pending) if self._pending is not None else 0
+        return self._tap.write_total - self._cursor + pending
+
+    def read(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """读取一帧（frame_size 个样本），不足一帧时返回None.
+
+        Args:
+            out: 可选的预分配输出数组，提供时直接写入避免分配
+        """
+        if self._discard_requested:
+            self._apply_discard()
+
+        if self._resampler is None:
+            if self._tap.write_total - self._cursor < self.frame_size:
+                return None
+            if out is None:
+                out = np.empty(self.frame_size, dtype=np.int16)
+            target = out[: self.frame_size]
+            self._cursor = self._tap._copy_from(self._cursor, target, self)
+            self.frames_read += 1
+            return target
+
+        # 重采样读端：分块转换共享环中的新数据，凑满一帧为止
+        while len(self._pending) < self.frame_size:
+            n = min(self._tap.write_total - self._cursor, len(self._scratch))
+            if n <= 0:
+                return None
+            chunk = self._scratch[:n]
+            self._cursor = self._tap._copy_from(self._cursor, chunk, self)
+            resampled = self._resampler.resample_chunk(chunk, last=False)
+            if len(resampled):
+                self._pending.write(resampled)
+
+        frame = self._pending.read(self.frame_size, out=out)
+        self.frames_read += 1
+        return frame
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        阻塞等待新数据（供线程消费者使用），返回是否有可读数据.
+        """
+        if self.available() >= self.frame_size:
+            return True
+        self._event.clear()
+        if self.available() >= self.frame_size:
+            return True
+        self._event.wait(timeout)
+        return self.available() >= self.frame_size
+
+    def discard(self):
+        """
+        丢弃积压数据（可在任意线程调用，下一次读取时生效）.
+        """
+        self._discard_requested = True
+
+    def wake(self):
+        """
+        唤醒在 wait() 中阻塞的消费者线程（如停止时），可在任意线程调用.
+        """
+        self._notify()
+
+    def close(self):
+        self._tap.unregister(self)
+
+    def get_stats(self) -> dict:
+        return {
+            "frame_size": self.frame_size,
+            "sample_rate": self.sample_rate,
+            "backlog": self._tap.write_total - self._cursor,
+            "frames_read": self.frames_read,
+            "overrun_samples": self.overrun_samples,
+        }
+
+    def _apply_discard(self):
+        self._discard_requested = False
+        self._cursor = self._tap.write_total
+        if self._pending is not None:
+            self._pending.clear()
+
+    def _notify(self):
+        self._event.set()
+
+
+class MicrophoneTap:
+    """
+    麦克风多消费者广播（单写多读）.
+
+    录音路径把每帧16kHz样本写入一个共享环形缓冲区，VAD、唤醒词等消费者
+    通过各自的 MicTapReader 游标读取，不再各自打开采集流或拷贝私有队列。
+    写入总数单调递增，读端用它判断可读量和是否被覆盖。
+    """
+
+    def __init__(self, sample_rate: int, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"麦克风广播缓冲容量必须大于0: {capacity}")
+
+        self.sample_rate = sample_rate
+        self._ring = np.zeros(capacity, dtype=np.int16)
+        self._capacity = capacity
+        # 已写入样本总数（只由写端更新，数据拷贝完成后才推进）
+        self.write_total = 0
+
+        self._readers: List[MicTapReader] = []
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def register(
+        self, name: str, frame_size: int, sample_rate: Optional[int] = None
+    ) -> MicTapReader:
+        """注册一个消费者.
+
+        Args:
+            name: 消费者名称（用于统计）
+            frame_size: 每次读取的样本数（按消费者采样率计）
+            sample_rate: 消费者需要的采样率，默认与广播相同
+        """
+        if frame_size <= 0 or frame_size > self._capacity // 2:
+            raise ValueError(f"消费者帧长无效: {frame_size}")
+
+        reader = MicTapReader(self, name, frame_size, sample_rate or self.sample_rate)
+        with self._lock:
+            # 整体替换列表，写端遍历时无需加锁
+            self._readers = self._readers + [reader]
+        logger.info(
+            f"注册麦克风消费者: {name} ({reader.frame_size} 样本 @ {reader.sample_rate}Hz)"
+        )
+        return reader
+
+    def unregister(self, reader: MicTapReader):
+        with self._lock:
+            if reader in self._readers:
+                self._readers = [r for r in self._readers if r is not reader]
+                logger.info(f"注销麦克风消费者: {reader.name}")
+        reader._closed = True
+        reader._notify()
+
+    def write(self, samples: np.ndarray):
+        """
+        写入样本（录音路径调用，不分配内存），并唤醒等待中的读端.
+        """
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self._capacity:
+            samples = samples[-self._capacity :]
+            self.write_total += n - self._capacity
+            n = self._capacity
+
+        pos = self.write_total % self._capacity
+        first = min(n, self._capacity - pos)
+        self._ring[pos : pos + first] = samples[:first]
+        if first < n:
+            self._ring[: n - first] = samples[first:]
+        self.write_total += n
+
+        for reader in self._readers:
+            reader._notify()
+
+    def discard_all(self):
+        """
+        让所有读端丢弃积压数据（如清空音频队列时）.
+        """
+        for reader in self._readers:
+            reader.discard()
+
+    @property
+    def consumer_count(self) -> int:
+        return len(self._readers)
+
+    def get_stats(self) -> Dict[str, dict]:
+        return {reader.name: reader.get_stats() for reader in self._readers}
+
+    def _copy_from(self, cursor: int, target: np.ndarray, reader: MicTapReader) -> int:
+        """
+        从游标处拷贝 len(target) 个样本，处理读端落后被覆盖的情况，返回新游标.
+        """
+        n = len(target)
+        oldest = self.write_total - self._capacity
+        if cursor < oldest:
+            reader.overrun_samples += oldest - cursor
+            cursor = oldest
+
+        pos = cursor % self._capacity
+        first = min(n, self._capacity - pos)
+        target[:first] = self._ring[pos : pos + first]
+        if first < n:
+            target[first:] = self._ring[: n - first]
+
+        # 拷贝期间写端可能已覆盖这段数据：计入溢出（读到的部分样本已是新数据）
+        overwritten = self.write_total - self._capacity - cursor
+        if overwritten > 0:
+            reader.overrun_samples += min(overwritten, n)
+        return cursor + n
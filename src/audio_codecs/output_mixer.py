@@ -0,0 +1,279 @@
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from src.audio_codecs.frame_queue import AudioFrameQueue
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class MixerSource:
+    """
+    混音输入源：生产端按任意长度写入PCM块，播放回调按帧拉取.
+
+    数据块通过跨线程 AudioFrameQueue 传递，消费端只持有当前块和读偏移，
+    不拷贝整块数据。增益、暂停可在任意线程修改，下一帧生效（增益在帧内平滑过渡）。
+    清空与拉取互斥（短临界区，仅在清空时才可能竞争），保证清空后
+    立即写入的新数据不会被误丢弃。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        priority: int = 0,
+        gain: float = 1.0,
+        duck_gain: float = 1.0,
+        chunks: Optional[AudioFrameQueue] = None,
+        maxsize: int = 64,
+    ):
+        """
+        Args:
+            name: 源名称（用于统计）
+            priority: 优先级，有更高优先级的源在播放时本源被压低
+            gain: 源增益（线性）
+            duck_gain: 被压低时叠加的增益（1.0表示不压低）
+            chunks: 复用已有的帧队列（如TTS播放队列），默认新建
+            maxsize: 新建队列的块容量
+        """
+        self.name = name
+        self.priority = priority
+        self.gain = gain
+        self.duck_gain = duck_gain
+        self.paused = False
+
+        self._chunks = chunks if chunks is not None else AudioFrameQueue(maxsize)
+        # 消费端状态（播放回调线程访问，清空时在锁内重置）
+        self._current = None
+        self._offset = 0
+        self._lock = threading.Lock()
+        # 压低包络和已生效的增益（仅混音器访问）
+        self._envelope = 1.0
+        self._applied_gain = gain
+
+        # 统计：已输出样本数（消费端更新）
+        self.samples_played = 0
+
+    def write(self, samples: np.ndarray) -> bool:
+        """写入一块PCM样本（调用方在写入后不应再修改该数组）.
+
+        Returns:
+            False 表示队列已满并按溢出策略丢弃了数据
+        """
+        if len(samples) == 0:
+            return True
+        return self._chunks.put(samples)
+
+    def full(self) -> bool:
+        return self._chunks.full()
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def clear(self) -> int:
+        """
+        丢弃未播放的数据（可在任意线程调用），返回丢弃的块数.
+        """
+        with self._lock:
+            cleared = self._chunks.clear()
+            if self._current is not None:
+                self._current = None
+                self._offset = 0
+                cleared += 1
+        return cleared
+
+    def has_data(self) -> bool:
+        return self._current is not None or not self._chunks.empty()
+
+    @property
+    def active(self) -> bool:
+        return not self.paused and self.has_data()
+
+    def pull(self, out: np.ndarray) -> int:
+        """
+        消费端：拉取最多 len(out) 个样本写入out，返回实际样本数.
+        """
+        if self.paused:
+            return 0
+
+        with self._lock:
+            filled = self._pull_locked(out, len(out))
+
+        self.samples_played += filled
+        return filled
+
+    def _pull_locked(self, out: np.ndarray, wanted: int) -> int:
+        filled = 0
+        while filled < wanted:
+            if self._current is None:
+                self._current = self._chunks.get_nowait()
+                self._offset = 0
+                if self._current is None:
+                    break
+            chunk = self._current
+            n = min(wanted - filled, len(chunk) - self._offset)
+            out[filled : filled + n] = chunk[self._offset : self._offset + n]
+            filled += n
+            self._offset += n
+            if self._offset >= len(chunk):
+                self._current = None
+        return filled
+
+    def get_stats(self) -> dict:
+        return {
+            "priority": self.priority,
+            "gain": self.gain,
+            "envelope": round(self._envelope, 3),
+            "paused": self.paused,
+            "queued_chunks": self._chunks.qsize(),
+            "samples_played": self.samples_played,
+        }
+
+
+class OutputMixer:
+    """
+    播放混音器：把多个输入源（TTS、音乐、提示音）按增益和优先级压低混合成一帧.
+
+    所有源采用相同采样率（解码输出24kHz），混合在预分配的float32缓冲上向量化完成，
+    混合结果只做一次到设备采样率的重采样。源增益、压低包络和主增益（软件音量）
+    的变化都在帧内线性过渡，避免增益突变产生咔哒/拉链噪声。源列表整体替换，
+    播放回调遍历时无需加锁。
+    """
+
+    PRIORITY_MUSIC = 0
+    PRIORITY_NOTIFICATION = 50
+    PRIORITY_TTS = 100
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_size: int,
+        attack_ms: float = 50,
+        release_ms: float = 400,
+    ):
+        if frame_size <= 0:
+            raise ValueError(f"混音帧长必须大于0: {frame_size}")
+
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        frame_ms = frame_size * 1000 / sample_rate
+        # 每帧包络最大变化量（增益从1到0所需时间）
+        self._attack_step = min(1.0, frame_ms / attack_ms) if attack_ms > 0 else 1.0
+        self._release_step = (
+            min(1.0, frame_ms / release_ms) if release_ms > 0 else 1.0
+        )
+
+        self._sources: List[MixerSource] = []
+        self._lock = threading.Lock()
+
+        # 主增益（软件音量）：任意线程设置目标值，混音时平滑过渡
+        self.master_gain = 1.0
+        self._applied_master = 1.0
+
+        # 预分配混音缓冲
+        self._mix = np.zeros(frame_size, dtype=np.float32)
+        self._scaled = np.zeros(frame_size, dtype=np.float32)
+        self._scratch = np.zeros(frame_size, dtype=np.int16)
+        self._output = np.zeros(frame_size, dtype=np.int16)
+        self._ramp = np.arange(1, frame_size + 1, dtype=np.float32) / frame_size
+
+    def add_source(self, name: str, **kwargs) -> MixerSource:
+        """
+        添加输入源，参数见 MixerSource.
+        """
+        source = MixerSource(name, **kwargs)
+        with self._lock:
+            self._sources = self._sources + [source]
+        logger.info(f"添加混音源: {name} (优先级 {source.priority})")
+        return source
+
+    def remove_source(self, source: MixerSource):
+        with self._lock:
+            if source in self._sources:
+                self._sources = [s for s in self._sources if s is not source]
+                logger.info(f"移除混音源: {source.name}")
+        source.clear()
+
+    @property
+    def sources(self) -> List[MixerSource]:
+        return self._sources
+
+    def mix(self) -> Optional[np.ndarray]:
+        """混合一帧（播放回调调用，不分配内存）.
+
+        Returns:
+            int16帧（内部缓冲，下次调用前有效），所有源均无数据时返回None
+        """
+        sources = self._sources
+
+        # 当前有数据的最高优先级，低于它的源被压低
+        top_priority = None
+        for source in sources:
+            if source.active and (top_priority is None or source.priority > top_priority):
+                top_priority = source.priority
+
+        mix = self._mix
+        mixed = False
+        for source in sources:
+            ducked = top_priority is not None and source.priority < top_priority
+            target = source.duck_gain if ducked else 1.0
+            start_env = source._envelope
+            end_env = self._approach(start_env, target)
+            source._envelope = end_env
+
+            # 源增益与压低包络合成总增益，帧首为上一帧末的值
+            start = source._applied_gain * start_env
+            gain = source.gain
+            source._applied_gain = gain
+            end = gain * end_env
+
+            n = source.pull(self._scratch)
+            if n == 0:
+                continue
+
+            samples = self._scratch[:n]
+            scaled = self._scaled[:n]
+            if start == end:
+                np.multiply(samples, end, out=scaled)
+            else:
+                # 帧内线性过渡：start + (end - start) * ramp
+                np.multiply(self._ramp[:n], end - start, out=scaled)
+                scaled += start
+                scaled *= samples
+
+            if not mixed:
+                mix.fill(0)
+                mixed = True
+            mix[:n] += scaled
+
+        start = self._applied_master
+        end = self.master_gain
+        self._applied_master = end
+        if not mixed:
+            return None
+
+        if start != end:
+            np.multiply(self._ramp, end - start, out=self._scaled)
+            self._scaled += start
+            mix *= self._scaled
+        elif end != 1.0:
+            mix *= end
+
+        np.rint(mix, out=mix)
+        np.clip(mix, -32768, 32767, out=mix)
+        np.copyto(self._output, mix, casting="unsafe")
+        return self._output
+
+    def _approach(self, current: float, target: float) -> float:
+        if current > target:
+            return max(target, current - self._attack_step)
+        if current < target:
+            return min(target, current + self._release_step)
+        return current
+
+    def get_stats(self) -> dict:
+        return {source.name: source.get_stats() for source in self._sources}
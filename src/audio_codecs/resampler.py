@@ -0,0 +1,331 @@
+import time
+from typing import Optional
+
+import numpy as np
+import soxr
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 可选后端：soxr（默认）；polyphase 对整数倍率单声道使用多相FIR，其余回退soxr；
+# auto 在多相适用时实测两者单帧耗时，多相更快才使用多相，否则使用soxr
+BACKENDS = ("auto", "soxr", "polyphase")
+# auto 实测时每个后端的调用次数与帧长
+AUTO_PROBE_ROUNDS = 50
+AUTO_PROBE_MS = 20
+# auto 实测结果缓存：(输入采样率, 输出采样率, dtype, 质量, 每相抽头数) -> 是否用多相
+_auto_choices = {}
+# soxr质量预设（由低到高）
+SOXR_QUALITIES = ("QQ", "LQ", "MQ", "HQ", "VHQ")
+
+
+class PassthroughResampler:
+    """
+    采样率相同时的直通重采样器（不拷贝数据）.
+    """
+
+    def resample_chunk(self, x: np.ndarray, last: bool = False) -> np.ndarray:
+        return x
+
+    def clear(self):
+        pass
+
+
+class PolyphaseResampler:
+    """
+    整数倍率多相FIR重采样器（单声道流式）.
+
+    按 Kaiser 窗 sinc 设计奇数长度的原型低通（群延迟为整数个输出样点），
+    拆成各相子滤波器。输入追加到预分配的工作缓冲（前部为上一块留下的历史），
+    把滑动窗口复制成连续矩阵后用一次矩阵乘计算全部相位：L倍上采样每个输入点得到
+    L个交织输出点，M倍下采样只计算保留的输出点。工作缓冲和输出缓冲按块长
+    预分配（块变长时扩容），稳态下不分配内存。
+    接口与 soxr.ResampleStream 一致（resample_chunk/clear），返回的数组是
+    内部缓冲的视图，下一次调用前有效。
+    """
+
+    # 截止频率相对低侧奈奎斯特频率的比例
+    CUTOFF = 0.95
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int,
+        dtype="int16",
+        taps_per_phase: int = 32,
+        beta: float = 6.0,
+        max_chunk: int = 0,
+    ):
+        """
+        Args:
+            in_rate: 输入采样率
+            out_rate: 输出采样率（与输入成整数倍）
+            dtype: 样本类型
+            taps_per_phase: 每相抽头数
+            beta: Kaiser窗参数
+            max_chunk: 预期的最大输入块长，用于预分配缓冲（不足时按需扩容）
+        """
+        up, down = integer_ratio(in_rate, out_rate)
+        if up is None:
+            raise ValueError(f"非整数倍率，无法使用多相重采样: {in_rate} -> {out_rate}")
+        if taps_per_phase < 2:
+            raise ValueError(f"每相抽头数至少为2: {taps_per_phase}")
+
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = up
+        self.down = down
+        self._dtype = np.dtype(dtype)
+        if self._dtype.kind == "i":
+            info = np.iinfo(self._dtype)
+            self._min, self._max = info.min, info.max
+
+        # 原型低通长度 2kR+1（奇数，中心在整数样点上）
+        factor = max(up, down)
+        half = taps_per_phase // 2
+        num_taps = 2 * half * factor + 1
+        cutoff = 0.5 / factor * self.CUTOFF
+        t = np.arange(num_taps) - half * factor
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(num_taps, beta)
+        h *= up / h.sum()
+
+        # 补零到 (2k+1)*R 后排成矩阵，与滑动窗口做一次矩阵乘
+        self._taps = 2 * half + 1
+        padded = np.zeros(self._taps * factor, dtype=np.float32)
+        if up > 1:
+            # 第k行第p列为第p相子滤波器在窗口第k个输入点上的系数
+            padded[:num_taps] = h
+            self._weights = np.ascontiguousarray(
+                padded.reshape(self._taps, up)[::-1]
+            )
+            self._window = self._taps
+            self._history_size = self._taps - 1
+        else:
+            # 窗口为从第n*M个输入点起的 (2k+1)*M 个点
+            padded[:num_taps] = h[::-1]
+            self._weights = padded
+            self._window = self._taps * down
+            self._history_size = (self._taps - 1) * down
+
+        # 群延迟（输出样点）
+        self.delay = half * up if up > 1 else half
+
+        self._work = np.zeros(0, dtype=np.float32)
+        self._fill = 0
+        self._allocate(max(max_chunk, 1))
+        self.clear()
+
+    def resample_chunk(self, x: np.ndarray, last: bool = False) -> np.ndarray:
+        """处理一块输入.
+
+        Args:
+            x: 一维样本数组
+            last: 是否为最后一块（补零冲出滤波器中的尾部样本）
+        """
+        samples = np.asarray(x).reshape(-1)
+        n = len(samples)
+        tail = self._history_size if last else 0
+        if self._fill + n + tail > len(self._work):
+            self._allocate(n + tail)
+
+        work = self._work
+        fill = self._fill
+        work[fill : fill + n] = samples
+        if tail:
+            work[fill + n : fill + n + tail] = 0
+        fill += n + tail
+
+        if fill < self._window:
+            count = 0
+        elif self.up > 1:
+            count = fill - self._window + 1
+        else:
+            count = (fill - self._window) // self.down + 1
+
+        if count == 0:
+            output = self._output[:0]
+        else:
+            # 滑动窗口视图的行相互重叠，先复制成连续矩阵才能走BLAS
+            windows = self._windows[:count]
+            np.copyto(windows, self._window_view[:count])
+            if self.up > 1:
+                output = self._output[: count * self.up]
+                np.matmul(windows, self._weights, out=output.reshape(count, self.up))
+            else:
+                output = self._output[:count]
+                np.matmul(windows, self._weights, out=output)
+
+        if last:
+            self.clear()
+        else:
+            # 未消耗的样本（历史 + 不足一个输出点的余量）移到缓冲前部
+            consumed = count * self.down if self.up == 1 else count
+            keep = fill - consumed
+            if consumed:
+                work[:keep] = work[consumed:fill]
+            self._fill = keep
+
+        if self._dtype.kind != "i":
+            return output.astype(self._dtype, copy=False)
+        np.rint(output, out=output)
+        np.maximum(output, self._min, out=output)
+        np.minimum(output, self._max, out=output)
+        result = self._result[: len(output)]
+        np.copyto(result, output, casting="unsafe")
+        return result
+
+    def clear(self):
+        self._work[: self._history_size] = 0
+        self._fill = self._history_size
+
+    def _allocate(self, chunk: int):
+        """
+        按块长扩容工作缓冲与输出缓冲（保留未消耗的样本）.
+        """
+        size = self._history_size + self.down + chunk
+        if size <= len(self._work):
+            return
+        work = np.zeros(size, dtype=np.float32)
+        work[: self._fill] = self._work[: self._fill]
+        self._work = work
+        # 第n行为第n个输出点（下采样时为第n组）对应的输入窗口，与缓冲共享内存
+        rows = (size - self._window) // self.down + 1
+        itemsize = work.itemsize
+        self._window_view = np.lib.stride_tricks.as_strided(
+            work,
+            shape=(rows, self._window),
+            strides=(self.down * itemsize, itemsize),
+            writeable=False,
+        )
+        self._windows = np.zeros((rows, self._window), dtype=np.float32)
+        outputs = rows * self.up
+        self._output = np.zeros(outputs, dtype=np.float32)
+        self._result = np.zeros(outputs, dtype=self._dtype)
+
+
+def integer_ratio(in_rate: int, out_rate: int):
+    """
+    返回 (上采样倍数, 下采样倍数)，仅当其中一个为1时成立，否则返回 (None, None).
+    """
+    if in_rate <= 0 or out_rate <= 0:
+        return None, None
+    if out_rate % in_rate == 0:
+        return out_rate // in_rate, 1
+    if in_rate % out_rate == 0:
+        return 1, in_rate // out_rate
+    return None, None
+
+
+def create_resampler(
+    in_rate: int,
+    out_rate: int,
+    channels: int = 1,
+    dtype="int16",
+    backend: str = "soxr",
+    quality: str = "QQ",
+    taps_per_phase: int = 32,
+):
+    """创建流式重采样器（均提供 resample_chunk(x, last)/clear()）.
+
+    Args:
+        in_rate: 输入采样率
+        out_rate: 输出采样率
+        channels: 声道数（多相后端仅支持单声道）
+        dtype: 样本类型
+        backend: auto/soxr/polyphase（auto 实测更快者，见 BACKENDS）
+        quality: soxr质量预设 QQ/LQ/MQ/HQ/VHQ
+        taps_per_phase: 多相滤波器每相抽头数
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"不支持的重采样后端: {backend}")
+    if quality not in SOXR_QUALITIES:
+        raise ValueError(f"不支持的soxr质量预设: {quality}")
+
+    if in_rate == out_rate:
+        return PassthroughResampler()
+
+    if backend != "soxr":
+        up, _ = integer_ratio(in_rate, out_rate)
+        if up is None or channels != 1:
+            logger.info(f"{in_rate}Hz -> {out_rate}Hz 不适用多相重采样，使用soxr")
+        elif backend == "polyphase" or _polyphase_is_faster(
+            in_rate, out_rate, dtype, quality, taps_per_phase
+        ):
+            return PolyphaseResampler(
+                in_rate, out_rate, dtype=dtype, taps_per_phase=taps_per_phase
+            )
+
+    return soxr.ResampleStream(in_rate, out_rate, channels, dtype=dtype, quality=quality)
+
+
+def _polyphase_is_faster(
+    in_rate: int, out_rate: int, dtype, quality: str, taps_per_phase: int
+) -> bool:
+    """
+    auto 后端：用一帧噪声实测多相与soxr的单帧耗时（按参数缓存结果）.
+    """
+    key = (in_rate, out_rate, np.dtype(dtype).str, quality, taps_per_phase)
+    if key in _auto_choices:
+        return _auto_choices[key]
+
+    frame = in_rate * AUTO_PROBE_MS // 1000
+    rng = np.random.default_rng(0)
+    chunk = (rng.standard_normal(frame) * 1000).astype(dtype)
+    candidates = {
+        "polyphase": PolyphaseResampler(
+            in_rate, out_rate, dtype=dtype, taps_per_phase=taps_per_phase
+        ),
+        "soxr": soxr.ResampleStream(in_rate, out_rate, 1, dtype=dtype, quality=quality),
+    }
+    timings = {}
+    for name, resampler in candidates.items():
+        resampler.resample_chunk(chunk)
+        best = float("inf")
+        for _ in range(AUTO_PROBE_ROUNDS):
+            start = time.perf_counter()
+            resampler.resample_chunk(chunk)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+
+    faster = timings["polyphase"] < timings["soxr"]
+    _auto_choices[key] = faster
+    logger.info(
+        f"重采样后端自动选择 {in_rate}Hz -> {out_rate}Hz: "
+        f"polyphase {timings['polyphase'] * 1e6:.1f}us/帧, "
+        f"soxr-{quality} {timings['soxr'] * 1e6:.1f}us/帧, "
+        f"使用{'polyphase' if faster else 'soxr'}"
+    )
+    return faster
+
+
+def resampler_options(config) -> dict:
+    """
+    从配置读取重采样选项（AUDIO_OPTIONS.RESAMPLER.*），非法值回退默认.
+    """
+    backend = str(config.get_config("AUDIO_OPTIONS.RESAMPLER.BACKEND", "soxr")).lower()
+    if backend not in BACKENDS:
+        logger.warning(f"未知重采样后端 {backend}，使用soxr")
+        backend = "soxr"
+
+    quality = str(config.get_config("AUDIO_OPTIONS.RESAMPLER.QUALITY", "QQ")).upper()
+    if quality not in SOXR_QUALITIES:
+        logger.warning(f"未知soxr质量预设 {quality}，使用QQ")
+        quality = "QQ"
+
+    try:
+        taps = int(config.get_config("AUDIO_OPTIONS.RESAMPLER.TAPS_PER_PHASE", 32))
+    except (TypeError, ValueError):
+        taps = 32
+    return {"backend": backend, "quality": quality, "taps_per_phase": max(taps, 4)}
+
+
+def describe_resampler(resampler: Optional[object]) -> str:
+    """
+    重采样器的简短描述（用于日志）.
+    """
+    if resampler is None or isinstance(resampler, PassthroughResampler):
+        return "passthrough"
+    if isinstance(resampler, PolyphaseResampler):
+        return f"polyphase x{resampler.up}/{resampler.down}"
+    return "soxr"
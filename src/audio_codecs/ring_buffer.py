@@ -0,0 +1,140 @@
+from typing import Optional
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    固定容量的音频环形缓冲区.
+
+    预先分配NumPy数组，读写均为切片批量拷贝（最多两段），
+    不在音频回调中逐样本操作，也不产生额外的Python对象。
+    写入超出容量时覆盖最旧数据并计数。
+    非线程安全：读写和 clear() 应在同一线程执行，其他线程需要清空时应通知
+    所属线程处理。
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError(f"环形缓冲区容量必须大于0: {capacity}")
+
+        self._buffer = np.zeros(capacity, dtype=dtype)
+        self._capacity = capacity
+        self._read_pos = 0
+        self._size = 0
+
+        # 统计：因容量不足被覆盖丢弃的样本数
+        self.overflow_samples = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def dtype(self):
+        return self._buffer.dtype
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def free_space(self) -> int:
+        """
+        剩余可写样本数.
+        """
+        return self._capacity - self._size
+
+    def write(self, data: np.ndarray) -> int:
+        """批量写入样本，空间不足时丢弃最旧样本.
+
+        Args:
+            data: 一维样本数组（会按缓冲区dtype转换）
+
+        Returns:
+            实际写入的样本数
+        """
+        n = len(data)
+        if n == 0:
+            return 0
+
+        # 超过容量时只保留最新的 capacity 个样本
+        if n > self._capacity:
+            self.overflow_samples += n - self._capacity
+            data = data[-self._capacity :]
+            n = self._capacity
+
+        overflow = n - self.free_space()
+        if overflow > 0:
+            self._skip(overflow)
+            self.overflow_samples += overflow
+
+        write_pos = (self._read_pos + self._size) % self._capacity
+        first = min(n, self._capacity - write_pos)
+        self._buffer[write_pos : write_pos + first] = data[:first]
+        if first < n:
+            self._buffer[: n - first] = data[first:]
+
+        self._size += n
+        return n
+
+    def read(self, n: int, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """读取 n 个样本，数据不足时不消耗并返回None.
+
+        Args:
+            n: 读取的样本数
+            out: 可选的输出数组（长度至少为n），提供时直接写入避免分配
+
+        Returns:
+            读取的数据（out提供时返回out[:n]的视图）
+        """
+        if n > self._size:
+            return None
+
+        if out is None:
+            out = np.empty(n, dtype=self._buffer.dtype)
+        target = out[:n]
+        self._copy_out(target, n)
+        self._skip(n)
+        return target
+
+    def peek(self, n: int, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        读取但不消耗 n 个样本.
+        """
+        if n > self._size:
+            return None
+
+        if out is None:
+            out = np.empty(n, dtype=self._buffer.dtype)
+        target = out[:n]
+        self._copy_out(target, n)
+        return target
+
+    def skip(self, n: int) -> int:
+        """
+        丢弃最旧的 n 个样本，返回实际丢弃数.
+        """
+        n = min(n, self._size)
+        self._skip(n)
+        return n
+
+    def clear(self):
+        """
+        清空缓冲区（不释放内存）.
+        """
+        self._read_pos = 0
+        self._size = 0
+
+    def _copy_out(self, target: np.ndarray, n: int):
+        first = min(n, self._capacity - self._read_pos)
+        target[:first] = self._buffer[self._read_pos : self._read_pos + first]
+        if first < n:
+            target[first:n] = self._buffer[: n - first]
+
+    def _skip(self, n: int):
+        self._read_pos = (self._read_pos + n) % self._capacity
+        self._size -= n
+        if self._size == 0:
+            self._read_pos = 0
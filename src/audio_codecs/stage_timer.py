@@ -0,0 +1,79 @@
+from bisect import bisect_left
+from typing import Dict, List, Sequence
+
+# 直方图桶上边界（毫秒），超过最后一个边界的计入溢出桶
+DEFAULT_BUCKETS_MS = (0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100)
+
+
+class StageTimer:
+    """
+    分阶段耗时统计（次数/总耗时/最大耗时 + 固定桶直方图）.
+
+    桶计数在创建阶段时预先分配，record() 只做定长列表的原位累加，
+    可以在音频回调中调用。每个阶段只由一个线程写入，读取时可能看到
+    轻微不一致的快照，统计用途足够。
+    """
+
+    def __init__(self, *stages: str, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self._buckets_ms = tuple(buckets_ms)
+        self._edges = tuple(b / 1000 for b in self._buckets_ms)
+        self._stats: Dict[str, list] = {stage: self._new_stat() for stage in stages}
+
+    def _new_stat(self) -> list:
+        # [次数, 总耗时, 最大耗时, 桶计数]
+        return [0, 0.0, 0.0, [0] * (len(self._edges) + 1)]
+
+    def record(self, stage: str, seconds: float):
+        stat = self._stats.get(stage)
+        if stat is None:
+            stat = self._stats[stage] = self._new_stat()
+        stat[0] += 1
+        stat[1] += seconds
+        if seconds > stat[2]:
+            stat[2] = seconds
+        stat[3][bisect_left(self._edges, seconds)] += 1
+
+    def reset(self):
+        for stat in self._stats.values():
+            stat[0], stat[1], stat[2] = 0, 0.0, 0.0
+            buckets = stat[3]
+            for i in range(len(buckets)):
+                buckets[i] = 0
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        返回各阶段统计，耗时单位为毫秒，分位数按桶上边界估算.
+        """
+        result = {}
+        for stage, (count, total, peak, buckets) in self._stats.items():
+            buckets = list(buckets)
+            peak_ms = peak * 1000
+            result[stage] = {
+                "count": count,
+                "avg_ms": (total / count * 1000) if count else 0.0,
+                "max_ms": peak_ms,
+                "p50_ms": self._percentile(buckets, 0.50, peak_ms),
+                "p95_ms": self._percentile(buckets, 0.95, peak_ms),
+                "p99_ms": self._percentile(buckets, 0.99, peak_ms),
+                "histogram": self._label_buckets(buckets),
+            }
+        return result
+
+    def _percentile(self, buckets: List[int], q: float, peak_ms: float) -> float:
+        total = sum(buckets)
+        if not total:
+            return 0.0
+        threshold = q * total
+        cumulative = 0
+        for i, n in enumerate(buckets):
+            cumulative += n
+            if cumulative >= threshold:
+                if i < len(self._buckets_ms):
+                    return min(self._buckets_ms[i], peak_ms)
+                return peak_ms
+        return peak_ms
+
+    def _label_buckets(self, buckets: List[int]) -> Dict[str, int]:
+        labels = {f"<={b:g}ms": n for b, n in zip(self._buckets_ms, buckets)}
+        labels[f">{self._buckets_ms[-1]:g}ms"] = buckets[-1]
+        return labels
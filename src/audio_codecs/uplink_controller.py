@@ -0,0 +1,397 @@
+from typing import Callable, Optional
+
+from src.audio_codecs.calibration import load_calibration
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class UplinkRateController:
+    """
+    上行Opus编码参数自适应控制器.
+
+    上行发送任务每发送一批调用 observe_send() 记录发送耗时和队列深度，
+    到达评估间隔后由调用方收集丢包（仅 MQTT/UDP 协议提供）、上行队列溢出
+    和编码耗时调用 evaluate()：
+        - 发送变慢、队列积压、溢出或高丢包时按比例降低码率，链路持续良好时逐步回升
+        - 丢包率超过阈值时开启带内FEC并设置预期丢包率，持续低丢包后关闭
+        - 编码耗时占帧时长比例过高时降低复杂度，长期空闲时逐步回升
+    每次调整都记录日志，并通过 apply_settings 回调交给编码器（在录音线程下一次编码前生效）。
+    帧时长由协议握手确定，不在运行时调整。
+    """
+
+    # 拥塞时码率乘以该系数，链路良好时每次回升的步长（bps）
+    DECREASE_FACTOR = 0.75
+    INCREASE_STEP = 4000
+    # 连续多少个良好评估窗口后才回升码率/复杂度
+    INCREASE_AFTER = 3
+    # 丢包率（%）：开启FEC、关闭FEC（需连续 FEC_HOLD 个窗口）、视为拥塞
+    FEC_ENABLE_LOSS = 2.0
+    FEC_DISABLE_LOSS = 0.5
+    FEC_HOLD = 5
+    CONGESTION_LOSS = 10.0
+    # 预期丢包率上限，以及丢包率的平滑系数和每窗口最少统计包数
+    MAX_LOSS_PERC = 30
+    LOSS_SMOOTHING = 0.3
+    MIN_LOSS_PACKETS = 20
+    # 每帧发送耗时、编码耗时占帧时长的比例阈值
+    HIGH_SEND_LOAD = 0.5
+    LOW_SEND_LOAD = 0.1
+    HIGH_ENCODE_LOAD = 0.15
+    LOW_ENCODE_LOAD = 0.05
+
+    def __init__(
+        self,
+        apply_settings: Callable[[dict], None],
+        frame_duration_ms: int,
+        min_bitrate: int = 12000,
+        max_bitrate: int = 40000,
+        initial_bitrate: Optional[int] = None,
+        min_complexity: int = 5,
+        max_complexity: int = 10,
+        initial_complexity: Optional[int] = None,
+        high_queue_frames: float = 4.0,
+        interval: float = 1.0,
+    ):
+        """
+        Args:
+            apply_settings: 接收变更的编码参数字典（bitrate/complexity/
+                inband_fec/packet_loss_perc）
+            frame_duration_ms: 编码帧时长
+            min_bitrate/max_bitrate: 码率范围（bps）
+            initial_bitrate: 初始码率，默认取上限
+            min_complexity/max_complexity: 复杂度范围（0-10）
+            initial_complexity: 初始复杂度，默认取上限
+            high_queue_frames: 平均队列深度超过该帧数视为拥塞
+            interval: 评估间隔（秒）
+        """
+        if not 0 < min_bitrate <= max_bitrate:
+            raise ValueError(f"码率范围无效: {min_bitrate}-{max_bitrate}")
+        if not 0 <= min_complexity <= max_complexity <= 10:
+            raise ValueError(f"复杂度范围无效: {min_complexity}-{max_complexity}")
+
+        self._apply_settings = apply_settings
+        self.frame_duration_ms = frame_duration_ms
+        self.min_bitrate = min_bitrate
+        self.max_bitrate = max_bitrate
+        self.min_complexity = min_complexity
+        self.max_complexity = max_complexity
+        self.high_queue_frames = high_queue_frames
+        self.interval = interval
+
+        self.bitrate = self._clamp(
+            initial_bitrate if initial_bitrate is not None else max_bitrate,
+            min_bitrate,
+            max_bitrate,
+        )
+        self.complexity = self._clamp(
+            initial_complexity if initial_complexity is not None else max_complexity,
+            min_complexity,
+            max_complexity,
+        )
+        self.inband_fec = 0
+        self.packet_loss_perc = 0
+
+        # 当前评估窗口
+        self._send_frames = 0
+        self._send_ms = 0.0
+        self._depth_total = 0
+        self._depth_samples = 0
+        self._window_start: Optional[float] = None
+
+        # 累计计数的上一次读数（用于求窗口增量）
+        self._last_dropped: Optional[int] = None
+        self._last_link: Optional[tuple] = None
+        self._last_encode: Optional[tuple] = None
+
+        self._good_windows = 0
+        self._idle_windows = 0
+        self._clean_windows = 0
+        self.loss_percent: Optional[float] = None
+        self.adjustments = 0
+        self.last_reason = ""
+
+    @staticmethod
+    def _clamp(value, low, high):
+        return max(low, min(high, int(value)))
+
+    def settings(self) -> dict:
+        """
+        当前目标编码参数.
+        """
+        return {
+            "bitrate": self.bitrate,
+            "complexity": self.complexity,
+            "inband_fec": self.inband_fec,
+            "packet_loss_perc": self.packet_loss_perc,
+        }
+
+    def observe_send(self, send_ms: float, frames: int, queue_depth: int):
+        """
+        上行发送任务每批调用：记录本批发送耗时、帧数和发送后的队列深度.
+        """
+        self._send_frames += frames
+        self._send_ms += send_ms
+        self._depth_total += queue_depth
+        self._depth_samples += 1
+
+    def due(self, now: float) -> bool:
+        """
+        是否到达评估时间（首次调用时开始计时）.
+        """
+        if self._window_start is None:
+            self._window_start = now
+            return False
+        return now - self._window_start >= self.interval
+
+    def evaluate(
+        self,
+        now: float,
+        frames_dropped: int,
+        link_stats: Optional[dict] = None,
+        encode_stats: Optional[tuple] = None,
+    ) -> Optional[dict]:
+        """根据本窗口观测调整编码参数.
+
+        Args:
+            now: 当前时间（单调时钟，秒）
+            frames_dropped: 上行队列累计溢出帧数
+            link_stats: 协议累计收包/丢包统计（packets_received/packets_lost），
+                不支持的协议为None或空字典
+            encode_stats: 累计编码 (次数, 总耗时毫秒)
+
+        Returns:
+            本次变更的编码参数，没有变更时返回None
+        """
+        self._window_start = now
+        dropped = self._delta_dropped(frames_dropped)
+        loss = self._window_loss(link_stats)
+        encode_load = self._window_encode_load(encode_stats)
+
+        send_frames = self._send_frames
+        send_load = (
+            self._send_ms / send_frames / self.frame_duration_ms if send_frames else 0.0
+        )
+        avg_depth = self._depth_total / self._depth_samples if self._depth_samples else 0.0
+        self._send_frames = 0
+        self._send_ms = 0.0
+        self._depth_total = 0
+        self._depth_samples = 0
+
+        changes = {}
+        reasons = []
+        if send_frames:
+            self._adjust_bitrate(send_load, avg_depth, dropped, changes, reasons)
+        self._adjust_fec(loss, changes, reasons)
+        self._adjust_complexity(encode_load, changes, reasons)
+
+        if not changes:
+            return None
+
+        self.adjustments += 1
+        self.last_reason = ", ".join(reasons)
+        described = ", ".join(
+            f"{name} {old} -> {new}" for name, (old, new) in changes.items()
+        )
+        logger.info(f"上行编码调整: {described} ({self.last_reason})")
+
+        settings = {name: new for name, (_, new) in changes.items()}
+        self._apply_settings(settings)
+        return settings
+
+    def _delta_dropped(self, frames_dropped: int) -> int:
+        last, self._last_dropped = self._last_dropped, frames_dropped
+        if last is None or frames_dropped < last:
+            return 0
+        return frames_dropped - last
+
+    def _window_loss(self, link_stats: Optional[dict]) -> Optional[float]:
+        """
+        本窗口丢包率（%）并更新平滑值；协议不提供统计或包数不足时返回None.
+        """
+        if not link_stats:
+            return None
+        current = (link_stats["packets_received"], link_stats["packets_lost"])
+        last = self._last_link
+        if last is None or current[0] < last[0] or current[1] < last[1]:
+            # 首次读数或会话重置了计数
+            self._last_link = current
+            return None
+
+        received = current[0] - last[0]
+        lost = current[1] - last[1]
+        if received + lost < self.MIN_LOSS_PACKETS:
+            # 包数不足：保留基准，累积到下一窗口
+            return None
+        self._last_link = current
+        loss = 100.0 * lost / (received + lost)
+        if self.loss_percent is None:
+            self.loss_percent = loss
+        else:
+            self.loss_percent += self.LOSS_SMOOTHING * (loss - self.loss_percent)
+        return self.loss_percent
+
+    def _window_encode_load(self, encode_stats: Optional[tuple]) -> Optional[float]:
+        """
+        本窗口平均每帧编码耗时占帧时长的比例，无新编码时返回None.
+        """
+        if encode_stats is None:
+            return None
+        last, self._last_encode = self._last_encode, encode_stats
+        if last is None or encode_stats[0] <= last[0]:
+            return None
+        count = encode_stats[0] - last[0]
+        total_ms = encode_stats[1] - last[1]
+        return total_ms / count / self.frame_duration_ms
+
+    def _adjust_bitrate(self, send_load, avg_depth, dropped, changes, reasons):
+        congestion = []
+        if send_load > self.HIGH_SEND_LOAD:
+            congestion.append(
+                f"每帧发送 {send_load * self.frame_duration_ms:.1f}ms"
+            )
+        if avg_depth > self.high_queue_frames:
+            congestion.append(f"队列 {avg_depth:.1f}帧")
+        if dropped:
+            congestion.append(f"溢出 {dropped}帧")
+        if self.loss_percent is not None and self.loss_percent >= self.CONGESTION_LOSS:
+            congestion.append(f"丢包 {self.loss_percent:.1f}%")
+
+        if congestion:
+            self._good_windows = 0
+            # 按 100bps 取整，便于阅读日志
+            target = self._clamp(
+                round(self.bitrate * self.DECREASE_FACTOR, -2),
+                self.min_bitrate,
+                self.max_bitrate,
+            )
+            if target != self.bitrate:
+                changes["bitrate"] = (self.bitrate, target)
+                self.bitrate = target
+                reasons.extend(congestion)
+            return
+
+        good = (
+            send_load < self.LOW_SEND_LOAD
+            and avg_depth <= 1
+            and (self.loss_percent is None or self.loss_percent < self.FEC_ENABLE_LOSS)
+        )
+        self._good_windows = self._good_windows + 1 if good else 0
+        if self._good_windows >= self.INCREASE_AFTER and self.bitrate < self.max_bitrate:
+            self._good_windows = 0
+            target = self._clamp(
+                self.bitrate + self.INCREASE_STEP, self.min_bitrate, self.max_bitrate
+            )
+            changes["bitrate"] = (self.bitrate, target)
+            self.bitrate = target
+            reasons.append("链路良好")
+
+    def _adjust_fec(self, loss, changes, reasons):
+        if loss is None:
+            return
+
+        if loss >= self.FEC_ENABLE_LOSS:
+            self._clean_windows = 0
+            perc = self._clamp(round(loss), 1, self.MAX_LOSS_PERC)
+            enable = not self.inband_fec
+            if enable:
+                changes["inband_fec"] = (0, 1)
+                self.inband_fec = 1
+            # 预期丢包率变化不大时不重复设置
+            if enable or abs(perc - self.packet_loss_perc) >= 2:
+                changes["packet_loss_perc"] = (self.packet_loss_perc, perc)
+                self.packet_loss_perc = perc
+                reasons.append(f"丢包 {loss:.1f}%")
+            return
+
+        if not self.inband_fec:
+            return
+        self._clean_windows = self._clean_windows + 1 if loss < self.FEC_DISABLE_LOSS else 0
+        if self._clean_windows >= self.FEC_HOLD:
+            self._clean_windows = 0
+            changes["inband_fec"] = (1, 0)
+            changes["packet_loss_perc"] = (self.packet_loss_perc, 0)
+            self.inband_fec = 0
+            self.packet_loss_perc = 0
+            reasons.append(f"丢包恢复 {loss:.1f}%")
+
+    def _adjust_complexity(self, encode_load, changes, reasons):
+        if encode_load is None:
+            return
+
+        if encode_load > self.HIGH_ENCODE_LOAD:
+            self._idle_windows = 0
+            if self.complexity > self.min_complexity:
+                changes["complexity"] = (self.complexity, self.complexity - 1)
+                self.complexity -= 1
+                reasons.append(f"编码占用 {encode_load:.0%}")
+            return
+
+        self._idle_windows = self._idle_windows + 1 if encode_load < self.LOW_ENCODE_LOAD else 0
+        if self._idle_windows >= self.INCREASE_AFTER and self.complexity < self.max_complexity:
+            self._idle_windows = 0
+            changes["complexity"] = (self.complexity, self.complexity + 1)
+            self.complexity += 1
+            reasons.append(f"编码占用 {encode_load:.0%}")
+
+    def get_status(self) -> dict:
+        return {
+            **self.settings(),
+            "bitrate_range": [self.min_bitrate, self.max_bitrate],
+            "complexity_range": [self.min_complexity, self.max_complexity],
+            "loss_percent": (
+                round(self.loss_percent, 2) if self.loss_percent is not None else None
+            ),
+            "adjustments": self.adjustments,
+            "last_reason": self.last_reason,
+        }
+
+
+def rate_control_options(config) -> Optional[dict]:
+    """从配置读取上行码率控制选项（AUDIO_OPTIONS.OPUS_ENCODER.*）.
+
+    ADAPTIVE 默认关闭（返回None，编码器保持原有固定参数），需在配置中显式
+    开启；范围无效时回退默认值。
+
+    Returns:
+        UplinkRateController 的构造参数（不含回调和帧时长）
+    """
+    if not config.get_config("AUDIO_OPTIONS.OPUS_ENCODER.ADAPTIVE", False):
+        return None
+
+    def read_int(key, default):
+        try:
+            return int(config.get_config(f"AUDIO_OPTIONS.OPUS_ENCODER.{key}", default))
+        except (TypeError, ValueError):
+            return default
+
+    min_bitrate = read_int("MIN_BITRATE", 12000)
+    max_bitrate = read_int("MAX_BITRATE", 40000)
+    if not 6000 <= min_bitrate <= max_bitrate <= 510000:
+        logger.warning(f"Opus码率范围无效: {min_bitrate}-{max_bitrate}，使用默认值")
+        min_bitrate, max_bitrate = 12000, 40000
+
+    # 复杂度上限默认取本机性能校准的结果
+    calibration = load_calibration(config)
+    default_max = calibration["OPUS_COMPLEXITY"] if calibration else 10
+    default_min = min(5, default_max)
+    min_complexity = read_int("MIN_COMPLEXITY", default_min)
+    max_complexity = read_int("MAX_COMPLEXITY", default_max)
+    if not 0 <= min_complexity <= max_complexity <= 10:
+        logger.warning(f"Opus复杂度范围无效: {min_complexity}-{max_complexity}，使用默认值")
+        min_complexity, max_complexity = default_min, default_max
+
+    try:
+        interval = float(config.get_config("AUDIO_OPTIONS.OPUS_ENCODER.INTERVAL", 1.0))
+    except (TypeError, ValueError):
+        interval = 1.0
+
+    return {
+        "min_bitrate": min_bitrate,
+        "max_bitrate": max_bitrate,
+        "initial_bitrate": read_int("INITIAL_BITRATE", max_bitrate),
+        "min_complexity": min_complexity,
+        "max_complexity": max_complexity,
+        "high_queue_frames": read_int("HIGH_QUEUE_FRAMES", 4),
+        "interval": max(interval, 0.2),
+    }
@@ -0,0 +1,184 @@
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from src.audio_codecs.stage_timer import StageTimer
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class KeywordSpotterWorker:
+    """
+    关键词检测工作线程.
+
+    从麦克风广播读端取帧送入KWS流并解码，全部在本线程执行（sherpa-onnx
+    推理期间释放GIL），事件循环只接收检测结果和错误回调。读端本身就是
+    该线程专用的帧队列：录音路径写入时唤醒等待中的读端，线程不轮询。
+    每次唤醒把已到达的全部帧读入预分配缓冲，一次 accept_waveform 送入；
+    暂停时阻塞在事件上，不占用CPU。
+    """
+
+    # 单次送入的最长音频，积压更多时分批送入
+    MAX_BATCH_SECONDS = 1.0
+    # 等待新帧的超时：只用于兜底检查停止标志（停止时会主动唤醒）
+    WAIT_TIMEOUT = 1.0
+    # 连续出错达到该次数后停止检测
+    MAX_ERRORS = 5
+
+    def __init__(
+        self,
+        keyword_spotter,
+        stream,
+        reader,
+        sample_rate: int,
+        on_result: Callable[[str], None],
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        """
+        Args:
+            keyword_spotter: sherpa_onnx.KeywordSpotter（或接口相同的对象）
+            stream: keyword_spotter.create_stream() 创建的检测流
+            reader: 麦克风广播读端（MicTapReader）
+            sample_rate: 读端输出的采样率
+            on_result: 检测到关键词时在本线程调用
+            on_error: 处理出错时在本线程调用
+        """
+        self._spotter = keyword_spotter
+        self._stream = stream
+        self._reader = reader
+        self.sample_rate = sample_rate
+        self._on_result = on_result
+        self._on_error = on_error
+
+        frame_size = reader.frame_size
+        self._batch_frames = max(
+            1, int(sample_rate * self.MAX_BATCH_SECONDS) // frame_size
+        )
+        self._samples = np.zeros(self._batch_frames * frame_size, dtype=np.int16)
+        self._waveform = np.zeros(self._batch_frames * frame_size, dtype=np.float32)
+
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        # 置位表示未暂停
+        self._resumed = threading.Event()
+        self._resumed.set()
+
+        self._timer = StageTimer("accept", "decode")
+        self.frames_fed = 0
+        self.batches = 0
+        self.detections = 0
+        self.errors = 0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="KeywordSpotter", daemon=True
+        )
+        self._thread.start()
+        logger.info("关键词检测线程已启动")
+
+    def stop(self, timeout: float = 1.0):
+        self._running = False
+        # 唤醒阻塞在暂停事件或读端上的线程
+        self._resumed.set()
+        self._reader.wake()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        logger.info("关键词检测线程已停止")
+
+    def pause(self):
+        self._resumed.clear()
+
+    def resume(self):
+        """
+        恢复检测：丢弃暂停期间积压的音频，避免检测过期数据.
+        """
+        self._reader.discard()
+        self._resumed.set()
+
+    def is_running(self) -> bool:
+        return self._running and self._thread is not None and self._thread.is_alive()
+
+    def get_stats(self) -> dict:
+        return {
+            "running": self.is_running(),
+            "paused": not self._resumed.is_set(),
+            "frames_fed": self.frames_fed,
+            "batches": self.batches,
+            "detections": self.detections,
+            "errors": self.errors,
+            "stages": self._timer.snapshot(),
+        }
+
+    def _run(self):
+        error_count = 0
+        while self._running:
+            if not self._resumed.is_set():
+                self._resumed.wait()
+                continue
+            if not self._reader.wait(timeout=self.WAIT_TIMEOUT):
+                continue
+
+            try:
+                self._process_available()
+                error_count = 0
+            except Exception as e:
+                error_count += 1
+                self.errors += 1
+                logger.error(f"KWS检测错误({error_count}/{self.MAX_ERRORS}): {e}")
+                if self._on_error:
+                    try:
+                        self._on_error(e)
+                    except Exception as callback_error:
+                        logger.error(f"执行错误回调时失败: {callback_error}")
+                if error_count >= self.MAX_ERRORS:
+                    logger.critical("达到最大错误次数，停止KWS检测")
+                    self._running = False
+                    break
+                time.sleep(1)
+
+    def _process_available(self):
+        """送入已到达的全部帧（最多 MAX_BATCH_SECONDS）并解码就绪的数据.
+
+        检测到关键词后重置流。
+        """
+        spotter = self._spotter
+        stream = self._stream
+        reader = self._reader
+        frame_size = reader.frame_size
+
+        start = time.perf_counter()
+        count = 0
+        while count < self._batch_frames:
+            offset = count * frame_size
+            if reader.read(out=self._samples[offset : offset + frame_size]) is None:
+                break
+            count += 1
+        if count == 0:
+            return
+
+        # 转换为[-1, 1]浮点并一次提供给KeywordSpotter
+        n = count * frame_size
+        waveform = self._waveform[:n]
+        np.multiply(self._samples[:n], 1 / 32768.0, out=waveform)
+        stream.accept_waveform(sample_rate=self.sample_rate, waveform=waveform)
+        self.frames_fed += count
+        self.batches += 1
+        self._timer.record("accept", time.perf_counter() - start)
+
+        while spotter.is_ready(stream):
+            start = time.perf_counter()
+            spotter.decode_stream(stream)
+            result = spotter.get_result(stream)
+            self._timer.record("decode", time.perf_counter() - start)
+            if result:
+                self.detections += 1
+                spotter.reset_stream(stream)
+                self._on_result(result)
+                break
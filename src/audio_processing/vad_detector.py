@@ -3,7 +3,6 @@ import threading
 import time
 
 import numpy as np
-import pyaudio
 import webrtcvad
 
 from src.constants.constants import AbortReason, DeviceState
@@ -50,9 +49,9 @@ class VADDetector:
         self.silence_count = 0
         self.triggered = False
 
-        # 创建独立的PyAudio实例和流，避免与主音频流冲突
-        self.pa = None
-        self.stream = None
+        # 麦克风广播读端：与AudioCodec共享同一路采集流
+        self.reader = None
+        self._frame = np.zeros(self.frame_size, dtype=np.int16)
 
     def start(self):
         """
@@ -65,7 +64,7 @@ class VADDetector:
         self.running = True
         self.paused = False
 
-        # 初始化PyAudio和流
+        # 注册为AudioCodec的麦克风消费者
         self._initialize_audio_stream()
 
         # 启动检测线程
@@ -113,36 +112,17 @@ class VADDetector:
 
     def _initialize_audio_stream(self):
         """
-        初始化独立的音频流.
+        注册麦克风广播读端（不再单独打开采集流）.
         """
         try:
-            # 创建PyAudio实例
-            self.pa = pyaudio.PyAudio()
-
-            # 获取默认输入设备
-            device_index = None
-            for i in range(self.pa.get_device_count()):
-                device_info = self.pa.get_device_info_by_index(i)
-                if device_info["maxInputChannels"] > 0:
-                    device_index = i
-                    break
-
-            if device_index is None:
-                logger.error("找不到可用的输入设备")
+            if not self.audio_codec:
+                logger.error("音频编解码器未初始化，无法获取麦克风数据")
                 return False
 
-            # 创建输入流
-            self.stream = self.pa.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=self.sample_rate,
-                input=True,
-                input_device_index=device_index,
-                frames_per_buffer=self.frame_size,
-                start=True,
+            self.reader = self.audio_codec.register_mic_consumer(
+                "vad", self.frame_size, self.sample_rate
             )
-
-            logger.info(f"VAD检测器音频流已初始化，使用设备索引: {device_index}")
+            logger.info("VAD检测器已接入共享麦克风")
             return True
 
         except Exception as e:
@@ -151,17 +131,12 @@ class VADDetector:
 
     def _close_audio_stream(self):
         """
-        关闭音频流.
+        注销麦克风广播读端.
         """
         try:
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-                self.stream = None
-
-            if self.pa:
-                self.pa.terminate()
-                self.pa = None
+            if self.reader:
+                self.audio_codec.unregister_mic_consumer(self.reader)
+                self.reader = None
 
             logger.info("VAD检测器音频流已关闭")
         except Exception as e:
@@ -174,18 +149,20 @@ class VADDetector:
         logger.info("VAD检测循环已启动")
 
         while self.running:
-            # 如果暂停或者音频流未初始化，则跳过
-            if self.paused or not self.stream:
+            reader = self.reader
+            # 如果暂停或者读端未初始化，则跳过
+            if self.paused or not reader:
                 time.sleep(0.1)
                 continue
 
             try:
                 # 只在说话状态下进行检测
                 if self.app.device_state == DeviceState.SPEAKING:
-                    # 读取音频帧
+                    # 等待并读取音频帧
+                    if not reader.wait(timeout=0.1):
+                        continue
                     frame = self._read_audio_frame()
                     if not frame:
-                        time.sleep(0.01)
                         continue
 
                     # 检测是否是语音
@@ -197,13 +174,14 @@ class VADDetector:
                     else:
                         self._handle_silence_frame(frame)
                 else:
-                    # 不在说话状态，重置状态
+                    # 不在说话状态，重置状态并丢弃积压音频
                     self._reset_state()
+                    reader.discard()
+                    time.sleep(0.05)
 
             except Exception as e:
                 logger.error(f"VAD检测循环出错: {e}")
-
-            time.sleep(0.01)  # 小延迟，减少CPU使用
+                time.sleep(0.01)
 
         logger.info("VAD检测循环已结束")
 
@@ -212,12 +190,15 @@ class VADDetector:
         读取一帧音频数据.
         """
         try:
-            if not self.stream or not self.stream.is_active():
+            reader = self.reader
+            if not reader:
                 return None
 
-            # 读取音频数据
-            data = self.stream.read(self.frame_size, exception_on_overflow=False)
-            return data
+            # 从共享麦克风读取一帧
+            frame = reader.read(out=self._frame)
+            if frame is None:
+                return None
+            return frame.tobytes()
         except Exception as e:
             logger.error(f"读取音频帧失败: {e}")
             return None
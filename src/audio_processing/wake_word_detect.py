@@ -3,9 +3,9 @@ import time
 from pathlib import Path
 from typing import Callable, Optional
 
-import numpy as np
 import sherpa_onnx
 
+from src.audio_processing.kws_worker import KeywordSpotterWorker
 from src.constants.constants import AudioConfig
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
@@ -21,7 +21,9 @@ class WakeWordDetector:
         self.audio_codec = None
         self.is_running_flag = False
         self.paused = False
-        self.detection_task = None
+        # 解码在工作线程中执行，检测结果投递回事件循环
+        self._worker: Optional[KeywordSpotterWorker] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
         # 防重复触发机制 - 缩短冷却时间提高响应
         self.last_detection_time = 0
@@ -46,6 +48,9 @@ class WakeWordDetector:
         self.keyword_spotter = None
         self.stream = None
 
+        # 麦克风广播读端（工作线程专用的帧队列）
+        self._mic_reader = None
+
         # 初始化配置
         self._load_config(config)
         self._init_kws_model()
@@ -162,8 +167,23 @@ class WakeWordDetector:
             # 创建检测流
             self.stream = self.keyword_spotter.create_stream()
 
-            # 启动检测任务
-            self.detection_task = asyncio.create_task(self._detection_loop())
+            # 接入共享麦克风（与录音编码共用同一路采集流）
+            if self._mic_reader is None:
+                self._mic_reader = audio_codec.register_mic_consumer(
+                    "wake_word", AudioConfig.INPUT_FRAME_SIZE, self.sample_rate
+                )
+
+            # 启动检测线程，只把结果投递回当前事件循环
+            self._loop = asyncio.get_running_loop()
+            self._worker = KeywordSpotterWorker(
+                self.keyword_spotter,
+                self.stream,
+                self._mic_reader,
+                self.sample_rate,
+                on_result=self._post_detection,
+                on_error=self._post_error,
+            )
+            self._worker.start()
 
             logger.info("Sherpa-ONNX KeywordSpotter检测器启动成功")
             return True
@@ -172,95 +192,32 @@ class WakeWordDetector:
             self.enabled = False
             return False
 
-    async def _detection_loop(self):
+    def _post_detection(self, result):
         """
-        检测循环.
+        工作线程调用：把检测结果投递到事件循环处理.
         """
-        error_count = 0
-        MAX_ERRORS = 5
-
-        while self.is_running_flag:
-            try:
-                if self.paused:
-                    await asyncio.sleep(0.1)
-                    continue
-
-                if not self.audio_codec:
-                    await asyncio.sleep(0.5)
-                    continue
-
-                # 处理音频数据
-                await self._process_audio()
-
-                # 减少延迟提高响应速度
-                await asyncio.sleep(0.005)
-                error_count = 0
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                error_count += 1
-                logger.error(f"KWS检测循环错误({error_count}/{MAX_ERRORS}): {e}")
-
-                # 调用错误回调
-                if self.on_error:
-                    try:
-                        if asyncio.iscoroutinefunction(self.on_error):
-                            await self.on_error(e)
-                        else:
-                            self.on_error(e)
-                    except Exception as callback_error:
-                        logger.error(f"执行错误回调时失败: {callback_error}")
-
-                if error_count >= MAX_ERRORS:
-                    logger.critical("达到最大错误次数，停止KWS检测")
-                    break
-                await asyncio.sleep(1)
-
-    async def _process_audio(self):
-        """处理音频数据 - 批量处理优化"""
-        try:
-            if not self.audio_codec or not self.stream:
-                return
-
-            # 批量获取多个音频帧以提高效率
-            audio_batches = []
-            for _ in range(3):  # 一次处理最多3帧
-                data = await self.audio_codec.get_raw_audio_for_detection()
-                if data:
-                    audio_batches.append(data)
-
-            if not audio_batches:
-                return
-
-            # 批量处理音频数据
-            for data in audio_batches:
-                # 转换音频格式
-                if isinstance(data, bytes):
-                    samples = (
-                        np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
-                    )
-                else:
-                    samples = np.array(data, dtype=np.float32)
-
-                # 提供音频数据给KeywordSpotter
-                self.stream.accept_waveform(
-                    sample_rate=self.sample_rate, waveform=samples
-                )
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(
+            lambda: asyncio.create_task(self._handle_detection_result(result))
+        )
 
-            # 处理检测结果
-            while self.keyword_spotter.is_ready(self.stream):
-                self.keyword_spotter.decode_stream(self.stream)
-                result = self.keyword_spotter.get_result(self.stream)
+    def _post_error(self, error: Exception):
+        """
+        工作线程调用：在事件循环中执行错误回调.
+        """
+        loop = self._loop
+        if not self.on_error or loop is None or loop.is_closed():
+            return
 
-                if result:
-                    await self._handle_detection_result(result)
-                    # 重置流状态
-                    self.keyword_spotter.reset_stream(self.stream)
-                    break  # 检测到后立即处理，不继续批量处理
+        def dispatch():
+            if asyncio.iscoroutinefunction(self.on_error):
+                asyncio.create_task(self.on_error(error))
+            else:
+                self.on_error(error)
 
-        except Exception as e:
-            logger.debug(f"KWS音频处理错误: {e}")
+        loop.call_soon_threadsafe(dispatch)
 
     async def _handle_detection_result(self, result):
         """
@@ -289,12 +246,13 @@ class WakeWordDetector:
         """
         self.is_running_flag = False
 
-        if self.detection_task:
-            self.detection_task.cancel()
-            try:
-                await self.detection_task
-            except asyncio.CancelledError:
-                pass
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+
+        if self._mic_reader is not None and self.audio_codec:
+            self.audio_codec.unregister_mic_consumer(self._mic_reader)
+        self._mic_reader = None
 
         logger.info("Sherpa-ONNX KeywordSpotter检测器已停止")
 
@@ -303,12 +261,17 @@ class WakeWordDetector:
         暂停检测.
         """
         self.paused = True
+        if self._worker is not None:
+            self._worker.pause()
         logger.debug("KWS检测已暂停")
 
     async def resume(self):
         """
         恢复检测.
         """
+        # 丢弃暂停期间积压的音频，避免检测过期数据
+        if self._worker is not None:
+            self._worker.resume()
         self.paused = False
         logger.debug("KWS检测已恢复")
 
@@ -350,6 +313,7 @@ class WakeWordDetector:
             "keywords_threshold": self.keywords_threshold,
             "keywords_score": self.keywords_score,
             "is_running": self.is_running(),
+            "worker": self._worker.get_stats() if self._worker else None,
         }
 
     def clear_cache(self):
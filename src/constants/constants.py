@@ -70,7 +70,14 @@ def get_frame_duration() -> int:
         if not is_official_server(ota_url):
             return 60
 
-        # 检测ARM架构设备（如树莓派）
+        # 优先使用本机性能校准的结果（见 src/audio_codecs/calibration.py）
+        from src.audio_codecs.calibration import load_calibration
+
+        calibration = load_calibration(config)
+        if calibration is not None:
+            return calibration["FRAME_DURATION"]
+
+        # 未校准时按架构估计：ARM设备（如树莓派）
         machine = platform.machine().lower()
         arm_archs = ["arm", "aarch64", "armv7l", "armv6l"]
         is_arm_device = any(arch in machine for arch in arm_archs)
@@ -1,18 +1,18 @@
 import asyncio
 
 from src.iot.thing import Parameter, Thing, ValueType
-from src.utils.volume_controller import VolumeController
+from src.utils.software_volume import get_volume_controller
 
 
 class Speaker(Thing):
     def __init__(self):
         super().__init__("Speaker", "当前 AI 机器人的扬声器")
 
-        # 初始化音量控制器
+        # 初始化音量控制器（系统混音器或软件音量，见 AUDIO_OPTIONS.VOLUME_BACKEND）
         self.volume_controller = None
         try:
-            if VolumeController.check_dependencies():
-                self.volume_controller = VolumeController()
+            self.volume_controller = get_volume_controller()
+            if self.volume_controller:
                 self.volume = self.volume_controller.get_volume()
             else:
                 self.volume = 70  # 默认音量
@@ -44,7 +44,7 @@ class Speaker(Thing):
         if 0 <= volume <= 100:
             self.volume = volume
             try:
-                # 直接使用VolumeController设置系统音量
+                # 使用配置的音量后端设置音量
                 if self.volume_controller:
                     await asyncio.to_thread(self.volume_controller.set_volume, volume)
                 else:
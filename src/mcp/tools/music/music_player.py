@@ -4,16 +4,21 @@
 """
 
 import asyncio
+import os
 import shutil
 import tempfile
 import time
 from pathlib import Path
 from typing import List, Optional, Tuple
 
+import numpy as np
 import pygame
 import requests
+import soxr
 
+from src.audio_codecs.output_mixer import OutputMixer
 from src.constants.constants import AudioConfig
+from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 from src.utils.resource_finder import get_user_cache_dir
 
@@ -115,8 +120,10 @@ class MusicPlayer:
     """
 
     def __init__(self):
-        # 根据服务器类型优化pygame mixer初始化
+        # pygame仅用于解码，播放经由AudioCodec的混音器与TTS共用输出流
         self._init_pygame_mixer()
+        self._output_source = None  # 混音源（首次播放时创建）
+        self._pcm = None  # 当前歌曲解码后的PCM
 
         # 核心播放状态
         self.current_song = ""
@@ -167,30 +174,92 @@ class MusicPlayer:
 
     def _init_pygame_mixer(self):
         """
-        根据服务器类型优化pygame mixer初始化
+        初始化pygame mixer作为解码器（不打开真实输出设备）
         """
+        # 使用SDL虚拟音频驱动，避免与AudioCodec争用扬声器。SDL只在初始化音频
+        # 子系统时读取该变量，初始化后恢复原值，不影响进程内其他SDL使用者
+        previous_driver = os.environ.get("SDL_AUDIODRIVER")
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
         try:
-            
-            # 预初始化mixer以设置缓冲区
-            pygame.mixer.pre_init(
+            pygame.mixer.init(
                 frequency=AudioConfig.OUTPUT_SAMPLE_RATE,
                 size=-16,  # 16位有符号
                 channels=AudioConfig.CHANNELS,
-                buffer=1024
             )
-            
-            # 正式初始化
-            pygame.mixer.init()
-            
-            logger.info(f"pygame mixer初始化完成 - 采样率: {AudioConfig.OUTPUT_SAMPLE_RATE}Hz")
-            
+            logger.info(
+                f"pygame解码器初始化完成 - 采样率: {AudioConfig.OUTPUT_SAMPLE_RATE}Hz"
+            )
         except Exception as e:
-            logger.warning(f"优化pygame初始化失败，使用默认配置: {e}")
-            # 回退到默认配置
-            pygame.mixer.init(
-                frequency=AudioConfig.OUTPUT_SAMPLE_RATE, 
-                channels=AudioConfig.CHANNELS
+            logger.error(f"pygame解码器初始化失败: {e}")
+        finally:
+            if previous_driver is None:
+                os.environ.pop("SDL_AUDIODRIVER", None)
+            else:
+                os.environ["SDL_AUDIODRIVER"] = previous_driver
+
+    def _decode_file(self, file_path: Path) -> np.ndarray:
+        """
+        解码音频文件为输出采样率的单声道int16 PCM（在线程池中执行）.
+        """
+        if not pygame.mixer.get_init():
+            self._init_pygame_mixer()
+        frequency, _, channels = pygame.mixer.get_init()
+
+        sound = pygame.mixer.Sound(str(file_path))
+        pcm = np.frombuffer(sound.get_raw(), dtype=np.int16)
+        if channels > 1:
+            pcm = pcm.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        if frequency != AudioConfig.OUTPUT_SAMPLE_RATE:
+            pcm = soxr.resample(pcm, frequency, AudioConfig.OUTPUT_SAMPLE_RATE)
+        return pcm
+
+    def _get_output_source(self):
+        """
+        获取音乐混音源（TTS播放时按配置压低音乐）.
+        """
+        if self._output_source is None:
+            audio_codec = getattr(self.app, "audio_codec", None) if self.app else None
+            if audio_codec is None:
+                raise RuntimeError("音频输出未初始化")
+
+            config = ConfigManager.get_instance()
+            self._output_source = audio_codec.add_mixer_source(
+                "music",
+                priority=OutputMixer.PRIORITY_MUSIC,
+                gain=float(config.get_config("AUDIO_OPTIONS.MIXER.MUSIC_GAIN", 1.0)),
+                duck_gain=float(
+                    config.get_config("AUDIO_OPTIONS.MIXER.MUSIC_DUCK_GAIN", 0.2)
+                ),
             )
+        return self._output_source
+
+    async def _start_playback(self, file_path: Path) -> float:
+        """
+        解码并从头播放文件，返回解码得到的时长（秒）.
+        """
+        self._pcm = await asyncio.to_thread(self._decode_file, file_path)
+        self._queue_from(0)
+        self._get_output_source().resume()
+        return len(self._pcm) / AudioConfig.OUTPUT_SAMPLE_RATE
+
+    def _queue_from(self, position: float):
+        """
+        丢弃未播放数据，从指定位置（秒）开始送入混音源（不改变暂停状态）.
+        """
+        source = self._get_output_source()
+        source.clear()
+        start = int(position * AudioConfig.OUTPUT_SAMPLE_RATE)
+        if self._pcm is not None and start < len(self._pcm):
+            # 整段作为一个块写入，混音器按帧读取视图，不额外拷贝
+            source.write(self._pcm[start:])
+
+    def _stop_playback(self):
+        """
+        停止输出并释放已解码数据.
+        """
+        if self._output_source is not None:
+            self._output_source.clear()
+        self._pcm = None
 
     def _initialize_app_reference(self):
         """
@@ -415,18 +484,17 @@ class MusicPlayer:
 
             # 停止当前播放
             if self.is_playing:
-                pygame.mixer.music.stop()
+                self._stop_playback()
 
-            # 加载并播放
-            pygame.mixer.music.load(str(file_path))
-            pygame.mixer.music.play()
+            # 解码并播放
+            decoded_duration = await self._start_playback(file_path)
 
             # 更新播放状态
             title = metadata.title or "未知标题"
             artist = metadata.artist or "未知艺术家"
             self.current_song = f"{title} - {artist}"
             self.song_id = file_id
-            self.total_duration = metadata.duration or 0
+            self.total_duration = metadata.duration or decoded_duration
             self.current_url = str(file_path)  # 本地文件路径
             self.is_playing = True
             self.paused = False
@@ -490,7 +558,7 @@ class MusicPlayer:
         """
         if self.is_playing:
             logger.info(f"歌曲播放完成: {self.current_song}")
-            pygame.mixer.music.stop()
+            self._stop_playback()
             self.is_playing = False
             self.paused = False
             self.current_position = self.total_duration
@@ -542,7 +610,7 @@ class MusicPlayer:
 
             elif self.is_playing and self.paused:
                 # 恢复播放
-                pygame.mixer.music.unpause()
+                self._get_output_source().resume()
                 self.paused = False
                 self.start_play_time = time.time() - self.current_position
 
@@ -557,7 +625,7 @@ class MusicPlayer:
 
             elif self.is_playing and not self.paused:
                 # 暂停播放
-                pygame.mixer.music.pause()
+                self._get_output_source().pause()
                 self.paused = True
                 self.current_position = time.time() - self.start_play_time
 
@@ -586,7 +654,7 @@ class MusicPlayer:
             if not self.is_playing:
                 return {"status": "info", "message": "没有正在播放的歌曲"}
 
-            pygame.mixer.music.stop()
+            self._stop_playback()
             current_song = self.current_song
             self.is_playing = False
             self.paused = False
@@ -614,11 +682,7 @@ class MusicPlayer:
             self.current_position = position
             self.start_play_time = time.time() - position
 
-            pygame.mixer.music.rewind()
-            pygame.mixer.music.set_pos(position)
-
-            if self.paused:
-                pygame.mixer.music.pause()
+            self._queue_from(position)
 
             # 更新UI
             pos_str = self._format_time(position)
@@ -762,16 +826,17 @@ class MusicPlayer:
         try:
             # 停止当前播放
             if self.is_playing:
-                pygame.mixer.music.stop()
+                self._stop_playback()
 
             # 检查缓存或下载
             file_path = await self._get_or_download_file(url)
             if not file_path:
                 return False
 
-            # 加载并播放
-            pygame.mixer.music.load(str(file_path))
-            pygame.mixer.music.play()
+            # 解码并播放
+            decoded_duration = await self._start_playback(file_path)
+            if self.total_duration <= 0:
+                self.total_duration = decoded_duration
 
             self.current_url = url
             self.is_playing = True
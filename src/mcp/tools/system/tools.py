@@ -59,15 +59,14 @@ async def set_volume(args: Dict[str, Any]) -> bool:
             logger.warning(f"[SystemTools] 音量值超出范围: {volume}")
             return False
 
-        # 直接使用VolumeController设置音量
-        from src.utils.volume_controller import VolumeController
+        # 使用配置的音量后端（系统混音器或软件音量）
+        from src.utils.software_volume import get_volume_controller
 
-        # 检查依赖并创建音量控制器
-        if not VolumeController.check_dependencies():
+        volume_controller = get_volume_controller()
+        if volume_controller is None:
             logger.warning("[SystemTools] 音量控制依赖不完整，无法设置音量")
             return False
 
-        volume_controller = VolumeController()
         await asyncio.to_thread(volume_controller.set_volume, volume)
         logger.info(f"[SystemTools] 音量设置成功: {volume}")
         return True
@@ -85,10 +84,10 @@ async def _get_audio_status() -> Dict[str, Any]:
     获取音频状态.
     """
     try:
-        from src.utils.volume_controller import VolumeController
+        from src.utils.software_volume import get_volume_controller
 
-        if VolumeController.check_dependencies():
-            volume_controller = VolumeController()
+        volume_controller = get_volume_controller()
+        if volume_controller is not None:
             # 使用线程池获取音量，避免阻塞
             current_volume = await asyncio.to_thread(volume_controller.get_volume)
             return {
@@ -18,6 +18,9 @@ logger = get_logger(__name__)
 
 
 class MqttProtocol(Protocol):
+    # 超过该间隔的序列号跳跃视为会话重置而非丢包
+    MAX_SEQUENCE_GAP = 1000
+
     def __init__(self, loop):
         super().__init__()
         self.loop = loop
@@ -53,6 +56,9 @@ class MqttProtocol(Protocol):
         self.aes_nonce = None
         self.local_sequence = 0
         self.remote_sequence = 0
+        # 下行音频收包/丢包计数（按序列号间隔推算）
+        self.audio_packets_received = 0
+        self.audio_packets_lost = 0
 
         # 事件
         self.server_hello_event = asyncio.Event()
@@ -481,16 +487,21 @@ class MqttProtocol(Protocol):
                             f"已解密音频数据包 #{debug_counter}, 大小: {len(decrypted)} 字节"
                         )
 
+                    # nonce末尾4字节为序列号，供播放端重排和丢包判断
+                    sequence = int.from_bytes(received_nonce[12:16], "big")
+                    self._count_audio_packet(sequence)
+                    self.remote_sequence = sequence
+
                     # 处理解密后的音频数据
                     if self._on_incoming_audio:
 
-                        def process_audio(audio_data=decrypted):
+                        def process_audio(audio_data=decrypted, seq=sequence):
                             if asyncio.iscoroutinefunction(self._on_incoming_audio):
-                                coro = self._on_incoming_audio(audio_data)
+                                coro = self._on_incoming_audio(audio_data, sequence=seq)
                                 if coro is not None:
                                     asyncio.create_task(coro)
                             else:
-                                self._on_incoming_audio(audio_data)
+                                self._on_incoming_audio(audio_data, sequence=seq)
 
                         self.loop.call_soon_threadsafe(process_audio)
 
@@ -509,6 +520,22 @@ class MqttProtocol(Protocol):
 
         logger.info("UDP接收线程已停止")
 
+    def _count_audio_packet(self, sequence: int):
+        """
+        统计下行音频包：序列号跳跃的部分计为丢包，乱序或重置的包不计.
+        """
+        if self.audio_packets_received and self.remote_sequence:
+            gap = sequence - self.remote_sequence - 1
+            if 0 < gap < self.MAX_SEQUENCE_GAP:
+                self.audio_packets_lost += gap
+        self.audio_packets_received += 1
+
+    def get_audio_link_stats(self) -> dict:
+        return {
+            "packets_received": self.audio_packets_received,
+            "packets_lost": self.audio_packets_lost,
+        }
+
     async def send_text(self, message):
         """
         发送文本消息.
@@ -77,6 +77,22 @@ class Protocol:
         """
         raise NotImplementedError("send_audio方法必须由子类实现")
 
+    async def send_audio_batch(self, packets):
+        """按顺序发送一批音频包.
+
+        默认逐包调用 send_audio，子类可覆盖以减少重复检查。
+        每个Opus包仍作为独立的消息/数据报发送。
+        """
+        for packet in packets:
+            await self.send_audio(packet)
+
+    def get_audio_link_stats(self) -> dict:
+        """获取下行音频包统计（packets_received/packets_lost）.
+
+        仅能按序列号判断丢包的协议（MQTT+UDP）提供，其他协议返回空字典.
+        """
+        return {}
+
     def is_audio_channel_opened(self) -> bool:
         """
         检查音频通道是否打开的抽象方法，需要在子类中实现.
@@ -424,6 +424,25 @@ class WebsocketProtocol(Protocol):
             # 不要在这里调用网络错误回调，让连接处理器处理
             await self._handle_connection_loss(f"发送音频异常: {str(e)}")
 
+    async def send_audio_batch(self, packets):
+        """按顺序发送一批音频包（每包一条二进制消息）.
+
+        通道状态只检查一次，发送失败时放弃本批剩余数据。
+        """
+        if not self.is_audio_channel_opened():
+            return
+
+        websocket = self.websocket
+        try:
+            for packet in packets:
+                await websocket.send(packet)
+        except websockets.ConnectionClosed as e:
+            logger.warning(f"发送音频时连接已关闭: {e}")
+            await self._handle_connection_loss(f"发送音频失败: {e.code} {e.reason}")
+        except Exception as e:
+            logger.error(f"发送音频数据失败: {e}")
+            await self._handle_connection_loss(f"发送音频异常: {str(e)}")
+
     async def send_text(self, message: str):
         """
         发送文本消息.
@@ -0,0 +1,114 @@
+import threading
+from typing import Optional
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SoftwareVolumeController:
+    """
+    软件音量控制器：在 AudioCodec 播放混音上施加主增益，接口与 VolumeController 一致.
+
+    当前音量缓存在内存中，读取不调用任何外部命令；设置时只更新混音增益
+    （下一帧内平滑过渡）并保存到配置，不修改系统混音器。
+    """
+
+    DEFAULT_VOLUME = 70
+    CONFIG_KEY = "AUDIO_OPTIONS.SOFTWARE_VOLUME"
+
+    def __init__(self, audio_codec=None):
+        """
+        Args:
+            audio_codec: 施加增益的音频编解码器，默认使用应用实例的编解码器
+        """
+        self._audio_codec = audio_codec
+        self._volume = self.saved_volume()
+
+    @classmethod
+    def saved_volume(cls) -> int:
+        """
+        配置中保存的软件音量（0-100）.
+        """
+        try:
+            volume = int(
+                ConfigManager.get_instance().get_config(cls.CONFIG_KEY, cls.DEFAULT_VOLUME)
+            )
+        except (TypeError, ValueError):
+            volume = cls.DEFAULT_VOLUME
+        return max(0, min(100, volume))
+
+    @staticmethod
+    def volume_to_gain(volume: int) -> float:
+        """音量(0-100)映射为线性增益.
+
+        按平方曲线映射，使音量值与听感响度大致成比例（50 约为 -12dB）。
+        """
+        return (max(0, min(100, volume)) / 100) ** 2
+
+    def get_volume(self) -> int:
+        """
+        获取当前音量 (0-100)，直接返回缓存值.
+        """
+        return self._volume
+
+    def set_volume(self, volume: int) -> None:
+        """
+        设置音量 (0-100).
+        """
+        volume = max(0, min(100, int(volume)))
+        self._volume = volume
+
+        codec = self._get_audio_codec()
+        if codec is not None:
+            codec.set_output_gain(self.volume_to_gain(volume))
+        else:
+            logger.debug("音频编解码器未就绪，软件音量将在启动时生效")
+
+        ConfigManager.get_instance().update_config(self.CONFIG_KEY, volume)
+
+    def _get_audio_codec(self):
+        if self._audio_codec is not None:
+            return self._audio_codec
+        try:
+            from src.application import Application
+
+            return Application.get_instance().audio_codec
+        except Exception:
+            return None
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_volume_controller() -> Optional[object]:
+    """按 AUDIO_OPTIONS.VOLUME_BACKEND 返回共享的音量控制器.
+
+    software 使用软件增益；system（默认）使用系统混音器 VolumeController，
+    依赖缺失时返回None。
+    """
+    global _controller
+    with _controller_lock:
+        if _controller is not None:
+            return _controller
+
+        backend = str(
+            ConfigManager.get_instance().get_config(
+                "AUDIO_OPTIONS.VOLUME_BACKEND", "system"
+            )
+        ).lower()
+        if backend == "software":
+            _controller = SoftwareVolumeController()
+        else:
+            if backend != "system":
+                logger.warning(f"未知音量后端 {backend}，使用系统音量")
+            from src.utils.volume_controller import VolumeController
+
+            if not VolumeController.check_dependencies():
+                return None
+            _controller = VolumeController()
+
+        logger.info(f"音量后端: {type(_controller).__name__}")
+        return _controller